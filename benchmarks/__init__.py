@@ -0,0 +1,3 @@
+"""
+Benchmarks de l'envoi d'emails.
+"""
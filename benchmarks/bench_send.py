@@ -0,0 +1,326 @@
+"""
+Benchmark de l'envoi d'emails contre un serveur SMTP local (smtp_sink).
+
+Mesure pour chaque combinaison (taille du message, nombre d'images,
+nombre de destinataires) et chaque moteur d'envoi:
+    - debit de bout en bout (messages/seconde)
+    - CPU par message (processus client uniquement: le CPU des processus
+      de rendu de SendEngine n'est pas compte, comparer aussi le debit)
+    - pic memoire (tracemalloc, passe separee)
+
+Usage:
+    python -m benchmarks.bench_send
+    python -m benchmarks.bench_send --quick --latency 0.02 --output bench.json
+    python -m benchmarks.bench_send --compare bench_v1.json
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import platform
+import random
+import struct
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from src.config import DRYRUN_WRITERS
+from src.models import SMTPConfig, Recipient
+from src.services.email_service import EmailService
+from src.services.send_engine import SendEngine
+from src.services.dryrun_service import MessageStore, DryRunSession
+
+from .smtp_sink import SinkOptions, serve
+
+
+# Moteur d'envoi: (config, destinataires, sujet, corps, image par defaut) -> nb de succes
+Engine = Callable[[SMTPConfig, List[Recipient], str, str, Optional[bytes]], int]
+
+
+def _engine_email_service(config, recipients, subject, body, default_image):
+    """Moteur historique: EmailService.send, une connexion par message."""
+    sent = 0
+    for recipient in recipients:
+        success, _ = EmailService.send(
+            config, recipient, subject, body,
+            default_image=default_image,
+            personal_images=recipient.images or None
+        )
+        sent += success
+    return sent
+
+
+def _engine_send_engine(config, recipients, subject, body, default_image):
+    """SendEngine: rendu en pool de processus, session SMTP reutilisee."""
+    engine = SendEngine(config, subject, body, default_image=default_image, delay=0)
+    sent, _ = engine.run(recipients)
+    return sent
+
+
+def _engine_dry_run(config, recipients, subject, body, default_image):
+    """SendEngine en simulation (.eml sur disque): debit du rendu seul, sans reseau."""
+    with tempfile.TemporaryDirectory() as directory:
+        store = MessageStore(directory, "eml")
+        engine = SendEngine(
+            config, subject, body, default_image=default_image, delay=0,
+            sessions=DRYRUN_WRITERS, session_factory=lambda: DryRunSession(store),
+            update_status=False
+        )
+        sent, _ = engine.run(recipients)
+        store.close()
+    return sent
+
+
+# Moteurs compares. Ajouter ici les nouveaux moteurs d'envoi.
+ENGINES: Dict[str, Engine] = {
+    "email_service": _engine_email_service,
+    "send_engine": _engine_send_engine,
+    "dry_run": _engine_dry_run,
+}
+
+
+# Matrice par defaut
+BODY_SIZES = [1_000, 50_000]          # octets de texte
+IMAGE_COUNTS = [0, 1, 4]              # images personnalisees par destinataire
+RECIPIENT_COUNTS = [20, 100]
+IMAGE_SIZE = 150_000                  # octets par image
+
+QUICK_BODY_SIZES = [1_000]
+QUICK_IMAGE_COUNTS = [0, 2]
+QUICK_RECIPIENT_COUNTS = [20]
+
+
+def make_png(size: int, seed: int) -> bytes:
+    """Genere un PNG valide d'environ `size` octets (pixels aleatoires, incompressibles)."""
+    rng = random.Random(seed)
+    width = 256
+    height = max(1, size // (width * 3))
+    raw = b"".join(
+        # getrandbits: randbytes() demande Python 3.9
+        b"\x00" + rng.getrandbits(width * 24).to_bytes(width * 3, "little")
+        for _ in range(height)
+    )
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b""))
+
+
+def make_body(size: int, seed: int) -> str:
+    """Genere un corps de message d'environ `size` caracteres avec placeholders."""
+    rng = random.Random(seed)
+    words = ["bonjour", "dossier", "information", "contact", "merci", "equipe", "question"]
+    lines = ["Bonjour {{prenom}} {{nom}},", ""]
+    length = sum(len(line) + 1 for line in lines)
+    while length < size:
+        line = " ".join(rng.choice(words) for _ in range(12))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def make_recipients(count: int, image_count: int, image_size: int) -> List[Recipient]:
+    """Genere des destinataires avec leurs images personnalisees."""
+    images = [(make_png(image_size, seed), f"image_{seed}.png") for seed in range(image_count)]
+    return [
+        Recipient(
+            email=f"user{i}@example.com",
+            nom=f"Nom{i}",
+            prenom=f"Prenom{i}",
+            numero=f"{i:05d}",
+            images=list(images)
+        )
+        for i in range(count)
+    ]
+
+
+def git_revision() -> str:
+    """Revision git courante (pour comparer les versions)."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def start_sink(options: SinkOptions):
+    """Demarre le sink dans un processus separe. Retourne (process, conn, port)."""
+    parent_conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(
+        target=serve, args=(options, "127.0.0.1", 0, child_conn), daemon=True
+    )
+    process.start()
+    port = parent_conn.recv()
+    return process, parent_conn, port
+
+
+def stop_sink(process, conn):
+    """Arrete le sink et retourne ses compteurs (messages, destinataires, octets)."""
+    conn.send("stop")
+    stats = conn.recv()
+    process.join(timeout=5)
+    return stats
+
+
+def run_case(engine: Engine, config: SMTPConfig, recipients: List[Recipient],
+             subject: str, body: str, default_image: Optional[bytes],
+             measure_memory: bool) -> dict:
+    """Execute un cas de la matrice et retourne ses mesures."""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    sent = engine(config, recipients, subject, body, default_image)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    peak = None
+    if measure_memory:
+        tracemalloc.start()
+        engine(config, recipients, subject, body, default_image)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    count = len(recipients)
+    return {
+        "sent": sent,
+        "seconds": round(wall, 4),
+        "messages_per_second": round(count / wall, 2) if wall else None,
+        "cpu_ms_per_message": round(cpu * 1000 / count, 3),
+        "peak_memory_kb": round(peak / 1024, 1) if peak is not None else None,
+    }
+
+
+def run(args) -> dict:
+    """Execute toute la matrice pour les moteurs demandes."""
+    body_sizes = QUICK_BODY_SIZES if args.quick else BODY_SIZES
+    image_counts = QUICK_IMAGE_COUNTS if args.quick else IMAGE_COUNTS
+    recipient_counts = QUICK_RECIPIENT_COUNTS if args.quick else RECIPIENT_COUNTS
+
+    options = SinkOptions(
+        latency=args.latency,
+        rcpt_error_rate=args.rcpt_error_rate,
+        data_error_rate=args.data_error_rate,
+        seed=args.seed,
+        pipelining=not args.no_pipelining,
+    )
+    process, conn, port = start_sink(options)
+
+    config = SMTPConfig(
+        server="127.0.0.1", port=port,
+        email="bench@example.com", password="bench",
+        use_tls=False
+    )
+    default_image = make_png(args.image_size, seed=1000) if args.default_image else None
+
+    results = []
+    try:
+        for engine_name in args.engines:
+            engine = ENGINES[engine_name]
+            for body_size, image_count, recipient_count in itertools.product(
+                body_sizes, image_counts, recipient_counts
+            ):
+                recipients = make_recipients(recipient_count, image_count, args.image_size)
+                body = make_body(body_size, args.seed)
+                measures = run_case(
+                    engine, config, recipients, "Info {{prenom}}", body,
+                    default_image, not args.no_memory
+                )
+                case = {
+                    "engine": engine_name,
+                    "body_size": body_size,
+                    "images": image_count,
+                    "recipients": recipient_count,
+                    **measures,
+                }
+                results.append(case)
+                print_case(case)
+    finally:
+        sink_stats = stop_sink(process, conn)
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sink": {
+            "latency": args.latency,
+            "rcpt_error_rate": args.rcpt_error_rate,
+            "data_error_rate": args.data_error_rate,
+            "seed": args.seed,
+            "pipelining": not args.no_pipelining,
+            "messages": sink_stats[0],
+            "bytes": sink_stats[2],
+        },
+        "image_size": args.image_size,
+        "results": results,
+    }
+
+
+def _case_key(case: dict):
+    return case["engine"], case["body_size"], case["images"], case["recipients"]
+
+
+def print_header():
+    print(f"{'moteur':<16}{'corps':>8}{'img':>5}{'dest':>6}{'ok':>6}"
+          f"{'msg/s':>10}{'cpu ms/msg':>12}{'pic Ko':>10}")
+
+
+def print_case(case: dict, baseline: Optional[dict] = None):
+    line = (f"{case['engine']:<16}{case['body_size']:>8}{case['images']:>5}"
+            f"{case['recipients']:>6}{case['sent']:>6}{case['messages_per_second']:>10}"
+            f"{case['cpu_ms_per_message']:>12}{str(case['peak_memory_kb']):>10}")
+    if baseline and baseline.get("messages_per_second"):
+        ratio = case["messages_per_second"] / baseline["messages_per_second"]
+        line += f"   x{ratio:.2f} vs reference"
+    print(line)
+
+
+def compare(current: dict, reference: dict):
+    """Affiche les resultats courants face a un fichier de reference."""
+    ref_cases = {_case_key(c): c for c in reference.get("results", [])}
+    print(f"\nComparaison avec {reference.get('revision')} ({reference.get('date')})")
+    print_header()
+    for case in current["results"]:
+        print_case(case, ref_cases.get(_case_key(case)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark d'envoi contre un SMTP local")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--quick", action="store_true", help="Matrice reduite")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence par aller-retour (s)")
+    parser.add_argument("--rcpt-error-rate", type=float, default=0.0)
+    parser.add_argument("--data-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-pipelining", action="store_true", help="Le sink n'annonce pas PIPELINING")
+    parser.add_argument("--image-size", type=int, default=IMAGE_SIZE)
+    parser.add_argument("--default-image", action="store_true", help="Ajouter une image par defaut")
+    parser.add_argument("--no-memory", action="store_true", help="Ne pas mesurer le pic memoire")
+    parser.add_argument("--output", help="Fichier JSON de resultats")
+    parser.add_argument("--compare", help="Fichier JSON de reference a comparer")
+    args = parser.parse_args(argv)
+
+    print_header()
+    report = run(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResultats ecrits dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark du demarrage de l'interface (temps jusqu'a la premiere fenetre).
+
+Lance plusieurs fois l'application avec --profile-startup et rapporte la
+mediane de chaque etape du profil (depuis le debut de main.py) ainsi que
+le temps total vu de l'exterieur (lancement du processus -> fin du profil),
+qui inclut le demarrage de Python et, pour l'executable --onefile,
+l'extraction de l'archive.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --output startup.json
+    python -m benchmarks.bench_startup --exe dist\\ColdSender.exe --compare startup.json
+
+Necessite un affichage (la fenetre est ouverte puis fermee a chaque essai).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from .bench_send import git_revision
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(command: List[str]) -> Dict[str, float]:
+    """Un demarrage: temps (ms) de chaque etape + "total" mesure de l'exterieur."""
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        started = time.perf_counter()
+        subprocess.run(command + ["--profile-startup", path], cwd=ROOT, check=True, timeout=120)
+        total = (time.perf_counter() - started) * 1000
+        with open(path, encoding="utf-8") as f:
+            marks = {m["name"]: m["ms"] for m in json.load(f)["marks"]}
+    finally:
+        os.remove(path)
+    marks["total"] = total
+    return marks
+
+
+def run(args) -> dict:
+    command = [args.exe] if args.exe else [sys.executable, os.path.join(ROOT, "main.py")]
+    samples: List[Dict[str, float]] = []
+    for i in range(args.warmup + args.runs):
+        marks = run_once(command)
+        if i >= args.warmup:
+            samples.append(marks)
+            print(f"essai {len(samples)}/{args.runs}: {marks['total']:.0f} ms")
+
+    # Etapes dans l'ordre du premier essai, mediane sur tous les essais
+    steps = {
+        name: round(statistics.median(s[name] for s in samples if name in s), 1)
+        for name in samples[0]
+    }
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "target": args.exe or "main.py",
+        "runs": args.runs,
+        "steps": steps,
+    }
+
+
+def print_report(report: dict, reference: Optional[dict] = None):
+    print(f"\n{'etape':<30}{'mediane ms':>12}")
+    ref_steps = reference.get("steps", {}) if reference else {}
+    for name, ms in report["steps"].items():
+        line = f"{name:<30}{ms:>12.1f}"
+        if ref_steps.get(name):
+            line += f"   x{ms / ref_steps[name]:.2f} vs reference"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du demarrage de l'interface")
+    parser.add_argument("--runs", type=int, default=5, help="Nombre d'essais mesures")
+    parser.add_argument("--warmup", type=int, default=1, help="Essais ignores (cache disque)")
+    parser.add_argument("--exe", help="Executable PyInstaller a mesurer a la place de main.py")
+    parser.add_argument("--output", help="Fichier JSON de resultats")
+    parser.add_argument("--compare", help="Fichier JSON de reference a comparer")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+
+    reference = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            reference = json.load(f)
+        print(f"\nComparaison avec {reference.get('revision')} ({reference.get('date')})")
+    print_report(report, reference)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResultats ecrits dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
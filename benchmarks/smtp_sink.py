@@ -0,0 +1,304 @@
+"""
+Serveur SMTP local de test (sink) pour les benchmarks.
+
+Accepte tous les messages sans les delivrer. Peut simuler une latence
+reseau (un aller-retour par attente du client) et injecter des erreurs
+avec un taux configurable, de maniere reproductible (graine fixe).
+"""
+
+import random
+import select
+import socketserver
+import ssl
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass
+class SinkOptions:
+    """Options du serveur SMTP de test."""
+    # Latence simulee (secondes) par aller-retour
+    latency: float = 0.0
+    # Probabilite de refuser un destinataire (RCPT TO -> 550)
+    rcpt_error_rate: float = 0.0
+    # Probabilite d'echec temporaire en fin de DATA (-> 451)
+    data_error_rate: float = 0.0
+    # Graine du generateur aleatoire (reproductibilite)
+    seed: int = 42
+    # Annoncer PIPELINING dans la reponse EHLO
+    pipelining: bool = True
+    # Messages acceptes par connexion avant "421" et fermeture (0 = sans limite)
+    max_messages: int = 0
+    # Fermeture silencieuse d'une connexion inactive (secondes, 0 = jamais)
+    idle_timeout: float = 0.0
+    # Certificat et cle PEM: annonce STARTTLS (reprise de session TLS possible)
+    certfile: Optional[str] = None
+    keyfile: Optional[str] = None
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """Traite une session SMTP cliente."""
+
+    def setup(self):
+        super().setup()
+        self.options: SinkOptions = self.server.options
+        self.pending = []
+        self.buffer = bytearray()
+
+    # --- Lecture --------------------------------------------------------
+
+    def readline(self) -> bytes:
+        """Lit une ligne (avec CRLF) depuis le socket, b"" si fermeture ou inactivite."""
+        while True:
+            end = self.buffer.find(b"\n")
+            if end >= 0:
+                line = bytes(self.buffer[:end + 1])
+                del self.buffer[:end + 1]
+                return line
+            if self.options.idle_timeout > 0:
+                readable, _, _ = select.select([self.connection], [], [], self.options.idle_timeout)
+                if not readable:
+                    return b""
+            chunk = self.connection.recv(65536)
+            if not chunk:
+                return b""
+            self.buffer += chunk
+
+    def _input_pending(self) -> bool:
+        """True si le client a deja envoye d'autres commandes (pipelining)."""
+        if self.buffer:
+            return True
+        if isinstance(self.connection, ssl.SSLSocket) and self.connection.pending():
+            return True
+        readable, _, _ = select.select([self.connection], [], [], 0)
+        return bool(readable)
+
+    # --- Reponses -------------------------------------------------------
+
+    def reply(self, line: str, flush: Optional[bool] = None):
+        """
+        Met en file une reponse.
+
+        Les reponses sont envoyees ensemble quand le client attend,
+        ce qui compte pour un seul aller-retour de latence.
+        """
+        self.pending.append(line.encode("ascii") + b"\r\n")
+        if flush is None:
+            flush = not self._input_pending()
+        if flush:
+            if self.options.latency > 0:
+                time.sleep(self.options.latency)
+            self.wfile.write(b"".join(self.pending))
+            self.wfile.flush()
+            self.pending = []
+
+    # --- Session --------------------------------------------------------
+
+    def handle(self):
+        rng = self.server.next_rng()
+        self.reply("220 coldsender-sink ESMTP ready", flush=True)
+
+        mail_from = None
+        rcpts = []
+        accepted = 0
+
+        while True:
+            raw = self.readline()
+            if not raw:
+                return
+            line = raw.decode("latin-1").rstrip("\r\n")
+            verb = line.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                lines = ["250-coldsender-sink", "250-AUTH PLAIN LOGIN", "250-8BITMIME"]
+                if self.options.pipelining:
+                    lines.append("250-PIPELINING")
+                if self.server.tls_context and not isinstance(self.connection, ssl.SSLSocket):
+                    lines.append("250-STARTTLS")
+                lines.append("250 SIZE 52428800")
+                for item in lines[:-1]:
+                    self.reply(item, flush=False)
+                self.reply(lines[-1])
+            elif verb == "HELO":
+                self.reply("250 coldsender-sink")
+            elif verb == "STARTTLS" and self.server.tls_context:
+                self.reply("220 2.0.0 Ready to start TLS", flush=True)
+                self.connection = self.server.tls_context.wrap_socket(self.connection, server_side=True)
+                self.wfile = self.connection.makefile("wb")
+                self.buffer.clear()
+                mail_from = None
+                rcpts = []
+            elif verb == "AUTH":
+                parts = line.split()
+                mechanism = parts[1].upper() if len(parts) > 1 else ""
+                if mechanism == "LOGIN":
+                    if len(parts) == 2:
+                        self.reply("334 VXNlcm5hbWU6", flush=True)
+                        self.readline()
+                    self.reply("334 UGFzc3dvcmQ6", flush=True)
+                    self.readline()
+                elif len(parts) == 2:
+                    self.reply("334 ", flush=True)
+                    self.readline()
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                if self.options.max_messages and accepted >= self.options.max_messages:
+                    self.reply("421 4.7.0 Too many messages, closing connection", flush=True)
+                    return
+                mail_from = line[10:]
+                rcpts = []
+                self.reply("250 2.1.0 Ok")
+            elif verb == "RCPT":
+                if mail_from is None:
+                    self.reply("503 5.5.1 Error: need MAIL command")
+                elif rng.random() < self.options.rcpt_error_rate:
+                    self.reply("550 5.1.1 User unknown")
+                else:
+                    rcpts.append(line[8:])
+                    self.reply("250 2.1.5 Ok")
+            elif verb == "DATA":
+                if not rcpts:
+                    self.reply("554 5.5.1 Error: no valid recipients")
+                    continue
+                self.reply("354 End data with <CR><LF>.<CR><LF>", flush=True)
+                size = self._read_data()
+                if rng.random() < self.options.data_error_rate:
+                    self.reply("451 4.3.0 Temporary failure, try again later")
+                else:
+                    self.server.record(len(rcpts), size)
+                    accepted += 1
+                    self.reply("250 2.0.0 Ok: queued")
+                mail_from = None
+                rcpts = []
+            elif verb == "RSET":
+                mail_from = None
+                rcpts = []
+                self.reply("250 2.0.0 Ok")
+            elif verb == "NOOP":
+                self.reply("250 2.0.0 Ok")
+            elif verb == "QUIT":
+                self.reply("221 2.0.0 Bye", flush=True)
+                return
+            else:
+                self.reply("502 5.5.2 Error: command not recognized")
+
+    def _read_data(self) -> int:
+        """Lit le contenu DATA jusqu'a la ligne '.' et retourne sa taille."""
+        size = 0
+        while True:
+            raw = self.readline()
+            if not raw or raw in (b".\r\n", b".\n"):
+                return size
+            size += len(raw)
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """
+    Serveur SMTP local qui accepte tout et compte les messages recus.
+
+    Utilisable comme context manager:
+        with SMTPSink(SinkOptions(latency=0.02)) as sink:
+            host, port = sink.address
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, options: Optional[SinkOptions] = None, host: str = "127.0.0.1", port: int = 0):
+        self.options = options or SinkOptions()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.options.seed)
+        self._thread = None
+        self.messages = 0
+        self.recipients = 0
+        self.bytes = 0
+        self.tls_context: Optional[ssl.SSLContext] = None
+        if self.options.certfile:
+            self.tls_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.tls_context.load_cert_chain(self.options.certfile, self.options.keyfile)
+        super().__init__((host, port), _SinkHandler)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Adresse (hote, port) d'ecoute."""
+        return self.server_address[0], self.server_address[1]
+
+    def next_rng(self) -> random.Random:
+        """Generateur aleatoire deterministe pour une nouvelle session."""
+        with self._lock:
+            return random.Random(self._rng.random())
+
+    def record(self, rcpt_count: int, size: int):
+        """Comptabilise un message accepte."""
+        with self._lock:
+            self.messages += 1
+            self.recipients += rcpt_count
+            self.bytes += size
+
+    def start(self) -> "SMTPSink":
+        """Demarre le serveur dans un thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrete le serveur."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def serve(options: SinkOptions, host: str = "127.0.0.1", port: int = 2525, conn=None):
+    """
+    Lance le sink (bloquant).
+
+    Utilise par les benchmarks dans un processus separe, pour que le CPU
+    du serveur ne soit pas compte avec celui du client. Si `conn` (Pipe)
+    est fourni: envoie le port d'ecoute, attend un message d'arret puis
+    renvoie les compteurs (messages, destinataires, octets).
+    """
+    with SMTPSink(options, host, port) as sink:
+        if conn is None:
+            while True:
+                time.sleep(3600)
+        conn.send(sink.address[1])
+        conn.recv()
+        conn.send((sink.messages, sink.recipients, sink.bytes))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serveur SMTP local de test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rcpt-error-rate", type=float, default=0.0)
+    parser.add_argument("--data-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-pipelining", action="store_true")
+    parser.add_argument("--max-messages", type=int, default=0)
+    parser.add_argument("--idle-timeout", type=float, default=0.0)
+    parser.add_argument("--certfile", help="Certificat PEM (active STARTTLS)")
+    parser.add_argument("--keyfile", help="Cle privee PEM")
+    args = parser.parse_args()
+
+    print(f"SMTP sink sur {args.host}:{args.port}")
+    serve(SinkOptions(
+        latency=args.latency,
+        rcpt_error_rate=args.rcpt_error_rate,
+        data_error_rate=args.data_error_rate,
+        seed=args.seed,
+        pipelining=not args.no_pipelining,
+        max_messages=args.max_messages,
+        idle_timeout=args.idle_timeout,
+        certfile=args.certfile,
+        keyfile=args.keyfile,
+    ), args.host, args.port)
@@ -30,7 +30,9 @@ echo.
 echo Cela peut prendre 2-3 minutes...
 echo.
 
+REM --splash: image affichee des le lancement, pendant l'extraction de l'executable
 python -m PyInstaller --onefile --windowed --name "ColdSender" ^
+    --splash "assets\splash.png" ^
     --hidden-import=customtkinter ^
     --hidden-import=pandas ^
     --hidden-import=openpyxl ^
@@ -1,15 +1,93 @@
 """
 Point d'entrée de l'application Mail Sender.
+
+Usage:
+    python main.py                      interface graphique
+    python main.py --schedule DOSSIER   campagne planifiee sans interface
+                                        (mot de passe SMTP dans COLDSENDER_SMTP_PASSWORD)
+    python main.py --profile-startup [FICHIER]
+                                        affiche la fenetre, mesure le demarrage puis quitte
+                                        (rapport JSON dans FICHIER, texte sinon)
 """
 
-from src.ui import MailSenderApp
+import time
+
+# Reference du profil de demarrage (avant tout autre import)
+_STARTED = time.perf_counter()
+
+import argparse
+import multiprocessing
+import os
+import sys
+
+
+def run_schedule(path: str) -> int:
+    """Execute une campagne planifiee sans interface graphique."""
+    from src.config import SMTP_PASSWORD_ENV
+    from src.services import CampaignScheduler, SuppressionList, MessageIndex
+
+    password = os.environ.get(SMTP_PASSWORD_ENV)
+    if not password:
+        print(f"Variable d'environnement {SMTP_PASSWORD_ENV} manquante", file=sys.stderr)
+        return 2
+
+    scheduler, error = CampaignScheduler.load(path)
+    if error:
+        print(f"Erreur: {error}", file=sys.stderr)
+        return 1
+
+    total = len(scheduler.recipients)
+    print(f"Campagne {path}: {scheduler.state.position}/{total} deja traites")
+
+    def on_result(idx, recipient, success, error):
+        state = "OK" if success else ("EXCLU" if error is None else f"ECHEC {error}")
+        print(f"[{idx + 1}/{total}] {recipient.email}: {state}", flush=True)
+
+    def on_wait(resume, reason):
+        print(f"En attente jusqu'au {resume:%d/%m %H:%M} ({reason})", flush=True)
+
+    try:
+        success, failed = scheduler.run(
+            password, on_result, on_wait,
+            suppression=SuppressionList.default(),
+            message_index=MessageIndex.default()
+        )
+    except KeyboardInterrupt:
+        print(f"Interrompu a la position {scheduler.state.position}/{total}")
+        return 130
+    except Exception as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Termine: {success} envoyes, {failed} echoues, {scheduler.state.suppressed} exclus")
+    if scheduler.tls.handshakes:
+        print(scheduler.tls.summary())
+    return 0
 
 
 def main():
     """Fonction principale."""
-    app = MailSenderApp()
+    parser = argparse.ArgumentParser(description="Mail Sender")
+    parser.add_argument("--schedule", metavar="DOSSIER", help="executer une campagne planifiee")
+    parser.add_argument(
+        "--profile-startup", metavar="FICHIER", nargs="?", const="-",
+        help="mesurer le temps d'affichage de la fenetre puis quitter"
+    )
+    args = parser.parse_args()
+
+    if args.schedule:
+        sys.exit(run_schedule(args.schedule))
+
+    from src.ui import MailSenderApp
+    from src.ui.startup import StartupProfile
+
+    profile = StartupProfile(_STARTED, args.profile_startup)
+    profile.mark("imports")
+    app = MailSenderApp(profile)
     app.run()
 
 
 if __name__ == "__main__":
+    # Requis pour le pool de rendu dans l'executable PyInstaller
+    multiprocessing.freeze_support()
     main()
@@ -2,6 +2,8 @@
 Configuration de l'application.
 """
 
+import os
+
 # Fournisseurs SMTP supportes
 SMTP_PROVIDERS = {
     "Gmail": ("smtp.gmail.com", 465),
@@ -22,3 +24,126 @@ COLORS = {
     "gray": "#6b7280",
     "light_gray": "#f3f4f6",
 }
+
+# Optimisation des images avant envoi
+# Largeur d'affichage dans le mail (max-width du HTML)
+IMAGE_MAX_WIDTH = 600
+IMAGE_QUALITY = 85
+IMAGE_QUALITIES = ["95", "85", "75", "60"]
+IMAGE_CACHE_BYTES = 256 * 1024 * 1024
+
+# Envoi
+SMTP_TIMEOUT = 60
+# Pause entre deux envois (secondes), par session
+SEND_DELAY = 0.5
+# Sessions SMTP en parallele
+SMTP_SESSIONS = 1
+# Connexion inactive depuis plus de N secondes: NOOP avant le prochain message
+SMTP_IDLE_NOOP = 30
+# Delai de reponse au NOOP (connexion morte detectee sans attendre SMTP_TIMEOUT)
+SMTP_NOOP_TIMEOUT = 10
+# Connexion renouvelee apres N messages ou N secondes (0 = sans limite)
+SMTP_SESSION_MAX_MESSAGES = 100
+SMTP_SESSION_MAX_AGE = 600
+# Nouvelles tentatives d'un message apres 421 ou connexion perdue, attente entre deux (s)
+SMTP_RECONNECT_RETRIES = 2
+SMTP_RECONNECT_DELAY = 2.0
+# Processus de rendu des messages (None = nombre de coeurs)
+RENDER_WORKERS = None
+# Messages rendus en attente d'envoi (borne la memoire)
+RENDER_QUEUE_SIZE = 32
+
+# Donnees persistantes de l'application
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".coldsender")
+
+# Liste d'opposition (desinscriptions)
+SUPPRESSION_FILE = os.path.join(DATA_DIR, "suppression.idx")
+# Filtre de Bloom: bits par adresse et nombre de sondes (~1% de faux positifs)
+SUPPRESSION_BLOOM_BITS = 10
+SUPPRESSION_BLOOM_PROBES = 7
+
+# Colonnes lues dans les fichiers de destinataires (les autres sont ignorees)
+RECIPIENT_COLUMNS = ["email", "nom", "prenom", "numero"]
+# Lignes lues entre deux rappels de progression a l'import
+IMPORT_CHUNK_ROWS = 20000
+# Colonnes de resultat ajoutees a l'export (statut, erreur, date d'envoi, Message-ID)
+RESULT_COLUMNS = ["status", "error", "sent_at", "message_id"]
+
+# Dedoublonnage: ligne conservee parmi les doublons d'adresse
+DEDUP_KEEP = {
+    "first": "Garder la premiere",
+    "last": "Garder la derniere",
+    "complete": "Garder la plus complete",
+}
+
+# Import: liste actuelle remplacee, completee, ou mise a jour par adresse
+# (ajouts, modifications et retraits; images et statuts conserves)
+IMPORT_MODES = {
+    "replace": "Remplacer la liste",
+    "append": "Ajouter a la liste",
+    "update": "Mettre a jour (par adresse)",
+}
+
+# Simulation (dry-run): formats de sortie et ecritures en parallele
+DRYRUN_FORMATS = {
+    "eml": "Fichiers .eml",
+    "maildir": "Maildir",
+    "mbox": "Fichier mbox",
+}
+DRYRUN_WRITERS = 4
+
+# Limites des fournisseurs pour l'estimation: taille max d'un message encode
+# (octets) et quota d'envoi quotidien (None si inconnu)
+PROVIDER_LIMITS = {
+    "Gmail": {"max_message_size": 25 * 1024 * 1024, "daily_quota": 500},
+    "Outlook/Hotmail": {"max_message_size": 20 * 1024 * 1024, "daily_quota": 300},
+    "Yahoo": {"max_message_size": 25 * 1024 * 1024, "daily_quota": 500},
+    "Autre": {"max_message_size": 25 * 1024 * 1024, "daily_quota": None},
+}
+# Hypotheses de duree: debit montant (octets/s) et temps fixe par message (s)
+ESTIMATE_UPLOAD_BPS = 1_000_000
+ESTIMATE_MESSAGE_OVERHEAD = 0.3
+
+# Verification avant envoi: longueur maximale recommandee de l'objet personnalise
+# (78 caracteres par ligne d'en-tete, RFC 5322; au-dela l'objet est souvent tronque)
+SUBJECT_MAX_LENGTH = 78
+
+# Envoi planifie: plages horaires par defaut (lundi-vendredi), attente maximale
+# entre deux verifications (s) et variable d'environnement du mot de passe SMTP
+SCHEDULE_WINDOWS = [("09:00", "12:00"), ("14:00", "18:00")]
+SCHEDULE_POLL = 60
+SMTP_PASSWORD_ENV = "COLDSENDER_SMTP_PASSWORD"
+
+# Pause d'une campagne: intervalle des NOOP gardant les sessions SMTP ouvertes (s)
+PAUSE_KEEPALIVE = 60
+
+# Retours (DSN): index des Message-ID envoyes et octets lus par DSN
+MESSAGE_INDEX_FILE = os.path.join(DATA_DIR, "messages.tsv")
+DSN_MAX_BYTES = 256 * 1024
+
+# Projet de campagne: extension du fichier (en-tete JSON + section d'images projetee en memoire)
+PROJECT_EXTENSION = ".coldsender"
+
+# Echecs d'envoi: categories (ordre d'affichage), lignes affichees au plus par filtre
+# et domaines proposes dans le filtre
+FAILURE_CATEGORIES = {
+    "mailbox": "Adresse inconnue",
+    "domain": "Domaine invalide",
+    "full": "Boite pleine",
+    "rate": "Limite d'envoi",
+    "temporary": "Erreur temporaire",
+    "policy": "Refus (politique, spam)",
+    "message": "Message refuse (taille, contenu)",
+    "auth": "Authentification",
+    "network": "Connexion / reseau",
+    "other": "Autre",
+}
+FAILURE_VIEW_LIMIT = 5000
+FAILURE_TOP_DOMAINS = 20
+
+# Recherche de destinataires (preview): resultats par page, pause de frappe (ms)
+SEARCH_PAGE_SIZE = 50
+SEARCH_DELAY_MS = 250
+
+# Tableau des destinataires: lignes inserees par page ("Afficher plus")
+TABLE_VIEW_LIMIT = 1000
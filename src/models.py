@@ -12,6 +12,11 @@ class SendStatus(Enum):
     PENDING = "pending"
     SUCCESS = "success"
     FAILED = "failed"
+    # Exclu: adresse en liste d'opposition
+    SUPPRESSED = "suppressed"
+    # Retour de remise (DSN): echec definitif ou temporaire
+    BOUNCED_HARD = "bounced_hard"
+    BOUNCED_SOFT = "bounced_soft"
 
 
 @dataclass
@@ -25,6 +30,9 @@ class Recipient:
     images: List[Tuple[bytes, str]] = field(default_factory=list)
     status: SendStatus = SendStatus.PENDING
     error: Optional[str] = None
+    # Message-ID et date d'envoi (timestamp), pour relier les retours
+    message_id: Optional[str] = None
+    sent_at: Optional[float] = None
 
 
 @dataclass
@@ -34,12 +42,23 @@ class SMTPConfig:
     port: int = 587
     email: str = ""
     password: str = ""
+    # STARTTLS hors port 465 (desactivable pour un relais local sans TLS)
+    use_tls: bool = True
 
     def is_valid(self) -> bool:
         """Verifie si la configuration est complete."""
         return all([self.server, self.email, self.password])
 
 
+@dataclass
+class SendWindow:
+    """Plage horaire autorisee pour l'envoi planifie."""
+    start: str = "09:00"
+    end: str = "18:00"
+    # Jours de la semaine (0 = lundi)
+    days: Tuple[int, ...] = (0, 1, 2, 3, 4)
+
+
 
 
 @dataclass
@@ -50,3 +69,5 @@ class AppState:
     subject: str = "Information importante"
     body: str = "Bonjour {{prenom}},\n\nJ'espere que vous allez bien.\n\nJe me permets de vous contacter concernant votre dossier.\nN'hesitez pas a revenir vers moi si vous avez des questions.\n\nBien cordialement,\nL'equipe"
     default_image: Optional[bytes] = None
+    # Fichiers importes (report des resultats d'envoi)
+    source_files: List[str] = field(default_factory=list)
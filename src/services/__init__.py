@@ -4,5 +4,25 @@ Services de l'application.
 
 from .email_service import EmailService
 from .data_service import DataService
+from .image_service import ImageOptimizer
+from .smtp_session import SMTPSession, ResumableSSLContext
+from .render_service import RenderPool
+from .send_engine import SendEngine
+from .suppression_service import SuppressionList
+from .dryrun_service import MessageStore, DryRunSession
+from .source_service import RecipientSource, ImageFolder
+from .estimate_service import CampaignEstimator, CampaignEstimate
+from .scheduler_service import CampaignScheduler
+from .bounce_service import MessageIndex, BounceService
+from .preflight_service import PreflightService, PreflightReport
+from .project_service import ProjectService
+from .failure_service import FailureService, FailureIndex, Failure
+from .search_service import RecipientSearch
+from .table_service import RecipientTable
+from .diff_service import DiffService, RecipientDiff
 
-__all__ = ['EmailService', 'DataService']
+__all__ = ['EmailService', 'DataService', 'ImageOptimizer', 'SMTPSession', 'ResumableSSLContext', 'RenderPool', 'SendEngine',
+           'SuppressionList', 'MessageStore', 'DryRunSession', 'CampaignEstimator', 'CampaignEstimate',
+           'CampaignScheduler', 'MessageIndex', 'BounceService', 'PreflightService', 'PreflightReport',
+           'RecipientSource', 'ImageFolder', 'ProjectService', 'FailureService', 'FailureIndex', 'Failure',
+           'RecipientSearch', 'RecipientTable', 'DiffService', 'RecipientDiff']
@@ -0,0 +1,295 @@
+"""
+Suivi des Message-ID envoyes et traitement des retours (DSN, RFC 3464).
+"""
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..config import MESSAGE_INDEX_FILE, DSN_MAX_BYTES
+from ..models import Recipient, SendStatus
+from .data_service import DataService
+
+
+# Champs du rapport de remise (message/delivery-status)
+_STATUS_RE = re.compile(rb"(?im)^Status:[ \t]*([245])\.(\d{1,3})\.(\d{1,3})")
+_ACTION_RE = re.compile(rb"(?im)^Action:[ \t]*([a-z]+)")
+_FINAL_RCPT_RE = re.compile(rb"(?im)^(?:Final|Original)-Recipient:[ \t]*[^;\r\n]*;[ \t]*<?([^>\s]+@[^>\s]+)>?")
+_DIAGNOSTIC_RE = re.compile(rb"(?im)^Diagnostic-Code:[ \t]*([^\r\n]*(?:\r?\n[ \t]+[^\r\n]*)*)")
+# Message-ID des en-tetes renvoyes (le premier est celui du DSN lui-meme)
+_MESSAGE_ID_RE = re.compile(rb"(?im)^Message-ID:[ \t]*(?:\r?\n[ \t]+)?(<[^>\r\n]+>)")
+_HEADER_END_RE = re.compile(rb"\r?\n\r?\n")
+
+# Separateur de messages mbox
+_MBOX_FROM = b"From "
+
+
+@dataclass
+class Bounce:
+    """Retour de remise lu dans un DSN."""
+    # Message-ID du message d'origine (None si absent du DSN)
+    message_id: Optional[str]
+    # Adresse du destinataire (Final-Recipient, ou resolue par Message-ID)
+    email: Optional[str]
+    # True: echec definitif (5.x.x), False: temporaire (4.x.x, Action: delayed)
+    hard: bool
+    status: str
+    diagnostic: str = ""
+
+
+class MessageIndex:
+    """
+    Index persistant Message-ID -> adresse des messages envoyes.
+
+    Fichier texte en ajout seul (une ligne par envoi: Message-ID, adresse,
+    horodatage separes par des tabulations). La resolution relit le fichier
+    en flux et ne garde en memoire que les Message-ID demandes.
+    """
+
+    _default = None
+
+    def __init__(self, path: str = MESSAGE_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def default(cls) -> "MessageIndex":
+        """Index partage par l'application."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def record(self, message_id: str, email: str, sent_at: Optional[float] = None):
+        """Enregistre un message envoye (ecrit immediatement)."""
+        if not message_id:
+            return
+        line = f"{message_id}\t{email}\t{int(sent_at or time.time())}\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def resolve(self, message_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Retrouve l'adresse de chaque Message-ID connu.
+
+        Returns:
+            Dictionnaire {Message-ID: adresse} (Message-ID inconnus absents)
+        """
+        wanted: Set[str] = set(message_ids)
+        found: Dict[str, str] = {}
+        if not wanted or not os.path.exists(self.path):
+            return found
+        with open(self.path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                message_id, _, rest = line.partition("\t")
+                if message_id in wanted:
+                    found[message_id] = rest.partition("\t")[0]
+        return found
+
+    def close(self):
+        """Ferme le fichier d'index."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class BounceService:
+    """Lecture en flux d'archives de DSN (mbox ou Maildir) et application des retours."""
+
+    @staticmethod
+    def iter_mbox(path: str, max_bytes: int = DSN_MAX_BYTES) -> Iterator[bytes]:
+        """
+        Parcourt un fichier mbox message par message.
+        Seuls les `max_bytes` premiers octets de chaque message sont gardes
+        (le rapport de remise precede le message renvoye).
+        """
+        chunks: List[bytes] = []
+        size = 0
+        previous_blank = True
+        started = False
+        with open(path, "rb") as f:
+            for line in f:
+                if previous_blank and line.startswith(_MBOX_FROM):
+                    if started:
+                        yield b"".join(chunks)
+                    chunks, size, started = [], 0, True
+                    previous_blank = False
+                    continue
+                previous_blank = line in (b"\n", b"\r\n")
+                if size < max_bytes:
+                    chunks.append(line)
+                    size += len(line)
+        if started:
+            yield b"".join(chunks)
+
+    @staticmethod
+    def iter_maildir(path: str, max_bytes: int = DSN_MAX_BYTES) -> Iterator[bytes]:
+        """Parcourt les messages d'un Maildir (new/ et cur/)."""
+        for sub in ("new", "cur"):
+            folder = os.path.join(path, sub)
+            if not os.path.isdir(folder):
+                continue
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        with open(entry.path, "rb") as f:
+                            yield f.read(max_bytes)
+
+    @staticmethod
+    def parse_dsn(raw: bytes) -> Optional[Bounce]:
+        """
+        Extrait le retour d'un DSN (None si ce n'est pas un echec ou un retard).
+        """
+        status = _STATUS_RE.search(raw)
+        if not status:
+            return None
+        action = _ACTION_RE.search(raw)
+        action = action.group(1).lower() if action else b""
+        if action in (b"delivered", b"relayed", b"expanded"):
+            return None
+
+        code = status.group(1)
+        if code == b"2":
+            return None
+        hard = code == b"5" and action != b"delayed"
+
+        # Ignorer le Message-ID du DSN (en-tetes principaux)
+        header_end = _HEADER_END_RE.search(raw)
+        body_start = header_end.end() if header_end else 0
+        message_id = _MESSAGE_ID_RE.search(raw, body_start)
+
+        recipient = _FINAL_RCPT_RE.search(raw)
+        diagnostic = _DIAGNOSTIC_RE.search(raw)
+        return Bounce(
+            message_id=message_id.group(1).decode("ascii", "replace") if message_id else None,
+            email=recipient.group(1).decode("utf-8", "replace") if recipient else None,
+            hard=hard,
+            status=b".".join(status.groups()).decode("ascii"),
+            diagnostic=(
+                re.sub(r"\s+", " ", diagnostic.group(1).decode("utf-8", "replace")).strip()
+                if diagnostic else ""
+            )
+        )
+
+    @staticmethod
+    def scan(
+        path: str,
+        on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> Tuple[List[Bounce], Optional[str]]:
+        """
+        Lit une archive de DSN: dossier Maildir ou fichier mbox.
+
+        Args:
+            path: Chemin du Maildir ou du fichier mbox
+            on_progress: Appele tous les 1000 messages (messages lus, retours trouves)
+
+        Returns:
+            Tuple (liste des retours, message d'erreur ou None)
+        """
+        try:
+            messages = (
+                BounceService.iter_maildir(path) if os.path.isdir(path)
+                else BounceService.iter_mbox(path)
+            )
+            bounces = []
+            for count, raw in enumerate(messages, 1):
+                bounce = BounceService.parse_dsn(raw)
+                if bounce is not None:
+                    bounces.append(bounce)
+                if on_progress and count % 1000 == 0:
+                    on_progress(count, len(bounces))
+            return bounces, None
+        except Exception as e:
+            return [], str(e)
+
+    @staticmethod
+    def apply(
+        bounces: List[Bounce],
+        recipients: List[Recipient],
+        index: Optional[MessageIndex] = None,
+        suppression=None
+    ) -> Tuple[int, int, Optional[str]]:
+        """
+        Marque les destinataires en retour et exclut les echecs definitifs
+        (resolve, puis mark et suppress).
+
+        Args:
+            bounces: Retours lus par scan()
+            recipients: Destinataires a mettre a jour
+            index: Index des Message-ID envoyes
+            suppression: Liste d'opposition recevant les echecs definitifs
+
+        Returns:
+            Tuple (nombre d'echecs definitifs, nombre de temporaires, erreur ou None)
+        """
+        outcome = BounceService.resolve(bounces, index)
+        BounceService.mark(outcome, recipients)
+        return BounceService.suppress(outcome, suppression)
+
+    @staticmethod
+    def resolve(bounces: List[Bounce], index: Optional[MessageIndex] = None) -> Dict[str, Bounce]:
+        """
+        Retour retenu pour chaque adresse.
+
+        Le Message-ID (via l'index) est prioritaire sur l'adresse du DSN,
+        souvent reecrite par les serveurs intermediaires.
+
+        Returns:
+            Dictionnaire {adresse normalisee: retour}
+        """
+        resolved = {}
+        if index is not None:
+            resolved = index.resolve(b.message_id for b in bounces if b.message_id)
+
+        normalize = DataService.normalize_email
+        # Un echec definitif l'emporte sur un retard pour la meme adresse
+        outcome: Dict[str, Bounce] = {}
+        for bounce in bounces:
+            email = resolved.get(bounce.message_id) or bounce.email
+            if not email:
+                continue
+            key = normalize(email)
+            if key not in outcome or (bounce.hard and not outcome[key].hard):
+                outcome[key] = bounce
+        return outcome
+
+    @staticmethod
+    def mark(outcome: Dict[str, Bounce], recipients: List[Recipient]) -> int:
+        """
+        Met a jour le statut des destinataires en retour (thread de l'interface).
+
+        Returns:
+            Nombre de destinataires marques
+        """
+        normalize = DataService.normalize_email
+        marked = 0
+        for recipient in recipients:
+            bounce = outcome.get(normalize(recipient.email))
+            if bounce is not None:
+                recipient.status = SendStatus.BOUNCED_HARD if bounce.hard else SendStatus.BOUNCED_SOFT
+                recipient.error = f"{bounce.status} {bounce.diagnostic}".strip()
+                marked += 1
+        return marked
+
+    @staticmethod
+    def suppress(outcome: Dict[str, Bounce], suppression=None) -> Tuple[int, int, Optional[str]]:
+        """
+        Ajoute les echecs definitifs a la liste d'opposition.
+
+        Returns:
+            Tuple (nombre d'echecs definitifs, nombre de temporaires, erreur ou None)
+        """
+        hard = [email for email, bounce in outcome.items() if bounce.hard]
+        error = None
+        if suppression is not None and hard:
+            suppression.add(hard)
+            error = suppression.save()
+        return len(hard), len(outcome) - len(hard), error
@@ -2,58 +2,1101 @@
 Service de gestion des données (fichiers, templates).
 """
 
+import csv
 import os
+import re
+import shutil
 import zipfile
-from typing import Optional, Dict, List, Tuple
-
-import pandas as pd
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import unescape as xml_unescape
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, Dict, List, Tuple
 
+from ..config import DEDUP_KEEP, RECIPIENT_COLUMNS, IMPORT_CHUNK_ROWS, RESULT_COLUMNS
 from ..models import Recipient
 
+# pandas (long a importer) est charge a la premiere lecture de fichier
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Progression d'import: (lignes lues, total estime ou 0 si inconnu)
+ProgressCallback = Callable[[int, int], None]
+
+
+_PYARROW_MISSING = "pyarrow requis pour les formats Parquet/Arrow (pip install pyarrow)"
+
+
+def _require_pyarrow():
+    """Verifie la presence de pyarrow (dependance optionnelle) avec un message lisible."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(_PYARROW_MISSING) from None
+
+
+def _cell_str(value) -> str:
+    """Texte d'une cellule (vide si absente, sans '.0' pour les entiers)."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+# Lecture directe du XML des .xlsx (SpreadsheetML)
+_XMLNS_RE = re.compile(rb'xmlns="([^"]+)"')
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+# Ecriture directe d'un .xlsx minimal (une feuille, chaines en ligne)
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Relationships xmlns="{_PKG_REL_NS}">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" Type="'
+        'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        f'xmlns:r="{_REL_NS}"><sheets><sheet name="Feuil1" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Relationships xmlns="{_PKG_REL_NS}">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" Type="'
+        'http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+# Caracteres a echapper, et caracteres de controle interdits en XML 1.0
+_XML_ESCAPE = {ord("&"): "&amp;", ord("<"): "&lt;", ord(">"): "&gt;"}
+_XML_ESCAPE.update({c: None for c in range(32) if c not in (9, 10, 13)})
+
+
+def _xml_text(value) -> str:
+    """Texte echappe pour un noeud XML (chemin rapide sans table de traduction)."""
+    text = str(value)
+    if not text.isprintable():
+        return text.translate(_XML_ESCAPE)
+    if "&" in text or "<" in text or ">" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+
+def _write_xlsx(filepath: str, header: List[str], rows: Iterable[Tuple], buffer_rows: int = 10000):
+    """
+    Ecrit un .xlsx d'une feuille en flux (texte uniquement, sans styles).
+    Beaucoup plus rapide qu'openpyxl pour des centaines de milliers de lignes.
+    """
+    def row_xml(number: int, values) -> str:
+        cells = "".join(
+            f'<c t="inlineStr"><is><t xml:space="preserve">{_xml_text(v)}</t></is></c>'
+            if v not in (None, "") else "<c/>"
+            for v in values
+        )
+        return f'<row r="{number}">{cells}</row>'
+
+    with zipfile.ZipFile(filepath, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as z:
+        for name, content in _XLSX_PARTS.items():
+            z.writestr(name, content)
+        with z.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as f:
+            f.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            f.write(row_xml(1, header).encode("utf-8"))
+            buffer = []
+            for number, values in enumerate(rows, 2):
+                buffer.append(row_xml(number, values))
+                if len(buffer) >= buffer_rows:
+                    f.write("".join(buffer).encode("utf-8"))
+                    buffer = []
+            f.write("".join(buffer).encode("utf-8"))
+            f.write(b"</sheetData></worksheet>")
+
+
+def _column_index(letters: str) -> int:
+    """Index (0) d'une colonne Excel: A -> 0, AB -> 27."""
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def _xlsx_first_sheet(z: zipfile.ZipFile) -> Tuple[str, str]:
+    """Chemin de la premiere feuille et espace de noms SpreadsheetML."""
+    workbook = z.read("xl/workbook.xml")
+    match = _XMLNS_RE.search(workbook)
+    ns = "{%s}" % match.group(1).decode() if match else ""
+    path = "xl/worksheets/sheet1.xml"
+    try:
+        root = ET.fromstring(workbook)
+        sheet = root.find(f"{ns}sheets/{ns}sheet")
+        rel_id = sheet.get(f"{{{_REL_NS}}}id") if sheet is not None else None
+        rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+        for rel in rels.iter(f"{{{_PKG_REL_NS}}}Relationship"):
+            if rel.get("Id") == rel_id:
+                target = rel.get("Target").lstrip("/")
+                path = target if target.startswith("xl/") else f"xl/{target}"
+                break
+    except (KeyError, ET.ParseError, AttributeError):
+        pass
+    return path, ns
+
+
+def _xlsx_shared_strings(z: zipfile.ZipFile, ns: str) -> List[str]:
+    """Table des chaines partagees (texte de chaque <si>)."""
+    if "xl/sharedStrings.xml" not in z.namelist():
+        return []
+    strings = []
+    si_tag, t_tag, run_t = f"{ns}si", f"{ns}t", f"{ns}r/{ns}t"
+    root = None
+    with z.open("xl/sharedStrings.xml") as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+            elif elem.tag == si_tag:
+                # Texte simple ou formate (runs), sans la lecture phonetique (rPh)
+                texts = elem.findall(run_t) or elem.findall(t_tag)
+                strings.append("".join(t.text or "" for t in texts))
+                # Chaines deja lues retirees de la racine
+                root.clear()
+    return strings
+
+
+def _column_letters(index: int) -> str:
+    """Lettres d'une colonne Excel: 0 -> A, 27 -> AB."""
+    letters = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(65 + rest) + letters
+    return letters
+
+
+# Report des resultats dans un .xlsx existant (edition en flux du XML de la feuille)
+_SHEET_DATA_RE = re.compile(rb"<(\w+:)?sheetData\b")
+_DIMENSION_RE = re.compile(rb'(<(?:\w+:)?dimension\s+ref="[A-Z]+\d+)(?::([A-Z]+)(\d+))?"')
+_ROW_NUMBER_RE = re.compile(rb'\sr="(\d+)"')
+_SPANS_RE = re.compile(rb'\sspans="[^"]*"')
+_CELL_REF_RE = re.compile(rb'\sr="([A-Z]+)\d*"')
+_CELL_TYPE_RE = re.compile(rb'\st="(\w+)"')
+_CELL_VALUE_RE = re.compile(rb"<(?:\w+:)?v>(.*?)</(?:\w+:)?v>", re.S)
+_INLINE_TEXT_RE = re.compile(rb"<(?:\w+:)?t(?:\s[^>]*)?>(.*?)</(?:\w+:)?t>", re.S)
+_XML_ENTITIES = {"&quot;": '"', "&apos;": "'"}
+
+
+def _xlsx_cell_text(attrs: bytes, inner: Optional[bytes], strings: List[str]) -> str:
+    """Texte d'une cellule <c> a partir de ses attributs et de son contenu bruts."""
+    if not inner:
+        return ""
+    kind = _CELL_TYPE_RE.search(attrs)
+    kind = kind.group(1) if kind else b"n"
+    if kind == b"inlineStr":
+        text = b"".join(_INLINE_TEXT_RE.findall(inner))
+    else:
+        value = _CELL_VALUE_RE.search(inner)
+        if value is None:
+            return ""
+        if kind == b"s":
+            return strings[int(value.group(1))].strip()
+        text = value.group(1)
+    text = text.decode("utf-8")
+    return (xml_unescape(text, _XML_ENTITIES) if "&" in text else text).strip()
+
+
+def _xlsx_write_back(
+    source: str,
+    target: str,
+    results: Dict[str, Tuple[str, ...]],
+    read_size: int = 1 << 22
+) -> int:
+    """
+    Copie un .xlsx en ajoutant (ou remplacant) les colonnes RESULT_COLUMNS
+    de la premiere feuille. Le XML de la feuille est edite en flux, ligne par
+    ligne: styles, formules, autres feuilles et cellules existantes sont
+    conserves tels quels.
+
+    Args:
+        source: Classeur d'origine
+        target: Classeur de sortie (different de source)
+        results: {adresse normalisee: valeurs RESULT_COLUMNS}
+
+    Returns:
+        Nombre de lignes mises a jour
+    """
+    normalize = DataService.normalize_email
+    state = None
+    with zipfile.ZipFile(source) as zin:
+        sheet_path, ns = _xlsx_first_sheet(zin)
+        strings = _xlsx_shared_strings(zin, ns)
+
+        with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zout:
+            for info in zin.infolist():
+                if info.filename != sheet_path:
+                    with zin.open(info) as src, zout.open(info, "w", force_zip64=True) as dst:
+                        shutil.copyfileobj(src, dst, read_size)
+                    continue
+
+                with zin.open(info) as src:
+                    head = src.read(read_size)
+                    while not _SHEET_DATA_RE.search(head):
+                        more = src.read(read_size)
+                        if not more:
+                            raise ValueError("Feuille sans donnees")
+                        head += more
+                    prefix = _SHEET_DATA_RE.search(head).group(1) or b""
+                    state = _XlsxRowRewriter(prefix, results, strings, normalize)
+
+                    sheet_info = zipfile.ZipInfo(info.filename, info.date_time)
+                    sheet_info.compress_type = zipfile.ZIP_DEFLATED
+                    with zout.open(sheet_info, "w", force_zip64=True) as dst:
+                        buffer, chunk, first = head, head, True
+                        while chunk:
+                            chunk = src.read(read_size)
+                            buffer += chunk
+                            # Traiter jusqu'a la derniere ligne complete
+                            cut = buffer.rfind(state.row_close) + len(state.row_close) if chunk else len(buffer)
+                            if cut < len(state.row_close):
+                                continue
+                            region, buffer = buffer[:cut], buffer[cut:]
+                            output = state.process(region)
+                            if first:
+                                if state.header is None:
+                                    raise ValueError("Feuille vide")
+                                output = _DIMENSION_RE.sub(state.dimension, output, count=1)
+                                first = False
+                            dst.write(output)
+    if state is None:
+        raise ValueError(f"Feuille introuvable: {sheet_path}")
+    return state.updated
+
+
+class _XlsxRowRewriter:
+    """Reecriture des lignes <row> d'une feuille (utilise par _xlsx_write_back)."""
+
+    def __init__(self, prefix: bytes, results, strings: List[str], normalize):
+        self.prefix = prefix.decode()
+        self.results = results
+        self.strings = strings
+        self.normalize = normalize
+        self.row_open = b"<%srow" % prefix
+        self.row_close = b"</%srow>" % prefix
+        self.cell_re = re.compile(rb"<%sc\b([^>]*?)(?:/>|>(.*?)</%sc>)" % (prefix, prefix), re.S)
+        self.header: Optional[Dict[int, str]] = None
+        self.email_re = None
+        self.strip_re = None
+        self.email_pos = 0
+        self.result_pos: List[int] = []
+        self.templates: List[Tuple[str, str, str]] = []
+        self.last_column = 0
+        # Ajout en fin de ligne possible (cellules referencees, resultats en dernier)
+        self.append = False
+        self._columns: Dict[bytes, int] = {}
+        self.row_number = 0
+        self.updated = 0
+
+    def process(self, region: bytes) -> bytes:
+        """Reecrit un bloc de XML se terminant par une ligne complete (ou la fin de la feuille)."""
+        pieces = region.split(self.row_close)
+        output = []
+        for piece in pieces[:-1]:
+            # Chaque morceau se termine par le contenu d'une ligne (<row ...>cellules)
+            start = piece.rfind(self.row_open)
+            output.append(piece[:start])
+            output.append(self.rewrite(piece[start:]))
+            output.append(self.row_close)
+        output.append(pieces[-1])
+        return b"".join(output)
+
+    def cell(self, index: int, row, value: str) -> str:
+        """Cellule texte en ligne de la colonne de resultat numero `index`."""
+        start, middle, end = self.templates[index]
+        return f"{start}{row}{middle}{_xml_text(value)}{end}"
+
+    def split(self, row: bytes) -> Tuple[bytes, int, bytes]:
+        """(balise ouvrante sans spans, numero de ligne, cellules)."""
+        start = row.index(b">") + 1
+        head = row[:start]
+        number = _ROW_NUMBER_RE.search(head)
+        self.row_number = int(number.group(1)) if number else self.row_number + 1
+        if b"spans" in head:
+            head = _SPANS_RE.sub(b"", head)
+        return head, self.row_number, row[start:]
+
+    def cells(self, body: bytes) -> Dict[int, re.Match]:
+        """Cellules d'une ligne par position (references r ou ordre d'apparition)."""
+        cells = {}
+        position = -1
+        for match in self.cell_re.finditer(body):
+            ref = _CELL_REF_RE.search(match.group(1))
+            if ref:
+                letters = ref.group(1)
+                position = self._columns.get(letters)
+                if position is None:
+                    position = self._columns[letters] = _column_index(letters.decode())
+            else:
+                position += 1
+            cells[position] = match
+        return cells
+
+    def rebuild(self, head: bytes, number: int, cells: Dict[int, re.Match], values) -> bytes:
+        """Ligne reconstruite, cellules dans l'ordre des colonnes."""
+        parts = {position: match.group(0) for position, match in cells.items()}
+        for index, (position, value) in enumerate(zip(self.result_pos, values)):
+            if value:
+                parts[position] = self.cell(index, number, value).encode("utf-8")
+            else:
+                parts.pop(position, None)
+        return head + b"".join(parts[k] for k in sorted(parts))
+
+    def dimension(self, match: re.Match) -> bytes:
+        """Etend la plage declaree de la feuille aux colonnes ajoutees."""
+        last = max(self.last_column, _column_index(match.group(2).decode()) if match.group(2) else 0)
+        rows = match.group(3) or b"1"
+        return match.group(1) + b":" + _column_letters(last).encode() + rows + b'"'
+
+    def rewrite(self, row: bytes) -> bytes:
+        """Ajoute les resultats a une ligne (sans la balise fermante)."""
+        if self.header is None:
+            return self.start(row)
+
+        # Ligne sans cellule email referencee (cellules sans attribut r): cas general
+        email = self.email_re.search(row) if self.append else None
+        if email is not None:
+            # Numero de ligne repris de la reference de la cellule email
+            number = email.group(2).decode()
+            self.row_number = int(number)
+            values = self.results.get(self.normalize(_xlsx_cell_text(email.group(1), email.group(3), self.strings)))
+            if values is None:
+                return row
+            head_end = row.index(b">") + 1
+            head = row[:head_end]
+            if b"spans" in head:
+                head = _SPANS_RE.sub(b"", head)
+            body = row[head_end:]
+            if self.strip_re is not None:
+                body = self.strip_re.sub(b"", body)
+            self.updated += 1
+            cells = "".join(self.cell(index, number, value) for index, value in enumerate(values) if value)
+            return head + body + cells.encode("utf-8")
+
+        head, number, body = self.split(row)
+        cells = self.cells(body)
+        email = cells.get(self.email_pos)
+        if email is None:
+            return row
+        values = self.results.get(self.normalize(_xlsx_cell_text(email.group(1), email.group(2), self.strings)))
+        if values is None:
+            return row
+        self.updated += 1
+        return self.rebuild(head, number, cells, values)
+
+    def start(self, row: bytes) -> bytes:
+        """Lit l'en-tete et choisit la methode de reecriture."""
+        head, number, body = self.split(row)
+        cells = self.cells(body)
+        self.header = header = {
+            position: _xlsx_cell_text(m.group(1), m.group(2), self.strings)
+            for position, m in cells.items()
+        }
+        names = {name: position for position, name in header.items()}
+        if "email" not in names:
+            raise ValueError("Colonne email introuvable")
+        self.email_pos = names["email"]
+
+        end = max(header) if header else -1
+        self.result_pos = []
+        for name in RESULT_COLUMNS:
+            if name not in names:
+                end += 1
+                names[name] = end
+            self.result_pos.append(names[name])
+        self.last_column = max(self.result_pos)
+        p = self.prefix
+        self.templates = [
+            (f'<{p}c r="{_column_letters(position)}', f'" t="inlineStr"><{p}is><{p}t xml:space="preserve">',
+             f"</{p}t></{p}is></{p}c>")
+            for position in self.result_pos
+        ]
+
+        others = [position for position in header if position not in self.result_pos]
+        referenced = all(_CELL_REF_RE.search(m.group(1)) for m in cells.values())
+        self.append = referenced and min(self.result_pos) > max(others, default=-1)
+        if self.append:
+            prefix = p.encode()
+            self.email_re = re.compile(
+                rb'<%sc\b([^>]*?\sr="%s(\d+)"[^>]*?)(?:/>|>(.*?)</%sc>)'
+                % (prefix, _column_letters(self.email_pos).encode(), prefix),
+                re.S
+            )
+            existing = [_column_letters(position).encode() for position in self.result_pos if position in header]
+            if existing:
+                self.strip_re = re.compile(
+                    rb'<%sc\b[^>]*?\sr="(?:%s)\d+"[^>]*?(?:/>|>.*?</%sc>)' % (prefix, b"|".join(existing), prefix),
+                    re.S
+                )
+        return self.rebuild(head, number, cells, RESULT_COLUMNS)
+
 
 class DataService:
     """Service de gestion des données."""
 
     @staticmethod
-    def load_file(filepath: str) -> Tuple[List[Recipient], Optional[str]]:
+    def normalize_email(email: str) -> str:
+        """
+        Normalise une adresse pour les comparaisons (espaces, casse).
+
+        Args:
+            email: Adresse telle que saisie ou importee
+
+        Returns:
+            Adresse normalisee
+        """
+        return str(email).strip().lower()
+
+    @staticmethod
+    def load_file(
+        filepath: str,
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Tuple[List[Recipient], Optional[str]]:
         """
         Charge un fichier Excel ou CSV.
+        Seules les colonnes utiles sont lues; les .xlsx sont lus en flux.
 
         Args:
             filepath: Chemin du fichier
+            on_progress: Appele regulierement avec (lignes lues, total estime ou 0)
 
         Returns:
             Tuple (liste de destinataires, message d'erreur ou None)
         """
         try:
-            # Charger selon le format
-            if filepath.endswith('.csv'):
-                df = pd.read_csv(filepath)
-            else:
-                df = pd.read_excel(filepath)
-
-            # Vérifier les colonnes requises
-            required = ['email', 'nom', 'prenom', 'numero']
-            missing = [c for c in required if c not in df.columns]
+            rows = DataService.iter_file(filepath)
 
+            # Vérifier les colonnes requises (premier element: en-tete)
+            header, total = next(rows)
+            missing = [c for c in RECIPIENT_COLUMNS if c not in header]
             if missing:
                 return [], f"Colonnes manquantes : {', '.join(missing)}"
 
             # Créer les destinataires
             recipients = []
-            for _, row in df.iterrows():
-                recipients.append(Recipient(
-                    email=str(row['email']).strip(),
-                    nom=str(row['nom']).strip(),
-                    prenom=str(row['prenom']).strip(),
-                    numero=str(row['numero']).strip()
-                ))
+            for chunk in rows:
+                recipients.extend(
+                    Recipient(email=email, nom=nom, prenom=prenom, numero=numero)
+                    for email, nom, prenom, numero in chunk
+                )
+                if on_progress:
+                    on_progress(len(recipients), total)
 
             return recipients, None
 
         except Exception as e:
             return [], str(e)
 
+    @staticmethod
+    def iter_file(filepath: str, chunk_rows: int = IMPORT_CHUNK_ROWS) -> Iterator:
+        """
+        Lit un fichier de destinataires par lots, selon son extension.
+
+        Yields:
+            D'abord (colonnes trouvees, nombre de lignes estime ou 0), puis des
+            lots de tuples (email, nom, prenom, numero)
+        """
+        lower = filepath.lower()
+        if lower.endswith('.csv'):
+            return DataService._iter_csv(filepath, chunk_rows)
+        if lower.endswith(('.parquet', '.pq')):
+            return DataService._iter_parquet(filepath, chunk_rows)
+        if lower.endswith(('.arrow', '.feather', '.ipc')):
+            return DataService._iter_arrow(filepath)
+        if lower.endswith(('.xlsx', '.xlsm')):
+            return DataService.iter_excel_rows(filepath, chunk_rows)
+        import pandas as pd
+
+        return DataService._iter_dataframe(pd.read_excel(filepath, dtype=str))
+
+    @staticmethod
+    def iter_excel_rows(filepath: str, chunk_rows: int = IMPORT_CHUNK_ROWS) -> Iterator:
+        """
+        Lit la premiere feuille d'un .xlsx en flux, sans charger le classeur.
+        Utilise python-calamine si installe, sinon lit directement le XML de
+        la feuille: seules les cellules des colonnes utiles sont converties.
+
+        Yields:
+            D'abord (colonnes trouvees, nombre de lignes estime ou 0), puis des
+            lots de tuples (email, nom, prenom, numero) de `chunk_rows` lignes
+        """
+        try:
+            from python_calamine import CalamineWorkbook
+        except ImportError:
+            CalamineWorkbook = None
+
+        if CalamineWorkbook is not None:
+            sheet = CalamineWorkbook.from_path(filepath).get_sheet_by_index(0)
+            rows = iter(sheet.iter_rows() if hasattr(sheet, "iter_rows") else sheet.to_python())
+            total = max(0, sheet.height - 1)
+        else:
+            rows = DataService._iter_xlsx_xml(filepath)
+            total = next(rows)
+
+        header = [_cell_str(value) for value in next(rows, ())]
+        yield header, total
+        if any(c not in header for c in RECIPIENT_COLUMNS):
+            return
+
+        positions = [header.index(c) for c in RECIPIENT_COLUMNS]
+        last = max(positions)
+        chunk = []
+        for row in rows:
+            if len(row) <= last:
+                row = tuple(row) + (None,) * (last + 1 - len(row))
+            values = tuple(_cell_str(row[p]) for p in positions)
+            if not any(values):
+                continue
+            chunk.append(values)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _iter_xlsx_xml(filepath: str) -> Iterator:
+        """
+        Lignes d'une feuille .xlsx lues avec iterparse (memoire constante).
+        La premiere ligne fixe les colonnes utiles; pour les suivantes, seules
+        ces cellules sont converties (les autres valent None).
+
+        Yields:
+            D'abord le nombre de lignes estime (0 si inconnu), puis chaque ligne (liste)
+        """
+        with zipfile.ZipFile(filepath) as z:
+            sheet_path, ns = _xlsx_first_sheet(z)
+            strings = _xlsx_shared_strings(z, ns)
+            row_tag, c_tag, v_tag = f"{ns}row", f"{ns}c", f"{ns}v"
+            is_tag, t_tag = f"{ns}is", f"{ns}t"
+            dimension_tag, sheet_data_tag = f"{ns}dimension", f"{ns}sheetData"
+
+            columns: Dict[str, int] = {}
+            wanted = None
+            started = False
+            sheet_data = None
+
+            with z.open(sheet_path) as f:
+                for event, elem in ET.iterparse(f, events=("start", "end")):
+                    if event == "start":
+                        if elem.tag == sheet_data_tag:
+                            sheet_data = elem
+                        continue
+                    if elem.tag == dimension_tag and not started:
+                        ref = elem.get("ref", "")
+                        last = ref.split(":")[-1].lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+                        yield max(0, int(last) - 1) if last.isdigit() else 0
+                        started = True
+                        continue
+                    if elem.tag != row_tag:
+                        continue
+                    if not started:
+                        yield 0
+                        started = True
+
+                    row = []
+                    position = -1
+                    for cell in elem.iter(c_tag):
+                        ref = cell.get("r")
+                        if ref:
+                            letters = ref.rstrip("0123456789")
+                            index = columns.get(letters)
+                            if index is None:
+                                index = columns[letters] = _column_index(letters)
+                            position = index
+                        else:
+                            position += 1
+                        if wanted is not None and position not in wanted:
+                            continue
+                        if len(row) <= position:
+                            row.extend([None] * (position + 1 - len(row)))
+
+                        kind = cell.get("t")
+                        if kind == "inlineStr":
+                            inline = cell.find(is_tag)
+                            row[position] = "".join(t.text or "" for t in inline.iter(t_tag)) if inline is not None else ""
+                            continue
+                        value = cell.find(v_tag)
+                        if value is None or value.text is None:
+                            continue
+                        text = value.text
+                        if kind == "s":
+                            row[position] = strings[int(text)]
+                        elif kind in (None, "n") and ("." in text or "E" in text):
+                            row[position] = float(text)
+                        else:
+                            row[position] = text
+
+                    if wanted is None:
+                        header = [_cell_str(value) for value in row]
+                        wanted = {header.index(c) for c in RECIPIENT_COLUMNS if c in header}
+                    yield row
+
+                    # Liberer les lignes deja lues (sinon gardees par sheetData)
+                    if sheet_data is not None:
+                        sheet_data.clear()
+                    else:
+                        elem.clear()
+
+    @staticmethod
+    def _iter_csv(filepath: str, chunk_rows: int = IMPORT_CHUNK_ROWS) -> Iterator:
+        """Lit un CSV par lots (colonnes utiles seulement, texte brut). Meme protocole qu'iter_excel_rows."""
+        import pandas as pd
+
+        header = [str(c).strip() for c in pd.read_csv(filepath, nrows=0).columns]
+        yield header, 0
+        if any(c not in header for c in RECIPIENT_COLUMNS):
+            return
+        reader = pd.read_csv(
+            filepath,
+            usecols=lambda c: str(c).strip() in RECIPIENT_COLUMNS,
+            dtype=str,
+            keep_default_na=False,
+            chunksize=chunk_rows
+        )
+        for df in reader:
+            yield from DataService._iter_dataframe(df, header=False)
+
+    @staticmethod
+    def _iter_parquet(filepath: str, chunk_rows: int = IMPORT_CHUNK_ROWS) -> Iterator:
+        """Lit un Parquet par lots (memory-map, colonnes utiles seulement)."""
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(filepath, memory_map=True)
+        header = parquet.schema_arrow.names
+        yield header, parquet.metadata.num_rows
+        if any(c not in header for c in RECIPIENT_COLUMNS):
+            return
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=RECIPIENT_COLUMNS):
+            yield DataService._batch_rows(batch)
+
+    @staticmethod
+    def _iter_arrow(filepath: str) -> Iterator:
+        """Lit un fichier Arrow IPC / Feather v2 (memory-map, colonnes utiles seulement)."""
+        _require_pyarrow()
+        import pyarrow as pa
+
+        with pa.memory_map(filepath, "r") as source:
+            try:
+                reader = pa.ipc.open_file(source)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+                total = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                # Format flux (stream) plutot que fichier
+                source.seek(0)
+                reader = pa.ipc.open_stream(source)
+                batches, total = iter(reader), 0
+
+            header = reader.schema.names
+            yield header, total
+            if any(c not in header for c in RECIPIENT_COLUMNS):
+                return
+            for batch in batches:
+                yield DataService._batch_rows(batch.select(RECIPIENT_COLUMNS))
+
+    @staticmethod
+    def _batch_rows(batch) -> List[Tuple[str, ...]]:
+        """Convertit un lot Arrow (colonnes RECIPIENT_COLUMNS) en tuples de texte."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        columns = []
+        for name in RECIPIENT_COLUMNS:
+            column = batch.column(name)
+            if pa.types.is_floating(column.type):
+                # 12.0 -> "12" comme pour Excel
+                values = [_cell_str(v) for v in column.to_pylist()]
+            else:
+                if not pa.types.is_string(column.type):
+                    column = pc.cast(column, pa.string())
+                values = [v.strip() for v in pc.fill_null(column, "").to_pylist()]
+            columns.append(values)
+        # Lignes vides ignorees, comme pour les classeurs
+        return [row for row in zip(*columns) if any(row)]
+
+    @staticmethod
+    def _iter_dataframe(df: "pd.DataFrame", header: bool = True) -> Iterator:
+        """Lots de tuples a partir d'un DataFrame (sans iterrows)."""
+        df.columns = [str(c).strip() for c in df.columns]
+        if header:
+            yield list(df.columns), len(df)
+            if any(c not in df.columns for c in RECIPIENT_COLUMNS):
+                return
+        columns = [df[c].fillna("").astype(str).str.strip().tolist() for c in RECIPIENT_COLUMNS]
+        # Lignes vides (",,,") ignorees, comme pour les classeurs
+        yield [row for row in zip(*columns) if any(row)]
+
+    @staticmethod
+    def load_files(
+        filepaths: List[str],
+        on_progress: Optional[ProgressCallback] = None
+    ) -> Tuple[List[Recipient], Optional[str]]:
+        """
+        Charge et concatene plusieurs fichiers (une seule campagne).
+
+        Args:
+            filepaths: Chemins des fichiers, dans l'ordre d'import
+            on_progress: Appele avec (lignes lues, total estime ou 0) du fichier en cours
+
+        Returns:
+            Tuple (liste de destinataires, message d'erreur ou None)
+        """
+        recipients = []
+        for filepath in filepaths:
+            loaded, error = DataService.load_file(filepath, on_progress)
+            if error:
+                return [], f"{os.path.basename(filepath)}: {error}"
+            recipients.extend(loaded)
+        return recipients, None
+
+    @staticmethod
+    def result_rows(recipients: List[Recipient]) -> Iterator[Tuple]:
+        """
+        Lignes d'export: colonnes RECIPIENT_COLUMNS puis RESULT_COLUMNS.
+        sent_at est au format ISO 8601 (vide si non envoye).
+        """
+        for r in recipients:
+            sent_at = (
+                datetime.fromtimestamp(r.sent_at).isoformat(timespec="seconds")
+                if r.sent_at else ""
+            )
+            yield (
+                r.email, r.nom, r.prenom, r.numero,
+                r.status.value, r.error or "", sent_at, r.message_id or ""
+            )
+
+    @staticmethod
+    def export_recipients(recipients: List[Recipient], filepath: str) -> Optional[str]:
+        """
+        Exporte les destinataires et leurs resultats d'envoi.
+        Format selon l'extension: .csv, .xlsx, .parquet, .arrow/.feather.
+
+        Args:
+            recipients: Destinataires a exporter
+            filepath: Fichier de sortie
+
+        Returns:
+            Message d'erreur ou None si succes
+        """
+        columns = RECIPIENT_COLUMNS + RESULT_COLUMNS
+        lower = filepath.lower()
+        try:
+            if lower.endswith(('.parquet', '.pq', '.arrow', '.feather', '.ipc')):
+                DataService._export_arrow(recipients, filepath, columns)
+            elif lower.endswith(('.xlsx', '.xlsm')):
+                _write_xlsx(filepath, columns, DataService.result_rows(recipients))
+            else:
+                with open(filepath, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                    writer.writerows(DataService.result_rows(recipients))
+            return None
+        except Exception as e:
+            return str(e)
+
+    @staticmethod
+    def _export_arrow(recipients: List[Recipient], filepath: str, columns: List[str]):
+        """Ecrit un Parquet ou un Arrow IPC (sent_at en timestamp)."""
+        _require_pyarrow()
+        import pyarrow as pa
+
+        data = {
+            "email": [r.email for r in recipients],
+            "nom": [r.nom for r in recipients],
+            "prenom": [r.prenom for r in recipients],
+            "numero": [r.numero for r in recipients],
+            "status": [r.status.value for r in recipients],
+            "error": [r.error for r in recipients],
+            "sent_at": pa.array(
+                [int(r.sent_at) if r.sent_at else None for r in recipients],
+                type=pa.timestamp("s")
+            ),
+            "message_id": [r.message_id for r in recipients],
+        }
+        table = pa.table({name: data[name] for name in columns})
+
+        if filepath.lower().endswith(('.parquet', '.pq')):
+            import pyarrow.parquet as pq
+            pq.write_table(table, filepath)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, filepath)
+
+    @staticmethod
+    def results_path(filepath: str) -> str:
+        """Fichier de sortie voisin pour le report des resultats (nom_resultats.ext)."""
+        base, ext = os.path.splitext(filepath)
+        return f"{base}_resultats{ext}"
+
+    @staticmethod
+    def write_back(
+        filepath: str,
+        recipients: List[Recipient],
+        in_place: bool = False
+    ) -> Tuple[int, Optional[str]]:
+        """
+        Reporte les resultats d'envoi (RESULT_COLUMNS) dans un fichier source.
+
+        Les lignes sont associees aux destinataires par adresse normalisee; les
+        colonnes de resultat sont ajoutees, ou remplacees si elles existent deja.
+        L'ecriture se fait en flux: CSV ligne a ligne, .xlsx par edition du XML
+        de la premiere feuille (mise en forme et autres feuilles conservees).
+
+        Args:
+            filepath: Fichier importe (.csv, .xlsx, .parquet, .arrow)
+            recipients: Destinataires et leurs resultats
+            in_place: True pour modifier le fichier d'origine, sinon
+                      ecriture dans results_path(filepath)
+
+        Returns:
+            Tuple (nombre de lignes mises a jour, message d'erreur ou None)
+        """
+        results = {
+            DataService.normalize_email(row[0]): row[len(RECIPIENT_COLUMNS):]
+            for row in DataService.result_rows(recipients)
+        }
+        target = DataService.results_path(filepath)
+        # Fichier temporaire puis remplacement: l'original reste intact en cas d'erreur
+        temporary = target + ".tmp"
+        lower = filepath.lower()
+        try:
+            if lower.endswith(('.xlsx', '.xlsm')):
+                updated = _xlsx_write_back(filepath, temporary, results)
+            elif lower.endswith('.csv'):
+                updated = DataService._csv_write_back(filepath, temporary, results)
+            elif lower.endswith(('.parquet', '.pq', '.arrow', '.feather', '.ipc')):
+                updated = DataService._arrow_write_back(filepath, temporary, results)
+            else:
+                return 0, "Format non supporte (CSV, .xlsx, Parquet ou Arrow)"
+            os.replace(temporary, filepath if in_place else target)
+            return updated, None
+        except Exception as e:
+            return 0, str(e)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    @staticmethod
+    def _csv_write_back(source: str, target: str, results: Dict[str, Tuple[str, ...]]) -> int:
+        """Copie un CSV ligne a ligne en renseignant les colonnes de resultat."""
+        with open(source, "rb") as f:
+            bom = f.read(3) == b"\xef\xbb\xbf"
+        normalize = DataService.normalize_email
+        updated = 0
+
+        with open(source, newline="", encoding="utf-8-sig") as fin, \
+                open(target, "w", newline="", encoding="utf-8-sig" if bom else "utf-8") as fout:
+            reader = csv.reader(fin)
+            writer = csv.writer(fout)
+            header = next(reader, None)
+            names = [c.strip() for c in header or []]
+            if "email" not in names:
+                raise ValueError("Colonne email introuvable")
+            email_pos = names.index("email")
+            positions = []
+            for name in RESULT_COLUMNS:
+                if name not in names:
+                    header.append(name)
+                    names.append(name)
+                positions.append(names.index(name))
+            width = len(header)
+            writer.writerow(header)
+
+            def rows():
+                nonlocal updated
+                for row in reader:
+                    values = results.get(normalize(row[email_pos])) if len(row) > email_pos else None
+                    if values is not None:
+                        if len(row) < width:
+                            row.extend([""] * (width - len(row)))
+                        for position, value in zip(positions, values):
+                            row[position] = value
+                        updated += 1
+                    yield row
+
+            writer.writerows(rows())
+        return updated
+
+    @staticmethod
+    def _arrow_write_back(source: str, target: str, results: Dict[str, Tuple[str, ...]]) -> int:
+        """Ajoute les colonnes de resultat a un Parquet ou un Arrow IPC."""
+        _require_pyarrow()
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        parquet = source.lower().endswith(('.parquet', '.pq'))
+        if parquet:
+            import pyarrow.parquet as pq
+            table = pq.read_table(source)
+        else:
+            import pyarrow.feather as feather
+            table = feather.read_table(source, memory_map=False)
+
+        normalize = DataService.normalize_email
+        matched = [
+            results.get(normalize(email)) if email is not None else None
+            for email in table.column("email").to_pylist()
+        ]
+        for position, name in enumerate(RESULT_COLUMNS):
+            values = pa.array(
+                [(m[position] or None) if m is not None else None for m in matched],
+                type=pa.string()
+            )
+            if name == "sent_at":
+                values = pc.strptime(values, format="%Y-%m-%dT%H:%M:%S", unit="s")
+            if name in table.column_names:
+                table = table.set_column(table.column_names.index(name), name, values)
+            else:
+                table = table.append_column(name, values)
+
+        if parquet:
+            pq.write_table(table, target)
+        else:
+            feather.write_feather(table, target)
+        return sum(m is not None for m in matched)
+
+    @staticmethod
+    def deduplicate(
+        recipients: List[Recipient],
+        keep: str = "first"
+    ) -> Tuple[List[Recipient], List[Recipient]]:
+        """
+        Supprime les doublons d'adresse (normalisee) en une passe, via un index par hash.
+
+        Args:
+            recipients: Destinataires (eventuellement issus de plusieurs fichiers)
+            keep: Ligne conservee parmi les doublons:
+                "first" (premiere), "last" (derniere) ou
+                "complete" (la plus remplie: champs non vides puis nombre d'images)
+
+        Returns:
+            Tuple (destinataires uniques dans l'ordre d'origine, doublons ecartes)
+        """
+        if keep not in DEDUP_KEEP:
+            raise ValueError(f"keep invalide: {keep}")
+
+        winners: Dict[str, int] = {}
+        normalize = DataService.normalize_email
+        for idx, recipient in enumerate(recipients):
+            key = normalize(recipient.email)
+            current = winners.get(key)
+            if current is None:
+                winners[key] = idx
+            elif keep == "last":
+                winners[key] = idx
+            elif keep == "complete":
+                if DataService._completeness(recipient) > DataService._completeness(recipients[current]):
+                    winners[key] = idx
+
+        kept = set(winners.values())
+        unique = [r for idx, r in enumerate(recipients) if idx in kept]
+        duplicates = [r for idx, r in enumerate(recipients) if idx not in kept]
+        return unique, duplicates
+
+    @staticmethod
+    def _completeness(recipient: Recipient) -> Tuple[int, int]:
+        """Score de remplissage d'une ligne (champs non vides, images)."""
+        filled = sum(1 for value in (recipient.nom, recipient.prenom, recipient.numero)
+                     if value and value.lower() != "nan")
+        return filled, len(recipient.images)
+
+    @staticmethod
+    def find_email(recipients: List[Recipient], email: str, exclude: Optional[int] = None) -> Optional[int]:
+        """
+        Cherche un destinataire par adresse (normalisee).
+
+        Args:
+            recipients: Liste ou chercher
+            email: Adresse recherchee
+            exclude: Index a ignorer (ligne en cours de modification)
+
+        Returns:
+            Index du destinataire ou None
+        """
+        key = DataService.normalize_email(email)
+        normalize = DataService.normalize_email
+        for idx, recipient in enumerate(recipients):
+            if idx != exclude and normalize(recipient.email) == key:
+                return idx
+        return None
+
+    @staticmethod
+    def remove_recipients(
+        recipients: List[Recipient],
+        removed: Iterable[Recipient]
+    ) -> Tuple[List[Recipient], int]:
+        """
+        Retire un groupe de destinataires en un seul parcours de la liste.
+
+        Args:
+            recipients: Liste complete
+            removed: Destinataires a retirer (les objets de la liste, compares par identite)
+
+        Returns:
+            Tuple (destinataires restants dans l'ordre d'origine, nombre retire)
+        """
+        ids = {id(r) for r in removed}
+        kept = [r for r in recipients if id(r) not in ids]
+        return kept, len(recipients) - len(kept)
+
+    @staticmethod
+    def set_field(recipients: Iterable[Recipient], field: str, value: str) -> int:
+        """
+        Donne la meme valeur a un champ (nom, prenom, numero) d'un groupe de destinataires.
+        L'adresse n'est pas modifiable en groupe (doublons).
+
+        Returns:
+            Nombre de destinataires modifies
+        """
+        if field not in RECIPIENT_COLUMNS or field == "email":
+            raise ValueError(f"Champ non modifiable en groupe: {field}")
+        count = 0
+        for recipient in recipients:
+            setattr(recipient, field, value)
+            count += 1
+        return count
+
+    @staticmethod
+    def clear_images(recipients: Iterable[Recipient]) -> int:
+        """
+        Retire les images personnelles d'un groupe de destinataires.
+
+        Returns:
+            Nombre d'images retirees
+        """
+        count = 0
+        for recipient in recipients:
+            if recipient.images:
+                count += len(recipient.images)
+                recipient.images = []
+        return count
+
     @staticmethod
     def create_template(filepath: str) -> Optional[str]:
         """
@@ -66,6 +1109,8 @@ class DataService:
             Message d'erreur ou None si succès
         """
         try:
+            import pandas as pd
+
             df = pd.DataFrame({
                 'email': ['exemple1@email.com', 'exemple2@email.com'],
                 'nom': ['Dupont', 'Martin'],
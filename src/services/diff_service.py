@@ -0,0 +1,115 @@
+"""
+Reimport d'un fichier modifie: comparaison par adresse avec la liste actuelle.
+"""
+
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import List, Tuple
+
+from ..models import Recipient
+from .data_service import DataService
+
+
+# Champs repris du fichier (images, statut et resultats d'envoi restent ceux de la liste)
+_FIELDS = ("email", "nom", "prenom", "numero")
+_fields = attrgetter(*_FIELDS)
+_email = attrgetter("email")
+
+
+@dataclass
+class RecipientDiff:
+    """Differences entre la liste actuelle et un fichier reimporte."""
+    # Lignes du fichier absentes de la liste
+    added: List[Recipient] = field(default_factory=list)
+    # (destinataire de la liste, ligne du fichier) dont un champ a change
+    updated: List[Tuple[Recipient, Recipient]] = field(default_factory=list)
+    # Destinataires de la liste absents du fichier
+    removed: List[Recipient] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.added)} ajoutes, {len(self.updated)} modifies, "
+            f"{len(self.removed)} retires, {self.unchanged} inchanges"
+        )
+
+    def details(self, limit: int = 20) -> str:
+        """Liste lisible des changements (au plus `limit` lignes par type)."""
+        sections = []
+        for title, items, describe in (
+            ("Ajoutes", self.added, lambda r: r.email),
+            ("Modifies", self.updated, _describe_update),
+            ("Retires", self.removed, lambda r: r.email),
+        ):
+            if items:
+                shown = "\n".join(describe(item) for item in items[:limit])
+                more = f"\n... et {len(items) - limit} autres" if len(items) > limit else ""
+                sections.append(f"{title} ({len(items)}) :\n{shown}{more}")
+        return "\n\n".join(sections)
+
+
+def _describe_update(pair: Tuple[Recipient, Recipient]) -> str:
+    old, new = pair
+    changes = ", ".join(
+        f"{name}: {getattr(old, name)} -> {getattr(new, name)}"
+        for name in _FIELDS if getattr(old, name) != getattr(new, name)
+    )
+    return f"{old.email} ({changes})"
+
+
+class DiffService:
+    """Mise a jour incrementale de la liste des destinataires a partir d'un fichier."""
+
+    @staticmethod
+    def diff(current: List[Recipient], incoming: List[Recipient]) -> RecipientDiff:
+        """
+        Compare un fichier (deja dedoublonne) a la liste actuelle, par adresse
+        normalisee (jointure par dictionnaire, un parcours de chaque liste).
+        Les destinataires dont l'adresse n'est plus dans le fichier sont retires.
+
+        Args:
+            current: Liste actuelle
+            incoming: Destinataires lus dans le fichier
+
+        Returns:
+            RecipientDiff (aucune liste n'est modifiee)
+        """
+        normalize = DataService.normalize_email
+        current_keys = list(map(normalize, map(_email, current)))
+        incoming_keys = list(map(normalize, map(_email, incoming)))
+        # Premiere occurrence gardee si la liste contient deja des doublons
+        index = dict(zip(reversed(current_keys), reversed(current)))
+
+        diff = RecipientDiff()
+        get = index.get
+        for key, new in zip(incoming_keys, incoming):
+            old = get(key)
+            if old is None:
+                diff.added.append(new)
+            elif _fields(old) != _fields(new):
+                diff.updated.append((old, new))
+        diff.unchanged = len(incoming) - len(diff.added) - len(diff.updated)
+
+        present = set(incoming_keys)
+        diff.removed = [r for key, r in zip(current_keys, current) if key not in present]
+        return diff
+
+    @staticmethod
+    def apply(current: List[Recipient], diff: RecipientDiff) -> List[Recipient]:
+        """
+        Applique les differences: champs mis a jour sur place (images, statut,
+        Message-ID conserves), retraits en un parcours, ajouts en fin de liste.
+
+        Returns:
+            Nouvelle liste des destinataires
+        """
+        for old, new in diff.updated:
+            for name in _FIELDS:
+                setattr(old, name, getattr(new, name))
+        kept, _ = DataService.remove_recipients(current, diff.removed)
+        kept.extend(diff.added)
+        return kept
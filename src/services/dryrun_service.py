@@ -0,0 +1,112 @@
+"""
+Simulation d'envoi: les messages rendus sont ecrits sur disque.
+"""
+
+import os
+import re
+import socket
+import threading
+import time
+from typing import List
+
+from ..config import DRYRUN_FORMATS
+
+
+# Lignes "From " a echapper dans un mbox (format mboxrd)
+_MBOX_FROM_RE = re.compile(rb"(?m)^(>*From )")
+_UNSAFE_CHARS_RE = re.compile(r"[^A-Za-z0-9@._+-]")
+
+
+class MessageStore:
+    """
+    Destination des messages d'une simulation: dossier de fichiers .eml,
+    Maildir (tmp/ puis new/) ou fichier mbox unique.
+
+    Thread-safe: plusieurs DryRunSession peuvent ecrire en parallele
+    (.eml et Maildir sans verrou, mbox via un tampon partage).
+    """
+
+    def __init__(self, path: str, fmt: str = "eml", buffer_size: int = 1 << 20):
+        if fmt not in DRYRUN_FORMATS:
+            raise ValueError(f"Format inconnu: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._hostname = socket.gethostname().replace("/", "_").replace(":", "_")
+        self._mbox = None
+        self.messages = 0
+        self.bytes = 0
+
+        if fmt == "mbox":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._mbox = open(path, "ab", buffering=buffer_size)
+        elif fmt == "maildir":
+            for sub in ("tmp", "new", "cur"):
+                os.makedirs(os.path.join(path, sub), exist_ok=True)
+        else:
+            os.makedirs(path, exist_ok=True)
+
+    def write(self, sender: str, recipients: List[str], data: bytes):
+        """Ecrit un message serialise (CRLF) dans la destination."""
+        with self._lock:
+            self._counter += 1
+            number = self._counter
+
+        if self.fmt == "mbox":
+            self._write_mbox(sender, data)
+        elif self.fmt == "maildir":
+            name = f"{int(time.time())}.P{os.getpid()}Q{number}.{self._hostname}"
+            tmp = os.path.join(self.path, "tmp", name)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, os.path.join(self.path, "new", name))
+        else:
+            rcpt = _UNSAFE_CHARS_RE.sub("_", recipients[0] if recipients else "")
+            with open(os.path.join(self.path, f"{number:08d}_{rcpt}.eml"), "wb") as f:
+                f.write(data)
+
+        with self._lock:
+            self.messages += 1
+            self.bytes += len(data)
+
+    def _write_mbox(self, sender: str, data: bytes):
+        """Ajoute un message au mbox (fins de ligne LF, lignes From echappees)."""
+        body = _MBOX_FROM_RE.sub(rb">\1", data.replace(b"\r\n", b"\n"))
+        if not body.endswith(b"\n"):
+            body += b"\n"
+        envelope = f"From {sender or 'MAILER-DAEMON'} {time.asctime()}\n".encode("ascii", "replace")
+        with self._lock:
+            self._mbox.write(envelope + body + b"\n")
+
+    def close(self):
+        """Vide les tampons et ferme le mbox."""
+        if self._mbox is not None:
+            self._mbox.close()
+            self._mbox = None
+
+
+class DryRunSession:
+    """Meme interface que SMTPSession, mais ecrit dans un MessageStore."""
+
+    def __init__(self, store: MessageStore):
+        self.store = store
+        self.messages_sent = 0
+
+    def send_raw(self, sender: str, recipients: List[str], data: bytes):
+        """Ecrit le message au lieu de l'envoyer."""
+        self.store.write(sender, recipients, data)
+        self.messages_sent += 1
+
+    def noop(self) -> bool:
+        """Toujours disponible."""
+        return True
+
+    def close(self):
+        """Rien a fermer (le MessageStore est partage)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
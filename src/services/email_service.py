@@ -2,7 +2,8 @@
 Service d'envoi d'emails.
 """
 
-import smtplib
+import io
+from email.generator import BytesGenerator
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
@@ -10,6 +11,7 @@ from email.utils import formatdate, make_msgid
 from typing import Optional, Tuple, List
 
 from ..models import SMTPConfig, Recipient
+from .smtp_session import SMTPSession
 
 
 class EmailService:
@@ -58,19 +60,46 @@ class EmailService:
 {img_tags}"""
 
     @staticmethod
-    def send(
-        config: SMTPConfig,
+    def build_html_body(personalized_body: str, has_default_image: bool, personal_images_count: int) -> str:
+        """
+        Construit le HTML envoye (images referencees par Content-ID).
+
+        Args:
+            personalized_body: Corps deja personnalise
+            has_default_image: True si image par defaut presente
+            personal_images_count: Nombre d'images personnalisees
+
+        Returns:
+            Document HTML du mail
+        """
+        img_tags = ""
+        if has_default_image:
+            img_tags += "<br><img src='cid:default_image' style='max-width: 600px;'>"
+        for idx in range(personal_images_count):
+            img_tags += f"<br><img src='cid:personal_{idx}' style='max-width: 600px;'>"
+
+        return f"""\
+<html><body>
+<div style="font-family: Arial, sans-serif; line-height: 1.6;">
+{personalized_body.replace(chr(10), '<br>')}
+</div>
+{img_tags}
+</body></html>"""
+
+    @staticmethod
+    def build_message(
+        sender: str,
         recipient: Recipient,
         subject: str,
         body: str,
         default_image: Optional[bytes] = None,
         personal_images: Optional[List[Tuple[bytes, str]]] = None
-    ) -> Tuple[bool, Optional[str]]:
+    ) -> MIMEMultipart:
         """
-        Envoie un email personnalise avec possibilite de plusieurs images.
+        Construit le message MIME personnalise pour un destinataire.
 
         Args:
-            config: Configuration SMTP
+            sender: Adresse de l'expediteur
             recipient: Destinataire avec ses informations
             subject: Sujet du mail (peut contenir des placeholders)
             body: Corps du mail (peut contenir des placeholders)
@@ -78,88 +107,121 @@ class EmailService:
             personal_images: Liste d'images personnalisees [(data, name), ...] (optionnel)
 
         Returns:
-            Tuple (success, error_message)
+            Message MIME pret a etre envoye
         """
-        try:
-            # Personnaliser pour CE destinataire
-            personalized_subject = EmailService.replace_placeholders(subject, recipient)
-            personalized_body = EmailService.replace_placeholders(body, recipient)
-
-            # Structure MIME correcte pour Outlook:
-            # multipart/mixed
-            #   multipart/alternative
-            #     text/plain
-            #     multipart/related
-            #       text/html
-            #       images inline
-            msg = MIMEMultipart('mixed')
-            msg['From'] = config.email
-            msg['To'] = recipient.email
-            msg['Subject'] = personalized_subject
-            msg['Date'] = formatdate(localtime=True)
-            msg['Message-ID'] = make_msgid(domain=config.email.split('@')[-1])
-            msg['MIME-Version'] = '1.0'
-
-            # Partie alternative (texte + html)
-            alt_part = MIMEMultipart('alternative')
-
-            # Version texte (obligatoire pour passer les filtres Outlook)
-            alt_part.attach(MIMEText(personalized_body, 'plain', 'utf-8'))
-
-            # Version HTML avec images
-            img_tags = ""
+        # Personnaliser pour CE destinataire
+        personalized_subject = EmailService.replace_placeholders(subject, recipient)
+        personalized_body = EmailService.replace_placeholders(body, recipient)
+
+        # Structure MIME correcte pour Outlook:
+        # multipart/mixed
+        #   multipart/alternative
+        #     text/plain
+        #     multipart/related
+        #       text/html
+        #       images inline
+        msg = MIMEMultipart('mixed')
+        msg['From'] = sender
+        msg['To'] = recipient.email
+        msg['Subject'] = personalized_subject
+        msg['Date'] = formatdate(localtime=True)
+        msg['Message-ID'] = make_msgid(domain=sender.split('@')[-1])
+        msg['MIME-Version'] = '1.0'
+
+        # Partie alternative (texte + html)
+        alt_part = MIMEMultipart('alternative')
+
+        # Version texte (obligatoire pour passer les filtres Outlook)
+        alt_part.attach(MIMEText(personalized_body, 'plain', 'utf-8'))
+
+        # Version HTML avec images
+        html_body = EmailService.build_html_body(
+            personalized_body,
+            bool(default_image),
+            len(personal_images) if personal_images else 0
+        )
+
+        if default_image or personal_images:
+            # Si images: related contient html + images
+            related_part = MIMEMultipart('related')
+            related_part.attach(MIMEText(html_body, 'html', 'utf-8'))
+
             if default_image:
-                img_tags += "<br><img src='cid:default_image' style='max-width: 600px;'>"
+                img = MIMEImage(default_image)
+                img.add_header('Content-ID', '<default_image>')
+                img.add_header('Content-Disposition', 'inline', filename='default.png')
+                related_part.attach(img)
+
             if personal_images:
                 for idx, (img_data, img_name) in enumerate(personal_images):
-                    img_tags += f"<br><img src='cid:personal_{idx}' style='max-width: 600px;'>"
+                    # bytes(): les images d'un projet ouvert sont des vues memoryview
+                    img = MIMEImage(bytes(img_data))
+                    img.add_header('Content-ID', f'<personal_{idx}>')
+                    img.add_header('Content-Disposition', 'inline', filename=img_name)
+                    related_part.attach(img)
 
-            html_body = f"""\
-<html><body>
-<div style="font-family: Arial, sans-serif; line-height: 1.6;">
-{personalized_body.replace(chr(10), '<br>')}
-</div>
-{img_tags}
-</body></html>"""
+            alt_part.attach(related_part)
+        else:
+            alt_part.attach(MIMEText(html_body, 'html', 'utf-8'))
 
-            if default_image or personal_images:
-                # Si images: related contient html + images
-                related_part = MIMEMultipart('related')
-                related_part.attach(MIMEText(html_body, 'html', 'utf-8'))
+        msg.attach(alt_part)
+        return msg
 
-                if default_image:
-                    img = MIMEImage(default_image)
-                    img.add_header('Content-ID', '<default_image>')
-                    img.add_header('Content-Disposition', 'inline', filename='default.png')
-                    related_part.attach(img)
+    @staticmethod
+    def render_message(
+        sender: str,
+        recipient: Recipient,
+        subject: str,
+        body: str,
+        default_image: Optional[bytes] = None,
+        personal_images: Optional[List[Tuple[bytes, str]]] = None
+    ) -> Tuple[str, bytes]:
+        """
+        Construit et serialise le message (fins de ligne CRLF, pret pour DATA).
 
-                if personal_images:
-                    for idx, (img_data, img_name) in enumerate(personal_images):
-                        img = MIMEImage(img_data)
-                        img.add_header('Content-ID', f'<personal_{idx}>')
-                        img.add_header('Content-Disposition', 'inline', filename=img_name)
-                        related_part.attach(img)
-
-                alt_part.attach(related_part)
-            else:
-                alt_part.attach(MIMEText(html_body, 'html', 'utf-8'))
-
-            msg.attach(alt_part)
-
-            # Envoyer (SSL sur port 465, STARTTLS sur 587)
-            if config.port == 465:
-                with smtplib.SMTP_SSL(config.server, config.port) as server:
-                    server.login(config.email, config.password)
-                    server.send_message(msg)
-            else:
-                with smtplib.SMTP(config.server, config.port) as server:
-                    server.starttls()
-                    server.login(config.email, config.password)
-                    server.send_message(msg)
+        Returns:
+            Tuple (Message-ID, message serialise)
+        """
+        msg = EmailService.build_message(
+            sender, recipient, subject, body, default_image, personal_images
+        )
+        with io.BytesIO() as buffer:
+            BytesGenerator(buffer).flatten(msg, linesep='\r\n')
+            return msg['Message-ID'], buffer.getvalue()
+
+    @staticmethod
+    def send(
+        config: SMTPConfig,
+        recipient: Recipient,
+        subject: str,
+        body: str,
+        default_image: Optional[bytes] = None,
+        personal_images: Optional[List[Tuple[bytes, str]]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Envoie un email personnalise avec possibilite de plusieurs images.
+
+        Ouvre une connexion dediee: pour un envoi en masse, utiliser SendEngine.
+
+        Args:
+            config: Configuration SMTP
+            recipient: Destinataire avec ses informations
+            subject: Sujet du mail (peut contenir des placeholders)
+            body: Corps du mail (peut contenir des placeholders)
+            default_image: Image par defaut pour tous (optionnel)
+            personal_images: Liste d'images personnalisees [(data, name), ...] (optionnel)
+
+        Returns:
+            Tuple (success, error_message)
+        """
+        try:
+            _, data = EmailService.render_message(
+                config.email, recipient, subject, body, default_image, personal_images
+            )
+            with SMTPSession(config) as session:
+                session.send_raw(config.email, [recipient.email], data)
 
             return True, None
 
         except Exception as e:
             return False, str(e)
-
-
@@ -0,0 +1,202 @@
+"""
+Estimation de la taille et de la duree d'une campagne avant envoi.
+"""
+
+import math
+from dataclasses import dataclass, field, replace
+from email import policy
+from email.message import Message
+from typing import Dict, List, Optional, Tuple
+
+from ..config import (
+    SMTP_PROVIDERS, PROVIDER_LIMITS, SEND_DELAY, SMTP_SESSIONS,
+    ESTIMATE_UPLOAD_BPS, ESTIMATE_MESSAGE_OVERHEAD
+)
+from ..models import Recipient
+from .email_service import EmailService
+
+
+@dataclass
+class CampaignEstimate:
+    """Resultat d'une estimation de campagne."""
+    messages: int = 0
+    total_bytes: int = 0
+    min_bytes: int = 0
+    max_bytes: int = 0
+    duration_seconds: float = 0.0
+    daily_quota: Optional[int] = None
+    days_needed: int = 1
+    max_message_size: int = 0
+    # Messages trop gros pour le fournisseur: [(index, email, taille), ...]
+    oversized: List[Tuple[int, str, int]] = field(default_factory=list)
+
+    @property
+    def average_bytes(self) -> int:
+        """Taille moyenne d'un message."""
+        return self.total_bytes // self.messages if self.messages else 0
+
+
+def base64_size(length: int) -> int:
+    """Taille encodee en base64 (lignes de 76 caracteres terminees par CRLF)."""
+    if length <= 0:
+        return 0
+    chars = 4 * math.ceil(length / 3)
+    return chars + 2 * math.ceil(chars / 76)
+
+
+def _header_size(name: str, value: str) -> int:
+    """Taille d'un en-tete tel que serialise (pliage et encodage, CRLF)."""
+    folded = policy.compat32.fold_binary(name, value)
+    return len(folded) + folded.count(b"\n")
+
+
+def _image_subtype(data: bytes) -> str:
+    """Sous-type MIME d'une image (seul son nom change la taille des en-tetes)."""
+    head = bytes(data[:12])
+    if head.startswith(b"\x89PNG"):
+        return "png"
+    if head.startswith(b"\xff\xd8"):
+        return "jpeg"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "webp"
+    if head[:2] in (b"II", b"MM"):
+        return "tiff"
+    if head.startswith(b"BM"):
+        return "bmp"
+    return "other"
+
+
+class CampaignEstimator:
+    """
+    Calcule la taille encodee de chaque message sans le construire.
+
+    Un message de reference est rendu une seule fois par structure
+    (image par defaut, type de chaque image personnelle). Pour chaque
+    destinataire, seules les differences sont calculees: longueur des
+    en-tetes To/Subject, expansion base64 du texte, du HTML et des
+    images, en-tetes Content-Disposition. Le resultat est exact a
+    quelques octets pres (Message-ID aleatoire).
+    """
+
+    def __init__(
+        self,
+        sender: str,
+        subject: str,
+        body: str,
+        default_image: Optional[bytes] = None,
+        optimizer=None
+    ):
+        self.sender = sender or "expediteur@exemple.com"
+        self.subject = subject
+        self.body = body
+        # Les images sont mesurees telles qu'elles seront envoyees
+        self.optimizer = optimizer
+        if optimizer and default_image:
+            default_image = optimizer.optimize(default_image)
+        self.default_image = default_image
+        self._references: Dict[tuple, Tuple[int, dict]] = {}
+        self._disposition_cache: Dict[str, int] = {}
+
+    def message_size(self, recipient: Recipient) -> int:
+        """Taille en octets du message serialise pour ce destinataire."""
+        if self.optimizer and recipient.images:
+            recipient = replace(recipient, images=self.optimizer.optimize_images(recipient.images))
+        images = recipient.images or []
+        signature = (bool(self.default_image), tuple(_image_subtype(data) for data, _ in images))
+        reference = self._references.get(signature)
+        if reference is None:
+            reference = self._reference(recipient)
+            self._references[signature] = reference
+
+        size, parts = reference
+        current = self._parts(recipient)
+        return size + sum(current[key] - parts[key] for key in parts)
+
+    def _reference(self, recipient: Recipient) -> Tuple[int, dict]:
+        """Rend reellement un message de cette structure (une fois)."""
+        _, data = EmailService.render_message(
+            self.sender, recipient, self.subject, self.body,
+            default_image=self.default_image,
+            personal_images=recipient.images or None
+        )
+        return len(data), self._parts(recipient)
+
+    def _parts(self, recipient: Recipient) -> dict:
+        """Tailles des elements qui varient d'un destinataire a l'autre."""
+        images = recipient.images or []
+        subject = EmailService.replace_placeholders(self.subject, recipient)
+        body = EmailService.replace_placeholders(self.body, recipient)
+        html = EmailService.build_html_body(body, bool(self.default_image), len(images))
+
+        parts = {
+            "to": _header_size("To", recipient.email),
+            "subject": _header_size("Subject", subject),
+            "plain": base64_size(len(body.encode("utf-8"))),
+            "html": base64_size(len(html.encode("utf-8"))),
+        }
+        for idx, (data, name) in enumerate(images):
+            parts[f"image_{idx}"] = base64_size(len(data))
+            parts[f"disposition_{idx}"] = self._disposition_size(name)
+        return parts
+
+    def _disposition_size(self, name: str) -> int:
+        """Taille de l'en-tete Content-Disposition pour un nom de fichier."""
+        size = self._disposition_cache.get(name)
+        if size is None:
+            header = Message()
+            header.add_header("Content-Disposition", "inline", filename=name)
+            size = _header_size("Content-Disposition", header["Content-Disposition"])
+            self._disposition_cache[name] = size
+        return size
+
+    def estimate(
+        self,
+        recipients: List[Recipient],
+        server: str = "",
+        sessions: int = SMTP_SESSIONS,
+        delay: float = SEND_DELAY
+    ) -> CampaignEstimate:
+        """
+        Estime la campagne complete.
+
+        Args:
+            recipients: Destinataires
+            server: Serveur SMTP (pour les limites du fournisseur)
+            sessions: Sessions SMTP en parallele
+            delay: Pause entre deux envois
+
+        Returns:
+            CampaignEstimate
+        """
+        limits = provider_limits(server)
+        result = CampaignEstimate(
+            daily_quota=limits["daily_quota"],
+            max_message_size=limits["max_message_size"]
+        )
+
+        for idx, recipient in enumerate(recipients):
+            size = self.message_size(recipient)
+            result.total_bytes += size
+            result.min_bytes = size if idx == 0 else min(result.min_bytes, size)
+            result.max_bytes = max(result.max_bytes, size)
+            if size > result.max_message_size:
+                result.oversized.append((idx, recipient.email, size))
+
+        result.messages = len(recipients)
+        per_message = (delay + ESTIMATE_MESSAGE_OVERHEAD) / max(1, sessions)
+        result.duration_seconds = (
+            result.messages * per_message + result.total_bytes / ESTIMATE_UPLOAD_BPS
+        )
+        if result.daily_quota:
+            result.days_needed = max(1, math.ceil(result.messages / result.daily_quota))
+        return result
+
+
+def provider_limits(server: str) -> dict:
+    """Limites du fournisseur correspondant au serveur SMTP ("Autre" par defaut)."""
+    for name, (host, _) in SMTP_PROVIDERS.items():
+        if host and host == server:
+            return PROVIDER_LIMITS.get(name, PROVIDER_LIMITS["Autre"])
+    return PROVIDER_LIMITS["Autre"]
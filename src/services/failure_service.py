@@ -0,0 +1,218 @@
+"""
+Echecs d'envoi structures (code SMTP, code etendu, categorie, domaine) et
+index pour le tri d'une grande campagne.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..config import FAILURE_CATEGORIES
+from ..models import Recipient, SendStatus
+
+
+# Reponse SMTP dans str(exception) de smtplib: "(550, b'5.1.1 ...')"
+_REPLY_RE = re.compile(r"\((\d{3}), b?(['\"])(.*?)\2")
+# Code etendu (RFC 3463)
+_STATUS_RE = re.compile(r"\b([245])\.(\d{1,3})\.(\d{1,3})\b")
+_MAILBOX_RE = re.compile(
+    r"user unknown|unknown user|no such user|does not exist|doesn't exist|"
+    r"invalid recipient|recipient address rejected|mailbox unavailable|not found",
+    re.IGNORECASE
+)
+_RATE_RE = re.compile(r"too many|rate limit|try again later|throttl|exceeded", re.IGNORECASE)
+_NETWORK_RE = re.compile(
+    r"timed out|connection|disconnect|errno|refused|reset|broken pipe|"
+    r"name or service|getaddrinfo|network|ssl|eof",
+    re.IGNORECASE
+)
+
+
+@dataclass
+class Failure:
+    """Echec d'envoi d'un destinataire."""
+    # Rang du destinataire dans la liste envoyee
+    index: int
+    email: str
+    domain: str
+    # Reponse SMTP (550) et code etendu ("5.1.1"), None si absents (erreur reseau...)
+    code: Optional[int]
+    status: Optional[str]
+    # Cle de FAILURE_CATEGORIES
+    category: str
+    message: str
+
+    @property
+    def label(self) -> str:
+        """Libelle de la categorie."""
+        return FAILURE_CATEGORIES[self.category]
+
+    def __str__(self) -> str:
+        reference = self.status or (str(self.code) if self.code else "")
+        return f"{self.email}: [{reference}] {self.message}" if reference else f"{self.email}: {self.message}"
+
+
+class FailureService:
+    """Analyse des messages d'erreur enregistres dans Recipient.error."""
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def classify(error: str) -> Tuple[Optional[int], Optional[str], str, str]:
+        """
+        Code SMTP, code etendu, categorie et texte de la reponse d'un message d'erreur.
+
+        Les messages identiques (tres frequents: meme refus pour tout un
+        domaine) ne sont analyses qu'une fois.
+
+        Returns:
+            Tuple (code ou None, code etendu ou None, categorie, texte de la
+            reponse du serveur ou message d'origine)
+        """
+        match = _REPLY_RE.search(error)
+        code = int(match.group(1)) if match else None
+        message = match.group(3) if match else error
+        match = _STATUS_RE.search(error)
+        status = ".".join(match.groups()) if match else None
+        return code, status, FailureService._category(code, status, error), message
+
+    @staticmethod
+    def _category(code: Optional[int], status: Optional[str], error: str) -> str:
+        if code in (530, 534, 535) or status in ("5.7.8", "5.7.9", "5.7.14"):
+            return "auth"
+
+        # Code etendu: classe (2/4/5), sujet et detail (RFC 3463)
+        if status:
+            klass, subject, detail = status.split(".")
+            if subject == "7":
+                return "rate" if klass == "4" else "policy"
+            if (subject == "5" and detail == "3") or (subject == "4" and detail == "5"):
+                return "rate"
+            if subject == "2" and detail == "2":
+                return "full"
+            if (subject == "3" and detail == "4") or subject == "6":
+                return "message"
+            if klass == "4":
+                return "network" if subject == "4" else "temporary"
+            if subject == "1":
+                return "domain" if detail in ("2", "10") else "mailbox"
+            if subject == "2":
+                return "mailbox"
+            if subject == "4":
+                return "domain"
+
+        if code is not None:
+            if code == 421 or (400 <= code < 500 and _RATE_RE.search(error)):
+                return "rate"
+            if code == 552:
+                return "full"
+            if 400 <= code < 500:
+                return "temporary"
+            if code in (550, 551, 553) and _MAILBOX_RE.search(error):
+                return "mailbox"
+            if code == 554:
+                return "policy"
+            return "other"
+
+        if _NETWORK_RE.search(error):
+            return "network"
+        return "other"
+
+    @staticmethod
+    def parse(index: int, email: str, error: str) -> Failure:
+        """Echec structure a partir du message d'erreur d'un destinataire."""
+        code, status, category, message = FailureService.classify(error)
+        return Failure(
+            index=index,
+            email=email,
+            domain=email.rsplit("@", 1)[-1].strip().lower(),
+            code=code,
+            status=status,
+            category=category,
+            message=message
+        )
+
+
+class FailureIndex:
+    """
+    Echecs d'une campagne indexes par categorie et par domaine.
+
+    Les comptes sont tenus a jour a chaque ajout ou retrait (O(1)), pour un
+    affichage en direct pendant l'envoi; select() combine les deux index.
+    """
+
+    def __init__(self):
+        # Rang du destinataire -> echec
+        self._failures: Dict[int, Failure] = {}
+        self._by_category: Dict[str, Dict[int, Failure]] = {}
+        self._by_domain: Dict[str, Dict[int, Failure]] = {}
+
+    @classmethod
+    def from_recipients(cls, recipients: Iterable[Recipient], stop: Optional[int] = None) -> "FailureIndex":
+        """Index des destinataires en echec (statut FAILED), jusqu'au rang `stop` exclu."""
+        index = cls()
+        for i, recipient in enumerate(recipients):
+            if stop is not None and i >= stop:
+                break
+            if recipient.status == SendStatus.FAILED:
+                index.add(i, recipient.email, recipient.error or "")
+        return index
+
+    def __len__(self) -> int:
+        return len(self._failures)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._failures
+
+    def add(self, index: int, email: str, error: str) -> Failure:
+        """Enregistre (ou remplace) l'echec du destinataire de rang `index`."""
+        self.remove(index)
+        failure = FailureService.parse(index, email, error)
+        self._failures[index] = failure
+        self._by_category.setdefault(failure.category, {})[index] = failure
+        self._by_domain.setdefault(failure.domain, {})[index] = failure
+        return failure
+
+    def remove(self, index: int) -> Optional[Failure]:
+        """Retire l'echec du destinataire `index` (renvoye avec succes)."""
+        failure = self._failures.pop(index, None)
+        if failure is not None:
+            for group, key in ((self._by_category, failure.category), (self._by_domain, failure.domain)):
+                del group[key][index]
+                if not group[key]:
+                    del group[key]
+        return failure
+
+    def by_category(self) -> List[Tuple[str, int]]:
+        """(categorie, nombre) dans l'ordre de FAILURE_CATEGORIES, categories vides omises."""
+        return [(key, len(self._by_category[key])) for key in FAILURE_CATEGORIES if key in self._by_category]
+
+    def by_domain(self, limit: Optional[int] = None, category: Optional[str] = None) -> List[Tuple[str, int]]:
+        """(domaine, nombre) par nombre decroissant, dans une categorie si precisee."""
+        if category is None:
+            counts = [(domain, len(failures)) for domain, failures in self._by_domain.items()]
+        else:
+            counts = {}
+            for failure in self._by_category.get(category, {}).values():
+                counts[failure.domain] = counts.get(failure.domain, 0) + 1
+            counts = list(counts.items())
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        return counts[:limit] if limit else counts
+
+    def select(self, category: Optional[str] = None, domain: Optional[str] = None) -> List[Failure]:
+        """Echecs d'une categorie et/ou d'un domaine (tous si aucun filtre), par rang."""
+        groups = []
+        if category is not None:
+            groups.append(self._by_category.get(category, {}))
+        if domain is not None:
+            groups.append(self._by_domain.get(domain, {}))
+        if not groups:
+            groups.append(self._failures)
+
+        # Parcourir le plus petit index, verifier l'autre
+        groups.sort(key=len)
+        smallest, others = groups[0], groups[1:]
+        return sorted(
+            (f for i, f in smallest.items() if all(i in other for other in others)),
+            key=lambda f: f.index
+        )
@@ -0,0 +1,215 @@
+"""
+Service d'optimisation des images avant envoi.
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from ..config import IMAGE_MAX_WIDTH, IMAGE_QUALITY, IMAGE_CACHE_BYTES
+
+
+class ImageOptimizer:
+    """
+    Redimensionne et recompresse les images a la largeur affichee dans le mail.
+
+    Les metadonnees (EXIF, profils, commentaires) sont supprimees, les
+    resultats sont mis en cache par hash du contenu et le traitement se
+    fait en parallele (Pillow relache le GIL pendant resize/encodage).
+    """
+
+    def __init__(
+        self,
+        max_width: int = IMAGE_MAX_WIDTH,
+        quality: int = IMAGE_QUALITY,
+        workers: Optional[int] = None,
+        cache_bytes: int = IMAGE_CACHE_BYTES
+    ):
+        self.max_width = max_width
+        self.quality = quality
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._cache_size = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="img-opt")
+
+    def optimize(self, data: bytes) -> bytes:
+        """
+        Optimise une image (avec cache).
+
+        Args:
+            data: Contenu de l'image
+
+        Returns:
+            Image optimisee, ou l'originale si elle est deja plus petite
+            ou illisible
+        """
+        key = hashlib.sha256(data).digest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        result = self._optimize(data)
+
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = result
+                self._cache_size += len(result)
+                while self._cache_size > self.cache_bytes and len(self._cache) > 1:
+                    _, evicted = self._cache.popitem(last=False)
+                    self._cache_size -= len(evicted)
+        return result
+
+    def optimize_images(self, images: List[Tuple[bytes, str]]) -> List[Tuple[bytes, str]]:
+        """Optimise une liste d'images [(data, name), ...] en parallele."""
+        if not images:
+            return []
+        optimized = self._executor.map(self.optimize, [data for data, _ in images])
+        return [(data, name) for data, (_, name) in zip(optimized, images)]
+
+    def close(self):
+        """Libere les threads de travail."""
+        # Aucun travail en attente: optimize_images attend ses resultats
+        # (shutdown(cancel_futures=True) demande Python 3.9)
+        self._executor.shutdown(wait=False)
+
+    def _optimize(self, data: bytes) -> bytes:
+        """Redimensionne, supprime les metadonnees et recompresse."""
+        try:
+            img = Image.open(io.BytesIO(data))
+            fmt = img.format
+
+            # GIF animes et formats exotiques: laisses tels quels
+            if fmt not in ("JPEG", "PNG", "WEBP", "GIF") or getattr(img, "is_animated", False):
+                return data
+
+            # Appliquer l'orientation EXIF avant de la supprimer
+            rotated = img.getexif().get(_EXIF_ORIENTATION, 1) not in (1, None)
+            img = ImageOps.exif_transpose(img)
+
+            if img.width > self.max_width:
+                ratio = self.max_width / img.width
+                img = img.resize(
+                    (self.max_width, max(1, int(img.height * ratio))),
+                    Image.Resampling.LANCZOS
+                )
+
+            out = io.BytesIO()
+            if fmt == "JPEG":
+                if img.mode not in ("RGB", "L"):
+                    img = img.convert("RGB")
+                img.save(out, "JPEG", quality=self.quality, optimize=True, progressive=True)
+            elif fmt == "WEBP":
+                img.save(out, "WEBP", quality=self.quality)
+            elif fmt == "GIF":
+                img.save(out, "GIF", optimize=True)
+            else:
+                img.save(out, "PNG", optimize=True)
+
+            result = out.getvalue()
+            if len(result) < len(data) or rotated:
+                return result
+            # Recompression sans gain: garder l'encodage d'origine, sans metadonnees
+            return _strip_metadata(data, fmt)
+
+        except Exception:
+            return data
+
+
+# Tag EXIF d'orientation (l'image d'origine ne s'affiche droite qu'avec lui)
+_EXIF_ORIENTATION = 0x0112
+# JPEG: APP1 (EXIF, XMP), APP2 (ICC), APP13 (IPTC), COM
+_JPEG_METADATA = {0xE1, 0xE2, 0xED, 0xFE}
+_PNG_METADATA = {b"eXIf", b"tEXt", b"zTXt", b"iTXt", b"tIME", b"iCCP"}
+_WEBP_METADATA = {b"EXIF", b"XMP ", b"ICCP"}
+# Drapeaux VP8X: ICC, EXIF, XMP
+_WEBP_METADATA_FLAGS = 0x20 | 0x08 | 0x04
+
+
+def _strip_metadata(data: bytes, fmt: str) -> bytes:
+    """
+    Retire les segments de metadonnees sans reencoder l'image.
+    Renvoie l'original si le format n'en porte pas ou si le fichier est mal forme.
+    """
+    try:
+        if fmt == "JPEG":
+            return _strip_jpeg(data)
+        if fmt == "PNG":
+            return _strip_png(data)
+        if fmt == "WEBP":
+            return _strip_webp(data)
+    except (IndexError, ValueError):
+        pass
+    return data
+
+
+def _strip_jpeg(data: bytes) -> bytes:
+    if data[:2] != b"\xff\xd8":
+        raise ValueError("JPEG invalide")
+    parts = [data[:2]]
+    i = 2
+    while i < len(data):
+        if data[i] != 0xFF:
+            raise ValueError("Marqueur JPEG attendu")
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Octet de remplissage
+            i += 1
+            continue
+        if marker == 0xDA:
+            # Debut des donnees compressees: copiees telles quelles
+            parts.append(data[i:])
+            break
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            parts.append(data[i:i + 2])
+            i += 2
+            continue
+        end = i + 2 + int.from_bytes(data[i + 2:i + 4], "big")
+        if marker not in _JPEG_METADATA:
+            parts.append(data[i:end])
+        i = end
+    return b"".join(parts)
+
+
+def _strip_png(data: bytes) -> bytes:
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError("PNG invalide")
+    parts = [data[:8]]
+    i = 8
+    while i < len(data):
+        length = int.from_bytes(data[i:i + 4], "big")
+        end = i + 12 + length
+        if end > len(data):
+            raise ValueError("Bloc PNG tronque")
+        if data[i + 4:i + 8] not in _PNG_METADATA:
+            parts.append(data[i:end])
+        i = end
+    return b"".join(parts)
+
+
+def _strip_webp(data: bytes) -> bytes:
+    if data[:4] != b"RIFF" or data[8:12] != b"WEBP":
+        raise ValueError("WEBP invalide")
+    parts = []
+    i = 12
+    while i < len(data):
+        fourcc = data[i:i + 4]
+        size = int.from_bytes(data[i + 4:i + 8], "little")
+        end = i + 8 + size + (size & 1)
+        if end > len(data) + 1:
+            raise ValueError("Bloc WEBP tronque")
+        chunk = data[i:end]
+        if fourcc == b"VP8X":
+            chunk = chunk[:8] + bytes([chunk[8] & ~_WEBP_METADATA_FLAGS & 0xFF]) + chunk[9:]
+        if fourcc not in _WEBP_METADATA:
+            parts.append(chunk)
+        i = end
+    body = b"WEBP" + b"".join(parts)
+    return b"RIFF" + len(body).to_bytes(4, "little") + body
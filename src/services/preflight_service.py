@@ -0,0 +1,111 @@
+"""
+Verification du message avant envoi: placeholders inconnus, champs vides,
+longueur de l'objet une fois personnalise.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from ..config import RECIPIENT_COLUMNS, SUBJECT_MAX_LENGTH
+from ..models import Recipient
+
+
+# Tout ce qui ressemble a un placeholder, y compris mal ecrit ({{ nom }}, {{prenon}})
+_PLACEHOLDER_RE = re.compile(r"\{\{(.*?)\}\}")
+
+
+@dataclass
+class PreflightReport:
+    """Resultat de la verification d'un message sur une liste de destinataires."""
+    recipients: int = 0
+    # Placeholders non remplaces par replace_placeholders (laisses tels quels)
+    unknown: List[str] = field(default_factory=list)
+    # Champ utilise -> index des destinataires ou il est vide
+    empty: Dict[str, List[int]] = field(default_factory=dict)
+    # Index des destinataires dont l'objet personnalise depasse SUBJECT_MAX_LENGTH
+    long_subjects: List[int] = field(default_factory=list)
+    max_subject_length: int = 0
+
+    @property
+    def affected(self) -> List[int]:
+        """Index (tries) des destinataires concernes par au moins un probleme."""
+        rows = set(self.long_subjects)
+        for indices in self.empty.values():
+            rows.update(indices)
+        return sorted(rows)
+
+    @property
+    def ok(self) -> bool:
+        """True si aucun probleme n'a ete trouve."""
+        return not self.unknown and not self.long_subjects and not any(self.empty.values())
+
+
+class PreflightService:
+    """Verification vectorisee (une passe par colonne) avant un envoi."""
+
+    @staticmethod
+    def placeholders(text: str) -> List[str]:
+        """Contenu des placeholders d'un texte, dans l'ordre d'apparition."""
+        return _PLACEHOLDER_RE.findall(text)
+
+    @staticmethod
+    def check(
+        subject: str,
+        body: str,
+        recipients: List[Recipient],
+        max_subject_length: int = SUBJECT_MAX_LENGTH
+    ) -> PreflightReport:
+        """
+        Verifie objet et corps pour tous les destinataires.
+
+        Les gabarits sont analyses une seule fois; chaque champ utilise est
+        ensuite controle sur toute la liste en une operation par colonne.
+
+        Args:
+            subject: Objet (avec placeholders)
+            body: Corps du message (avec placeholders)
+            recipients: Destinataires
+            max_subject_length: Longueur maximale de l'objet personnalise
+
+        Returns:
+            Rapport de verification
+        """
+        report = PreflightReport(recipients=len(recipients))
+
+        subject_fields = PreflightService.placeholders(subject)
+        body_fields = PreflightService.placeholders(body)
+        known = set(RECIPIENT_COLUMNS)
+        report.unknown = sorted({f"{{{{{name}}}}}" for name in subject_fields + body_fields if name not in known})
+
+        used = [name for name in RECIPIENT_COLUMNS if name in subject_fields or name in body_fields]
+        if not recipients or not used:
+            report.max_subject_length = len(subject)
+            if len(subject) > max_subject_length:
+                report.long_subjects = list(range(len(recipients)))
+            return report
+
+        import numpy as np
+        import pandas as pd
+
+        columns = {
+            name: pd.Series([getattr(r, name) for r in recipients], dtype=object)
+            for name in used
+        }
+
+        for name, values in columns.items():
+            empty = values.str.strip().eq("").to_numpy()
+            if empty.any():
+                report.empty[name] = np.flatnonzero(empty).tolist()
+
+        # Longueur de l'objet personnalise: partie fixe + valeurs substituees
+        lengths = np.full(len(recipients), len(_PLACEHOLDER_RE.sub("", subject)), dtype=np.int64)
+        for name in set(subject_fields):
+            if name in columns:
+                lengths += subject_fields.count(name) * columns[name].str.len().to_numpy(dtype=np.int64)
+            else:
+                # Placeholder inconnu: reste tel quel dans l'objet
+                lengths += subject_fields.count(name) * (len(name) + 4)
+        report.max_subject_length = int(lengths.max())
+        report.long_subjects = np.flatnonzero(lengths > max_subject_length).tolist()
+        return report
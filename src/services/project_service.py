@@ -0,0 +1,193 @@
+"""
+Projet de campagne: sauvegarde et reouverture de l'etat de l'application
+(destinataires, resultats, message, images) dans un seul fichier.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from ..models import AppState, Recipient, SMTPConfig, SendStatus
+
+
+# En-tete fixe: signature, puis longueur de l'en-tete JSON
+_MAGIC = b"CSPROJ\x00\x01"
+_PREFIX = struct.Struct("<8sQ")
+_VERSION = 1
+
+
+class ProjectService:
+    """
+    Fichier projet:
+
+        signature (8 octets) | longueur de l'en-tete (8 octets)
+        en-tete JSON         message, SMTP (sans mot de passe), destinataires
+        section d'images     contenu brut des images, chacune stockee une fois
+
+    A l'ouverture, la section d'images est projetee en memoire (mmap): les
+    images des destinataires sont des vues memoryview, lues sur le disque
+    seulement quand elles sont affichees ou envoyees.
+    """
+
+    # Projections ouvertes par chemin reel (reutilisees a l'enregistrement)
+    _maps: Dict[str, mmap.mmap] = {}
+
+    @staticmethod
+    def save(path: str, state: AppState) -> Optional[str]:
+        """
+        Enregistre l'etat dans un fichier projet (ecriture atomique).
+        Les images des destinataires sont ensuite reliees au nouveau fichier.
+
+        Args:
+            path: Fichier projet
+            state: Etat a enregistrer (objet, corps, SMTP et image par defaut inclus)
+
+        Returns:
+            Message d'erreur ou None si succes
+        """
+        real = os.path.realpath(path)
+        try:
+            # Windows ne remplace pas un fichier projete: copier d'abord ses images
+            if os.name == "nt" and real in ProjectService._maps:
+                ProjectService._release(state, ProjectService._maps.pop(real))
+
+            images: List[bytes] = []
+            table: List[List[int]] = []
+            seen: Dict[bytes, int] = {}
+            offset = 0
+
+            def store(data) -> int:
+                nonlocal offset
+                key = hashlib.blake2b(data, digest_size=16).digest()
+                index = seen.get(key)
+                if index is None:
+                    index = seen[key] = len(table)
+                    table.append([offset, len(data)])
+                    images.append(data)
+                    offset += len(data)
+                return index
+
+            rows = []
+            for r in state.recipients:
+                rows.append([
+                    r.email, r.nom, r.prenom, r.numero,
+                    r.status.value, r.error, r.message_id, r.sent_at,
+                    [[store(data), name] for data, name in r.images]
+                ])
+
+            header = json.dumps({
+                "version": _VERSION,
+                "subject": state.subject,
+                "body": state.body,
+                "smtp": {
+                    "server": state.smtp.server, "port": state.smtp.port,
+                    "email": state.smtp.email, "use_tls": state.smtp.use_tls
+                },
+                "default_image": store(state.default_image) if state.default_image else None,
+                "source_files": state.source_files,
+                "images": table,
+                "recipients": rows,
+            }, ensure_ascii=False).encode("utf-8")
+
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(_PREFIX.pack(_MAGIC, len(header)))
+                f.write(header)
+                f.writelines(images)
+            os.replace(tmp, path)
+            # Plus de reference aux vues de l'ancienne projection
+            images.clear()
+
+            # Remplacer les donnees en memoire par des vues du fichier ecrit,
+            # puis fermer l'ancienne projection (POSIX)
+            previous = ProjectService._maps.get(real)
+            views, _ = ProjectService._map(path)
+            for r, row in zip(state.recipients, rows):
+                if row[8]:
+                    r.images = [(views[index], name) for index, name in row[8]]
+            if previous is not None and previous is not ProjectService._maps.get(real):
+                ProjectService._close(previous)
+            return None
+        except Exception as e:
+            return str(e)
+
+    @staticmethod
+    def load(path: str) -> Tuple[Optional[AppState], Optional[str]]:
+        """
+        Ouvre un fichier projet.
+
+        Returns:
+            Tuple (etat, message d'erreur ou None). Le mot de passe SMTP est vide.
+        """
+        try:
+            previous = ProjectService._maps.get(os.path.realpath(path))
+            views, header = ProjectService._map(path)
+            state = AppState(
+                smtp=SMTPConfig(**header["smtp"]),
+                subject=header["subject"],
+                body=header["body"],
+                default_image=(
+                    bytes(views[header["default_image"]])
+                    if header["default_image"] is not None else None
+                ),
+                source_files=header.get("source_files", [])
+            )
+            state.recipients = [
+                Recipient(
+                    email=email, nom=nom, prenom=prenom, numero=numero,
+                    images=[(views[index], name) for index, name in images],
+                    status=SendStatus(status), error=error,
+                    message_id=message_id, sent_at=sent_at
+                )
+                for email, nom, prenom, numero, status, error, message_id, sent_at, images
+                in header["recipients"]
+            ]
+            # Projection precedente du meme fichier (etat remplace par celui-ci)
+            if previous is not None and previous is not ProjectService._maps.get(os.path.realpath(path)):
+                ProjectService._close(previous)
+            return state, None
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    def _map(path: str) -> Tuple[List[memoryview], dict]:
+        """Lit l'en-tete et projette le fichier: (vues des images, en-tete)."""
+        with open(path, "rb") as f:
+            magic, length = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != _MAGIC:
+                raise ValueError("Fichier projet invalide")
+            header = json.loads(f.read(length).decode("utf-8"))
+            if header.get("version", 0) > _VERSION:
+                raise ValueError("Fichier projet d'une version plus recente")
+
+            views = []
+            real = os.path.realpath(path)
+            if header["images"]:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                ProjectService._maps[real] = mapped
+                base = memoryview(mapped)[_PREFIX.size + length:]
+                views = [base[offset:offset + size] for offset, size in header["images"]]
+            else:
+                # Plus d'images: l'ancienne projection n'est plus la projection courante
+                ProjectService._maps.pop(real, None)
+        return views, header
+
+    @staticmethod
+    def _release(state: AppState, mapped: mmap.mmap):
+        """Copie en memoire les images encore lues dans `mapped` et ferme la projection."""
+        for r in state.recipients:
+            if any(isinstance(data, memoryview) and data.obj is mapped for data, _ in r.images):
+                r.images = [(bytes(data), name) for data, name in r.images]
+        ProjectService._close(mapped)
+
+    @staticmethod
+    def _close(mapped: mmap.mmap):
+        """Ferme une projection si plus aucune vue ne l'utilise."""
+        try:
+            mapped.close()
+        except BufferError:
+            # Vue encore utilisee ailleurs (dialogue ouvert): fermee par le ramasse-miettes
+            pass
@@ -0,0 +1,206 @@
+"""
+Rendu des messages en parallele dans un pool de processus.
+"""
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from ..config import RENDER_WORKERS, RENDER_QUEUE_SIZE
+from ..models import Recipient
+from .email_service import EmailService
+
+
+@dataclass
+class RenderedMessage:
+    """Message serialise pret a etre envoye (ou erreur de rendu)."""
+    index: int
+    recipient: Recipient
+    message_id: Optional[str] = None
+    data: Optional[bytes] = None
+    error: Optional[str] = None
+    # Ecarte avant le rendu (liste d'opposition): rien a envoyer
+    skipped: bool = False
+
+
+# Gabarit commun, installe une fois par processus de rendu
+_template = None
+
+
+def _init_worker(sender: str, subject: str, body: str, default_image: Optional[bytes]):
+    """Initialise un processus de rendu avec les elements communs a tous les mails."""
+    global _template
+    _template = (sender, subject, body, default_image)
+
+
+def _render(recipient: Recipient, personal_images: List[Tuple[bytes, str]]) -> Tuple[str, bytes]:
+    """Rend un message dans le processus courant (gabarit deja installe)."""
+    sender, subject, body, default_image = _template
+    return EmailService.render_message(
+        sender, recipient, subject, body,
+        default_image=default_image,
+        personal_images=personal_images or None
+    )
+
+
+class RenderPool:
+    """
+    Construit les messages complets (MIME + base64) dans des processus
+    separes et les livre, dans l'ordre, via une file bornee.
+
+    Le rendu (CPU) et l'envoi (reseau) se recouvrent: les sessions SMTP
+    consomment la file pendant que le pool prepare les messages suivants.
+    Avec workers=0, le rendu se fait dans un thread (sans processus).
+    """
+
+    def __init__(
+        self,
+        sender: str,
+        subject: str,
+        body: str,
+        default_image: Optional[bytes] = None,
+        workers: Optional[int] = RENDER_WORKERS,
+        queue_size: int = RENDER_QUEUE_SIZE,
+        optimizer=None,
+        skip: Optional[Callable[[Recipient], bool]] = None
+    ):
+        self.optimizer = optimizer
+        # Destinataires livres sans rendu (p.ex. adresses en liste d'opposition)
+        self.skip = skip
+        self.queue_size = max(1, queue_size)
+        if optimizer and default_image:
+            default_image = optimizer.optimize(bytes(default_image))
+        self._template = (sender, subject, body, bytes(default_image) if default_image else None)
+        self._workers = workers
+        self._executor = None
+        self._queue: "queue.Queue[Optional[RenderedMessage]]" = queue.Queue(maxsize=self.queue_size)
+        self._closed = threading.Event()
+        self._thread = None
+        # Erreur de lecture des destinataires (source interrompue)
+        self.error: Optional[str] = None
+
+    def start(self, recipients: Iterable[Recipient]) -> "RenderPool":
+        """Demarre le rendu des destinataires en arriere-plan."""
+        if self._workers != 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                initializer=_init_worker,
+                initargs=self._template
+            )
+        self._thread = threading.Thread(target=self._produce, args=(recipients,), daemon=True)
+        self._thread.start()
+        return self
+
+    def get(self) -> Optional[RenderedMessage]:
+        """Retourne le prochain message rendu, ou None quand tout a ete livre (ou apres stop())."""
+        while True:
+            try:
+                item = self._queue.get(timeout=0.2)
+                break
+            except queue.Empty:
+                if self._closed.is_set():
+                    return None
+        if item is None:
+            # Laisser la fin visible pour les autres consommateurs
+            self._queue.put(None)
+        return item
+
+    def __iter__(self):
+        while True:
+            item = self.get()
+            if item is None:
+                return
+            yield item
+
+    def stop(self):
+        """Arrete le rendu sans attendre (non bloquant, appelable depuis un autre thread)."""
+        self._closed.set()
+
+    def close(self):
+        """Arrete le rendu et libere les processus."""
+        self._closed.set()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        # Le producteur annule les rendus en attente en s'arretant
+        # (shutdown(cancel_futures=True) demande Python 3.9)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _produce(self, recipients: Iterable[Recipient]):
+        """Soumet les rendus et livre les resultats dans l'ordre."""
+        inflight = deque()
+        try:
+            for index, recipient in enumerate(recipients):
+                if self._closed.is_set():
+                    return
+                skipped = self.skip is not None and self.skip(recipient)
+                inflight.append((index, recipient, None if skipped else self._submit(recipient)))
+                if len(inflight) >= self.queue_size:
+                    self._deliver(*inflight.popleft())
+            while inflight and not self._closed.is_set():
+                self._deliver(*inflight.popleft())
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            for _, _, future in inflight:
+                if future is not None:
+                    future.cancel()
+            self._put(None)
+
+    def _submit(self, recipient: Recipient) -> Future:
+        """Lance le rendu d'un destinataire."""
+        images = recipient.images
+        if self.optimizer and images:
+            images = self.optimizer.optimize_images(images)
+        # Copie legere: seules les donnees utiles traversent le pickle
+        light = Recipient(
+            email=recipient.email,
+            nom=recipient.nom,
+            prenom=recipient.prenom,
+            numero=recipient.numero
+        )
+        images = [(bytes(data), name) for data, name in images]
+
+        if self._executor is not None:
+            return self._executor.submit(_render, light, images)
+
+        future = Future()
+        try:
+            sender, subject, body, default_image = self._template
+            future.set_result(EmailService.render_message(
+                sender, light, subject, body,
+                default_image=default_image,
+                personal_images=images or None
+            ))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _deliver(self, index: int, recipient: Recipient, future: Optional[Future]):
+        """Attend un rendu et le place dans la file de sortie."""
+        if future is None:
+            self._put(RenderedMessage(index, recipient, skipped=True))
+            return
+        try:
+            message_id, data = future.result()
+            item = RenderedMessage(index, recipient, message_id, data)
+        except Exception as e:
+            item = RenderedMessage(index, recipient, error=str(e) or type(e).__name__)
+        self._put(item)
+
+    def _put(self, item: Optional[RenderedMessage]):
+        """Ajoute a la file bornee sans bloquer indefiniment apres close()."""
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                continue
@@ -0,0 +1,434 @@
+"""
+Envoi planifie: une campagne est repartie sur des plages horaires et
+un quota quotidien, et reprend a la position enregistree.
+"""
+
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, time as dtime, timedelta
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from ..config import SCHEDULE_WINDOWS, SCHEDULE_POLL
+from ..models import SMTPConfig, Recipient, SendWindow
+from .estimate_service import provider_limits
+from .send_engine import SendEngine, ResultCallback
+from .smtp_session import ResumableSSLContext
+from .source_service import RecipientSource
+
+
+# Callback d'attente: (date de reprise, raison)
+WaitCallback = Callable[[datetime, str], None]
+
+
+@dataclass
+class ScheduleState:
+    """Avancement persistant d'une campagne planifiee."""
+    # Index du prochain destinataire a traiter
+    position: int = 0
+    day: str = ""
+    sent_today: int = 0
+    success: int = 0
+    failed: int = 0
+    suppressed: int = 0
+
+
+def _parse_time(value: str) -> dtime:
+    hours, minutes = value.split(":")
+    return dtime(int(hours), int(minutes))
+
+
+class CampaignScheduler:
+    """
+    Campagne planifiee enregistree dans un dossier:
+
+        campaign.json     configuration SMTP (sans mot de passe), message,
+                          plages horaires, quota quotidien
+        recipients.json   destinataires (images dans images/)
+        default_image     image par defaut (optionnelle)
+        state.json        position et compteurs, mis a jour apres chaque envoi
+
+    Pour les tres grandes listes, les fichiers importes peuvent etre copies
+    dans source/ a la place de recipients.json: ils sont alors relus par lots
+    pendant l'envoi (RecipientSource), memoire constante.
+    """
+
+    CAMPAIGN_FILE = "campaign.json"
+    RECIPIENTS_FILE = "recipients.json"
+    STATE_FILE = "state.json"
+    DEFAULT_IMAGE_FILE = "default_image"
+    IMAGES_DIR = "images"
+    SOURCE_DIR = "source"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.config = SMTPConfig()
+        self.subject = ""
+        self.body = ""
+        self.default_image: Optional[bytes] = None
+        self.recipients: Union[List[Recipient], RecipientSource] = []
+        self.windows: List[SendWindow] = []
+        self.daily_quota: Optional[int] = None
+        self.state = ScheduleState()
+        # Contexte TLS commun aux plages d'envoi (reprise des sessions TLS)
+        self.tls = ResumableSSLContext()
+
+    # --- Persistance ----------------------------------------------------
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        """True si le dossier contient deja une campagne."""
+        return os.path.exists(os.path.join(path, cls.CAMPAIGN_FILE))
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        config: SMTPConfig,
+        subject: str,
+        body: str,
+        recipients: List[Recipient],
+        default_image: Optional[bytes] = None,
+        windows: Optional[List[SendWindow]] = None,
+        daily_quota: Optional[int] = None,
+        source: Optional[RecipientSource] = None
+    ) -> Tuple[Optional["CampaignScheduler"], Optional[str]]:
+        """
+        Enregistre une nouvelle campagne dans le dossier.
+
+        Args:
+            windows: Plages horaires (SCHEDULE_WINDOWS par defaut, [] = sans restriction)
+            daily_quota: Quota quotidien (celui du fournisseur par defaut)
+            source: Fichiers a relire pendant l'envoi (remplace recipients, copies dans source/)
+
+        Returns:
+            Tuple (planificateur, message d'erreur ou None)
+        """
+        scheduler = cls(path)
+        scheduler.config = SMTPConfig(
+            server=config.server, port=config.port, email=config.email, use_tls=config.use_tls
+        )
+        scheduler.subject = subject
+        scheduler.body = body
+        scheduler.default_image = default_image
+        scheduler.windows = (
+            [SendWindow(start, end) for start, end in SCHEDULE_WINDOWS]
+            if windows is None else list(windows)
+        )
+        scheduler.daily_quota = (
+            provider_limits(config.server)["daily_quota"] if daily_quota is None else daily_quota
+        )
+
+        try:
+            if source is not None:
+                source_info = cls._copy_source(path, source)
+                scheduler.recipients, error = cls._open_source(path, source_info)
+                if error:
+                    return None, error
+            else:
+                source_info = None
+                scheduler.recipients = [
+                    Recipient(email=r.email, nom=r.nom, prenom=r.prenom, numero=r.numero, images=list(r.images))
+                    for r in recipients
+                ]
+                cls._write_recipients(path, scheduler.recipients)
+
+            if default_image:
+                with open(os.path.join(path, cls.DEFAULT_IMAGE_FILE), "wb") as f:
+                    f.write(default_image)
+
+            cls._write_json(os.path.join(path, cls.CAMPAIGN_FILE), {
+                "smtp": {
+                    "server": config.server, "port": config.port,
+                    "email": config.email, "use_tls": config.use_tls
+                },
+                "subject": subject,
+                "body": body,
+                "windows": [asdict(w) for w in scheduler.windows],
+                "daily_quota": scheduler.daily_quota,
+                "source": source_info,
+            })
+            scheduler.save_state()
+            return scheduler, None
+        except Exception as e:
+            return None, str(e)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple[Optional["CampaignScheduler"], Optional[str]]:
+        """
+        Charge une campagne enregistree.
+
+        Returns:
+            Tuple (planificateur, message d'erreur ou None)
+        """
+        scheduler = cls(path)
+        try:
+            with open(os.path.join(path, cls.CAMPAIGN_FILE), encoding="utf-8") as f:
+                campaign = json.load(f)
+            scheduler.config = SMTPConfig(**campaign["smtp"])
+            scheduler.subject = campaign["subject"]
+            scheduler.body = campaign["body"]
+            scheduler.windows = [
+                SendWindow(w["start"], w["end"], tuple(w["days"])) for w in campaign["windows"]
+            ]
+            scheduler.daily_quota = campaign.get("daily_quota")
+
+            default_image_path = os.path.join(path, cls.DEFAULT_IMAGE_FILE)
+            if os.path.exists(default_image_path):
+                with open(default_image_path, "rb") as f:
+                    scheduler.default_image = f.read()
+
+            if campaign.get("source"):
+                scheduler.recipients, error = cls._open_source(path, campaign["source"])
+                if error:
+                    return None, error
+            else:
+                scheduler.recipients = cls._read_recipients(path)
+
+            state_path = os.path.join(path, cls.STATE_FILE)
+            if os.path.exists(state_path):
+                with open(state_path, encoding="utf-8") as f:
+                    scheduler.state = ScheduleState(**json.load(f))
+            return scheduler, None
+        except Exception as e:
+            return None, str(e)
+
+    @classmethod
+    def _write_recipients(cls, path: str, recipients: List[Recipient]):
+        """Ecrit recipients.json et les images personnelles."""
+        images_dir = os.path.join(path, cls.IMAGES_DIR)
+        os.makedirs(images_dir, exist_ok=True)
+
+        rows = []
+        for idx, recipient in enumerate(recipients):
+            images = []
+            for n, (data, name) in enumerate(recipient.images):
+                filename = f"{idx}_{n}"
+                with open(os.path.join(images_dir, filename), "wb") as f:
+                    f.write(data)
+                images.append([filename, name])
+            rows.append({
+                "email": recipient.email, "nom": recipient.nom,
+                "prenom": recipient.prenom, "numero": recipient.numero,
+                "images": images
+            })
+        cls._write_json(os.path.join(path, cls.RECIPIENTS_FILE), rows)
+
+    @classmethod
+    def _read_recipients(cls, path: str) -> List[Recipient]:
+        """Relit recipients.json et les images personnelles."""
+        images_dir = os.path.join(path, cls.IMAGES_DIR)
+        with open(os.path.join(path, cls.RECIPIENTS_FILE), encoding="utf-8") as f:
+            rows = json.load(f)
+        recipients = []
+        for row in rows:
+            images = []
+            for filename, name in row["images"]:
+                with open(os.path.join(images_dir, filename), "rb") as img:
+                    images.append((img.read(), name))
+            recipients.append(Recipient(
+                email=row["email"], nom=row["nom"], prenom=row["prenom"],
+                numero=row["numero"], images=images
+            ))
+        return recipients
+
+    @classmethod
+    def _copy_source(cls, path: str, source: RecipientSource) -> dict:
+        """Copie les fichiers de la source dans source/ (campagne autonome)."""
+        source_dir = os.path.join(path, cls.SOURCE_DIR)
+        os.makedirs(source_dir, exist_ok=True)
+        files = []
+        for n, filepath in enumerate(source.filepaths):
+            # Prefixe: deux fichiers importes peuvent porter le meme nom
+            filename = f"{n}_{os.path.basename(filepath)}"
+            shutil.copyfile(filepath, os.path.join(source_dir, filename))
+            files.append(filename)
+
+        images = None
+        if source.images_path:
+            images = "images_" + os.path.basename(os.path.normpath(source.images_path))
+            target = os.path.join(source_dir, images)
+            if os.path.isdir(source.images_path):
+                shutil.copytree(source.images_path, target, dirs_exist_ok=True)
+            else:
+                shutil.copyfile(source.images_path, target)
+        return {"files": files, "images": images}
+
+    @classmethod
+    def _open_source(cls, path: str, info: dict) -> Tuple[Optional[RecipientSource], Optional[str]]:
+        """Ouvre et analyse la source enregistree dans source/."""
+        source_dir = os.path.join(path, cls.SOURCE_DIR)
+        source = RecipientSource(
+            [os.path.join(source_dir, name) for name in info["files"]],
+            images=os.path.join(source_dir, info["images"]) if info.get("images") else None
+        )
+        error = source.scan()
+        return (None, error) if error else (source, None)
+
+    def iter_recipients(self, start: int = 0) -> Iterator[Recipient]:
+        """Destinataires a partir de la position `start` (liste ou source sur disque)."""
+        if isinstance(self.recipients, RecipientSource):
+            return self.recipients.iter_from(start)
+        return islice(self.recipients, start, None)
+
+    def save_state(self):
+        """Enregistre l'avancement (ecriture atomique)."""
+        self._write_json(os.path.join(self.path, self.STATE_FILE), asdict(self.state))
+
+    @staticmethod
+    def _write_json(path: str, data):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    # --- Plages horaires ------------------------------------------------
+
+    @property
+    def finished(self) -> bool:
+        """True quand tous les destinataires ont ete traites."""
+        return self.state.position >= len(self.recipients)
+
+    def window_end(self, now: datetime) -> Optional[datetime]:
+        """Fin de la plage en cours, None si l'envoi n'est pas autorise maintenant."""
+        if not self.windows:
+            return datetime.max
+        ends = [
+            datetime.combine(now.date(), _parse_time(w.end))
+            for w in self.windows
+            if now.weekday() in w.days
+            and _parse_time(w.start) <= now.time() < _parse_time(w.end)
+        ]
+        return max(ends) if ends else None
+
+    def next_window_start(self, after: datetime) -> datetime:
+        """Debut de la prochaine plage autorisee a partir de `after` (inclus)."""
+        if not self.windows or self.window_end(after) is not None:
+            return after
+        for offset in range(8):
+            day = after.date() + timedelta(days=offset)
+            starts = [
+                datetime.combine(day, _parse_time(w.start))
+                for w in self.windows
+                if day.weekday() in w.days
+            ]
+            starts = [s for s in starts if s >= after]
+            if starts:
+                return min(starts)
+        raise ValueError("Aucune plage horaire valide")
+
+    # --- Envoi ----------------------------------------------------------
+
+    def run(
+        self,
+        password: str,
+        on_result: Optional[ResultCallback] = None,
+        on_wait: Optional[WaitCallback] = None,
+        stop_event: Optional[threading.Event] = None,
+        optimizer=None,
+        suppression=None,
+        message_index=None
+    ) -> Tuple[int, int]:
+        """
+        Envoie la campagne en respectant plages horaires et quota (bloquant).
+        Attend la plage ou le jour suivant si necessaire; s'arrete quand
+        tous les destinataires sont traites ou que stop_event est leve.
+
+        Args:
+            password: Mot de passe SMTP (jamais enregistre)
+            on_result: Appele apres chaque destinataire (index absolu)
+            on_wait: Appele avant chaque attente (date de reprise, raison)
+            stop_event: Evenement d'arret
+
+        Returns:
+            Tuple (nombre de succes, nombre d'echecs) cumules
+        """
+        stop = stop_event or threading.Event()
+        config = SMTPConfig(
+            server=self.config.server, port=self.config.port, email=self.config.email,
+            password=password, use_tls=self.config.use_tls
+        )
+
+        while not self.finished and not stop.is_set():
+            now = datetime.now()
+            self._roll_day(now.date())
+
+            if self.daily_quota and self.state.sent_today >= self.daily_quota:
+                tomorrow = datetime.combine(now.date() + timedelta(days=1), dtime())
+                resume, reason = self.next_window_start(tomorrow), "quota quotidien atteint"
+            else:
+                end = self.window_end(now)
+                if end is not None:
+                    error = self._run_window(
+                        config, end, on_result, stop, optimizer, suppression, message_index
+                    )
+                    if error:
+                        raise RuntimeError(error)
+                    continue
+                resume, reason = self.next_window_start(now), "hors plage horaire"
+
+            if on_wait:
+                on_wait(resume, reason)
+            stop.wait(max(1.0, min((resume - now).total_seconds(), SCHEDULE_POLL)))
+
+        return self.state.success, self.state.failed
+
+    def _roll_day(self, today: date):
+        """Remet le compteur quotidien a zero au changement de jour."""
+        if self.state.day != today.isoformat():
+            self.state.day = today.isoformat()
+            self.state.sent_today = 0
+            self.save_state()
+
+    def _run_window(self, config, end, on_result, stop, optimizer, suppression, message_index) -> Optional[str]:
+        """Envoie jusqu'a la fin de la plage, du quota ou de la liste."""
+        start = self.state.position
+        budget = self.daily_quota - self.state.sent_today if self.daily_quota else None
+
+        def source():
+            for offset, recipient in enumerate(self.iter_recipients(start)):
+                if stop.is_set() or datetime.now() >= end:
+                    return
+                if budget is not None and offset >= budget:
+                    return
+                yield recipient
+
+        # Resultats signales par plusieurs sessions en parallele
+        lock = threading.Lock()
+
+        def result(idx, recipient, success, error):
+            absolute = start + idx
+            with lock:
+                if success:
+                    self.state.success += 1
+                elif error is None:
+                    self.state.suppressed += 1
+                else:
+                    self.state.failed += 1
+                if success or error is not None:
+                    self.state.sent_today += 1
+
+                # Premier destinataire non traite (resultats hors ordre possibles
+                # avec plusieurs sessions)
+                self.state.position = start + engine.position
+                self.save_state()
+
+            if on_result:
+                on_result(absolute, recipient, success, error)
+
+        engine = SendEngine(
+            config, self.subject, self.body,
+            default_image=self.default_image,
+            optimizer=optimizer,
+            suppression=suppression,
+            cancel_event=stop,
+            message_index=message_index,
+            tls=self.tls,
+            # Les messages deja rendus a la fin de la plage attendent la suivante
+            stop_when=lambda: datetime.now() >= end
+        )
+        engine.run(source(), result)
+        return engine.error
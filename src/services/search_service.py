@@ -0,0 +1,167 @@
+"""
+Recherche de destinataires par nom, prenom ou adresse dans une grande liste.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from ..config import SEARCH_PAGE_SIZE
+from ..models import Recipient
+
+
+# Debut de mot: debut de ligne ou apres un separateur de nom ou d'adresse
+_WORD_START = r"(?<![^ \n@.\-_+'])"
+# Marques diacritiques combinantes (apres decomposition NFKD)
+_COMBINING_RE = re.compile(r"[\u0300-\u036f]+")
+
+
+class RecipientSearch:
+    """
+    Index de recherche "prenom nom email" des destinataires.
+
+    Les lignes normalisees (minuscules, sans accents) sont concatenees dans
+    une seule chaine; chaque recherche la parcourt en sautant a la ligne
+    suivante des la premiere correspondance, et le rang est retrouve par
+    dichotomie sur les debuts de ligne. Les destinataires dont un mot
+    commence par la recherche sont classes avant les simples sous-chaines.
+
+    L'index est construit a la premiere recherche non vide: une recherche
+    vide renvoie directement une page de la liste. Apres une modification,
+    seules les lignes concernees sont normalisees a nouveau (update, remove).
+    """
+
+    def __init__(self, recipients: Sequence[Recipient]):
+        self.recipients = recipients
+        # Lignes normalisees, une par destinataire (None: pas encore construites)
+        self._lines: Optional[List[str]] = None
+        self._corpus: Optional[str] = None
+        # Position du debut de chaque ligne dans _corpus
+        self._starts: List[int] = []
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Minuscules sans accents ("eloise" trouve "Eloise" accentue)."""
+        text = text.lower()
+        if text.isascii():
+            return text
+        return _COMBINING_RE.sub("", unicodedata.normalize("NFKD", text))
+
+    @staticmethod
+    def label(recipient: Recipient) -> str:
+        """Libelle affiche d'un destinataire."""
+        return f"{recipient.prenom} {recipient.nom} <{recipient.email}>"
+
+    @staticmethod
+    def _line(recipient: Recipient) -> str:
+        return f"{recipient.prenom} {recipient.nom} {recipient.email}".replace("\n", " ")
+
+    def invalidate(self):
+        """A appeler apres modification de la liste (reconstruit a la recherche suivante)."""
+        self._lines = None
+        self._corpus = None
+        self._starts = []
+
+    def update(self, rows: Iterable[int]):
+        """
+        Reindexe des destinataires modifies sur place ou ajoutes en fin de liste.
+
+        Args:
+            rows: Rangs des destinataires dans la liste
+        """
+        if self._lines is None:
+            return
+        lines = self._lines
+        for row in sorted(rows):
+            line = self.normalize(self._line(self.recipients[row]))
+            if row < len(lines):
+                lines[row] = line
+            else:
+                lines.append(line)
+        self._corpus = None
+
+    def remove(self, kept: Sequence[Recipient], removed: Iterable[Recipient]):
+        """
+        Retire des destinataires de l'index (un parcours, sans renormaliser).
+
+        Args:
+            kept: Nouvelle liste (destinataires restants, ordre conserve)
+            removed: Destinataires retires de l'ancienne liste
+        """
+        if self._lines is not None:
+            ids = {id(r) for r in removed}
+            self._lines = [line for line, r in zip(self._lines, self.recipients) if id(r) not in ids]
+            self._corpus = None
+        self.recipients = kept
+
+    def _build(self):
+        if self._lines is None:
+            # Une seule normalisation pour toute la liste
+            corpus = self.normalize("\n".join(self._line(r) for r in self.recipients))
+            self._lines = corpus.split("\n") if self.recipients else []
+        else:
+            corpus = "\n".join(self._lines)
+        self._starts = [0] + list(accumulate(len(line) + 1 for line in self._lines))[:-1]
+        self._corpus = corpus
+
+    def search(
+        self,
+        query: str,
+        offset: int = 0,
+        limit: int = SEARCH_PAGE_SIZE
+    ) -> Tuple[List[int], Optional[int]]:
+        """
+        Une page de resultats.
+
+        Le parcours s'arrete des que la page ne peut plus changer (assez de
+        correspondances en debut de mot): le total n'est alors pas connu.
+
+        Args:
+            query: Texte recherche (casse et accents ignores)
+            offset: Rang du premier resultat de la page
+            limit: Nombre de resultats par page
+
+        Returns:
+            Tuple (rangs des destinataires de la page, nombre total de
+            resultats ou None s'il y en a plus de offset + limit)
+        """
+        query = self.normalize(query).strip()
+        if not query:
+            total = len(self.recipients)
+            return list(range(offset, min(offset + limit, total))), total
+
+        if self._corpus is None:
+            self._build()
+
+        corpus, starts = self._corpus, self._starts
+        escaped = re.escape(query)
+        anywhere = re.compile(escaped)
+        word = re.compile(_WORD_START + escaped)
+
+        prefix: List[int] = []
+        inner: List[int] = []
+        position = 0
+        while True:
+            match = anywhere.search(corpus, position)
+            if match is None:
+                break
+            row = bisect_right(starts, match.start()) - 1
+            end = starts[row + 1] - 1 if row + 1 < len(starts) else len(corpus)
+            if word.search(corpus, match.start(), end):
+                prefix.append(row)
+                if len(prefix) > offset + limit:
+                    return prefix[offset:offset + limit], None
+            else:
+                inner.append(row)
+            # Une seule fois par destinataire
+            position = end
+
+        rows = prefix + inner
+        return rows[offset:offset + limit], len(rows)
+
+    def matches(self, query: str) -> List[int]:
+        """Rangs de tous les destinataires correspondants, dans l'ordre de la liste."""
+        rows, _ = self.search(query, 0, len(self.recipients))
+        return sorted(rows)
@@ -0,0 +1,236 @@
+"""
+Moteur d'envoi en masse.
+"""
+
+import threading
+import time
+from typing import Callable, Iterable, Optional, Tuple
+
+from ..config import RENDER_WORKERS, SMTP_SESSIONS, SEND_DELAY, PAUSE_KEEPALIVE
+from ..models import SMTPConfig, Recipient, SendStatus
+from .render_service import RenderPool
+from .smtp_session import SMTPSession, ResumableSSLContext
+
+
+# Callback de resultat: (index, destinataire, succes, erreur)
+ResultCallback = Callable[[int, Recipient, bool, Optional[str]], None]
+
+
+class SendEngine:
+    """
+    Envoie une campagne: les messages sont rendus dans un pool de
+    processus (RenderPool) et transmis par des sessions SMTP reutilisees.
+
+    pause(), resume() et cancel() sont appelables depuis un autre thread:
+    le message en cours d'envoi se termine, puis les sessions attendent
+    (ouvertes, maintenues par NOOP) ou s'arretent. `position` indique le
+    premier destinataire non traite.
+
+    `stop_when` (p.ex. fin de plage horaire) est verifie juste avant chaque
+    envoi: les messages deja rendus mais pas envoyes restent non traites.
+    """
+
+    def __init__(
+        self,
+        config: SMTPConfig,
+        subject: str,
+        body: str,
+        default_image: Optional[bytes] = None,
+        optimizer=None,
+        workers: Optional[int] = RENDER_WORKERS,
+        sessions: int = SMTP_SESSIONS,
+        delay: float = SEND_DELAY,
+        suppression=None,
+        session_factory: Optional[Callable[[], SMTPSession]] = None,
+        update_status: bool = True,
+        cancel_event: Optional[threading.Event] = None,
+        message_index=None,
+        tls: Optional[ResumableSSLContext] = None,
+        stop_when: Optional[Callable[[], bool]] = None
+    ):
+        self.config = config
+        self.subject = subject
+        self.body = body
+        self.default_image = default_image
+        self.optimizer = optimizer
+        self.workers = workers
+        self.sessions = max(1, sessions)
+        self.delay = delay
+        # Liste d'opposition verifiee juste avant chaque envoi
+        self.suppression = suppression
+        # Contexte TLS partage par les sessions (reprise des sessions TLS a la reconnexion)
+        self.tls = tls or ResumableSSLContext()
+        # Fabrique des sessions d'envoi (SMTP par defaut, DryRunSession en simulation)
+        self.session_factory = session_factory or (lambda: SMTPSession(config, tls=self.tls))
+        # False en simulation: les statuts des destinataires restent inchanges
+        self.update_status = update_status
+        # Index Message-ID -> adresse des messages envoyes (retours DSN)
+        self.message_index = message_index
+        # Predicat d'arret verifie avant chaque envoi (None: jamais)
+        self.stop_when = stop_when
+        self._lock = threading.Lock()
+        self.success_count = 0
+        self.failed_count = 0
+        self.suppressed_count = 0
+        # Erreur bloquante (lecture de la source), None si aucune
+        self.error: Optional[str] = None
+        # Pause (evenement leve = envoi autorise) et annulation (partageable)
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = cancel_event or threading.Event()
+        self._pool: Optional[RenderPool] = None
+        # Premier index non traite (les resultats peuvent arriver dans le desordre)
+        self.position = 0
+        self._done = set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def pause(self):
+        """Suspend l'envoi apres le message en cours."""
+        self._running.clear()
+
+    def resume(self):
+        """Reprend l'envoi avec les sessions deja ouvertes."""
+        self._running.set()
+
+    def cancel(self):
+        """Arrete l'envoi apres le message en cours (definitif)."""
+        self._cancelled.set()
+        self._running.set()
+        if self._pool is not None:
+            self._pool.stop()
+
+    def run(
+        self,
+        recipients: Iterable[Recipient],
+        on_result: Optional[ResultCallback] = None
+    ) -> Tuple[int, int]:
+        """
+        Envoie les mails a tous les destinataires (bloquant).
+
+        Args:
+            recipients: Destinataires a traiter, lus au fur et a mesure (liste
+                ou flux, p.ex. RecipientSource pour les tres grandes listes)
+            on_result: Appele apres chaque destinataire. Les adresses exclues
+                (statut SUPPRESSED) sont signalees avec succes=False et
+                erreur=None, et ne comptent ni en succes ni en echec
+
+        Returns:
+            Tuple (nombre de succes, nombre d'echecs)
+        """
+        pool = RenderPool(
+            self.config.email, self.subject, self.body,
+            default_image=self.default_image,
+            workers=self.workers,
+            optimizer=self.optimizer,
+            # Adresses exclues ecartees avant le rendu
+            skip=self._suppressed if self.suppression is not None else None
+        )
+        self._pool = pool
+        if self.cancelled:
+            pool.stop()
+        pool.start(recipients)
+
+        try:
+            if self.sessions == 1:
+                self._consume(pool, on_result)
+            else:
+                threads = [
+                    threading.Thread(target=self._consume, args=(pool, on_result), daemon=True)
+                    for _ in range(self.sessions)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            pool.close()
+            self._pool = None
+
+        self.error = pool.error
+        return self.success_count, self.failed_count
+
+    def _consume(self, pool: RenderPool, on_result: Optional[ResultCallback]):
+        """Boucle d'une session SMTP: envoie les messages rendus."""
+        with self.session_factory() as session:
+            for item in pool:
+                if not self._wait_running(session):
+                    break
+                if self.stop_when is not None and self.stop_when():
+                    pool.stop()
+                    break
+                recipient = item.recipient
+                # Liste verifiee au rendu et de nouveau juste avant l'envoi
+                if item.skipped or self._suppressed(recipient):
+                    with self._lock:
+                        if self.update_status:
+                            recipient.status = SendStatus.SUPPRESSED
+                            recipient.error = None
+                        self.suppressed_count += 1
+                        self._advance(item.index)
+                    if on_result:
+                        on_result(item.index, recipient, False, None)
+                    continue
+
+                error = item.error
+                if error is None:
+                    try:
+                        session.send_raw(self.config.email, [recipient.email], item.data)
+                    except Exception as e:
+                        error = str(e)
+
+                sent_at = time.time()
+                with self._lock:
+                    if error is None:
+                        self.success_count += 1
+                        if self.message_index is not None:
+                            self.message_index.record(item.message_id, recipient.email, sent_at)
+                    else:
+                        self.failed_count += 1
+                    if self.update_status:
+                        recipient.status = SendStatus.SUCCESS if error is None else SendStatus.FAILED
+                        recipient.error = error
+                        if error is None:
+                            recipient.message_id = item.message_id
+                            recipient.sent_at = sent_at
+                    self._advance(item.index)
+                # Hors verrou: un callback lent ne bloque pas les autres sessions
+                if on_result:
+                    on_result(item.index, recipient, error is None, error)
+
+                # Attente interrompue immediatement par cancel()
+                if self.delay and self._cancelled.wait(self.delay):
+                    break
+
+    def _suppressed(self, recipient: Recipient) -> bool:
+        """True si l'adresse est dans la liste d'opposition."""
+        return self.suppression is not None and recipient.email in self.suppression
+
+    def _wait_running(self, session) -> bool:
+        """
+        Bloque pendant une pause en gardant la session ouverte (NOOP).
+
+        Returns:
+            False si la campagne est annulee
+        """
+        last_noop = time.monotonic()
+        while not self._running.wait(0.2):
+            if self._cancelled.is_set():
+                return False
+            if time.monotonic() - last_noop >= PAUSE_KEEPALIVE:
+                session.noop()
+                last_noop = time.monotonic()
+        return not self._cancelled.is_set()
+
+    def _advance(self, index: int):
+        """Marque un index comme traite et avance la position (verrou tenu)."""
+        self._done.add(index)
+        while self.position in self._done:
+            self._done.discard(self.position)
+            self.position += 1
@@ -0,0 +1,397 @@
+"""
+Session SMTP reutilisable pour l'envoi de plusieurs messages.
+"""
+
+import re
+import smtplib
+import socket
+import ssl
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..config import (
+    SMTP_TIMEOUT, SMTP_IDLE_NOOP, SMTP_NOOP_TIMEOUT, SMTP_SESSION_MAX_MESSAGES,
+    SMTP_SESSION_MAX_AGE, SMTP_RECONNECT_RETRIES, SMTP_RECONNECT_DELAY
+)
+from ..models import SMTPConfig
+
+
+# Point en debut de ligne (a doubler dans DATA)
+_DOT_RE = re.compile(rb"(?m)^\.")
+
+
+def _is_ascii(*addresses: str) -> bool:
+    """True si toutes les adresses sont ASCII (sinon SMTPUTF8 via smtplib)."""
+    return all(address.isascii() for address in addresses)
+
+
+class ResumableSSLContext(ssl.SSLContext):
+    """
+    Contexte TLS partage par les connexions d'une campagne: chaque nouvelle
+    connexion a un serveur propose la derniere session TLS obtenue de ce
+    serveur (reprise sans echange de certificats ni calcul de cle complet).
+
+    Memes reglages que le contexte cree par defaut par smtplib (pas de
+    verification du certificat), sans chargement des certificats systeme.
+    """
+
+    def __new__(cls, protocol: int = ssl.PROTOCOL_TLS_CLIENT):
+        return super().__new__(cls, protocol)
+
+    def __init__(self, protocol: int = ssl.PROTOCOL_TLS_CLIENT):
+        self.check_hostname = False
+        self.verify_mode = ssl.CERT_NONE
+        self._lock = threading.Lock()
+        # Nom du serveur -> derniere session TLS
+        self._sessions: Dict[str, ssl.SSLSession] = {}
+        self.handshakes = 0
+        self.resumed = 0
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        """Comme SSLContext.wrap_socket, avec la session memorisee pour `server_hostname`."""
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(server_hostname)
+        tls_sock = super().wrap_socket(sock, *args, server_hostname=server_hostname, session=session, **kwargs)
+        with self._lock:
+            self.handshakes += 1
+            self.resumed += tls_sock.session_reused
+        return tls_sock
+
+    def remember(self, tls_sock):
+        """
+        Memorise la session d'une connexion etablie. Avec TLS 1.3, le ticket
+        de session arrive apres la poignee de main: appeler apres le premier
+        echange (login).
+        """
+        session = getattr(tls_sock, "session", None)
+        if session is not None:
+            with self._lock:
+                self._sessions[tls_sock.server_hostname] = session
+
+    @property
+    def resumption_rate(self) -> float:
+        """Part des connexions TLS reprises (0 si aucune reconnexion)."""
+        return self.resumed / self.handshakes if self.handshakes else 0.0
+
+    def summary(self) -> str:
+        """Resume lisible des poignees de main."""
+        return (f"TLS: {self.handshakes} connexions, {self.resumed} sessions reprises "
+                f"({self.resumption_rate:.0%})")
+
+
+class SMTPSession:
+    """
+    Connexion SMTP authentifiee, ouverte a la demande et reutilisee
+    pour les messages suivants.
+
+    Avant chaque message, une connexion inactive depuis `idle_noop`
+    secondes est verifiee par un NOOP, et une connexion qui a transmis
+    `max_messages` messages ou qui est ouverte depuis `max_age` secondes
+    est renouvelee (limites par connexion des fournisseurs). Un message
+    refuse par un 421, ou interrompu par une perte de connexion avant
+    l'envoi de son contenu, est renvoye sur une nouvelle connexion
+    (jusqu'a `retries` fois): le serveur ne l'a pas accepte.
+
+    Les connexions TLS utilisent `tls` (partage entre les sessions d'une
+    campagne pour reprendre les sessions TLS), ou un contexte propre a la
+    session.
+
+    Utilisable comme context manager:
+        with SMTPSession(config) as session:
+            session.send_raw(sender, [rcpt], data)
+    """
+
+    def __init__(
+        self,
+        config: SMTPConfig,
+        timeout: float = SMTP_TIMEOUT,
+        pipelining: bool = True,
+        idle_noop: float = SMTP_IDLE_NOOP,
+        max_messages: int = SMTP_SESSION_MAX_MESSAGES,
+        max_age: float = SMTP_SESSION_MAX_AGE,
+        retries: int = SMTP_RECONNECT_RETRIES,
+        retry_delay: float = SMTP_RECONNECT_DELAY,
+        tls: Optional[ResumableSSLContext] = None
+    ):
+        self.config = config
+        self.tls = tls or ResumableSSLContext()
+        self.timeout = timeout
+        # Utiliser PIPELINING (RFC 2920) si le serveur l'annonce
+        self.pipelining = pipelining
+        self.idle_noop = idle_noop
+        self.max_messages = max_messages
+        self.max_age = max_age
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._smtp: Optional[smtplib.SMTP] = None
+        self.messages_sent = 0
+        # Connexions ouvertes, renouvelees (limites atteintes), messages renvoyes
+        self.connections = 0
+        self.recycled = 0
+        self.reconnects = 0
+        self._connection_messages = 0
+        self._connected_at = 0.0
+        self._last_used = 0.0
+        # Contenu du message en cours deja transmis: un echec ensuite est ambigu
+        self._committed = False
+
+    @property
+    def connected(self) -> bool:
+        """True si une connexion est ouverte."""
+        return self._smtp is not None
+
+    def connect(self):
+        """Ouvre la connexion (SSL sur port 465, STARTTLS sinon) et s'authentifie."""
+        config = self.config
+        if config.port == 465:
+            smtp = smtplib.SMTP_SSL(config.server, config.port, timeout=self.timeout, context=self.tls)
+        else:
+            smtp = smtplib.SMTP(config.server, config.port, timeout=self.timeout)
+        try:
+            if config.port != 465 and config.use_tls:
+                smtp.starttls(context=self.tls)
+            smtp.login(config.email, config.password)
+            if isinstance(smtp.sock, ssl.SSLSocket):
+                self.tls.remember(smtp.sock)
+            # Detection par le systeme des connexions mortes (pare-feu, NAT)
+            smtp.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self.connections += 1
+        self._connection_messages = 0
+        self._connected_at = self._last_used = time.monotonic()
+
+    def send_raw(self, sender: str, recipients: List[str], data: bytes):
+        """
+        Envoie un message deja serialise.
+
+        Raises:
+            smtplib.SMTPException / OSError si le message n'a pas pu etre
+            transmis, nouvelles tentatives comprises. Si la connexion est
+            perdue, elle sera rouverte au prochain envoi.
+        """
+        attempt = 0
+        while True:
+            self._committed = False
+            try:
+                self._prepare()
+                self._send_once(sender, recipients, data)
+                break
+            except (smtplib.SMTPException, OSError) as e:
+                if attempt >= self.retries or not self._retryable(e):
+                    raise
+            attempt += 1
+            self.reconnects += 1
+            time.sleep(self.retry_delay * attempt)
+
+        self.messages_sent += 1
+        self._connection_messages += 1
+        self._last_used = time.monotonic()
+
+    def _prepare(self):
+        """Ouvre la connexion, ou la renouvelle / verifie selon son age et son inactivite."""
+        if self._smtp is not None:
+            now = time.monotonic()
+            if ((self.max_messages and self._connection_messages >= self.max_messages)
+                    or (self.max_age and now - self._connected_at >= self.max_age)):
+                self.close()
+                self.recycled += 1
+            elif self.idle_noop and now - self._last_used >= self.idle_noop:
+                # Connexion fermee par le serveur pendant l'attente: abandonnee par noop()
+                self.noop()
+        if self._smtp is None:
+            self.connect()
+
+    def _retryable(self, error: Exception) -> bool:
+        """True si le serveur n'a pas pu accepter le message (421, ou coupure avant le contenu)."""
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return any(code == 421 for code, _ in error.recipients.values())
+        if isinstance(error, smtplib.SMTPResponseException):
+            return error.smtp_code == 421
+        if isinstance(error, smtplib.SMTPServerDisconnected) or not isinstance(error, smtplib.SMTPException):
+            return not self._committed
+        return False
+
+    def _send_once(self, sender: str, recipients: List[str], data: bytes):
+        """Une tentative d'envoi sur la connexion courante."""
+        try:
+            if self.pipelined and _is_ascii(sender, *recipients):
+                self._sendmail_pipelined(sender, recipients, data)
+            else:
+                self._sendmail_sequential(sender, recipients, data)
+        except smtplib.SMTPRecipientsRefused as e:
+            if any(code == 421 for code, _ in e.recipients.values()):
+                self._drop()
+            raise
+        except smtplib.SMTPResponseException as e:
+            # 421: le serveur ferme la connexion
+            if e.smtp_code == 421:
+                self._drop()
+            raise
+        except OSError:
+            # Deconnexion ou erreur reseau (SMTPException herite d'OSError)
+            self._drop()
+            raise
+
+    @property
+    def pipelined(self) -> bool:
+        """True si les commandes de l'enveloppe sont envoyees groupees."""
+        return (
+            self.pipelining
+            and self._smtp is not None
+            and self._smtp.does_esmtp
+            and self._smtp.has_extn("pipelining")
+        )
+
+    def _sendmail_sequential(self, sender: str, recipients: List[str], data: bytes) -> Dict[str, Tuple[int, bytes]]:
+        """
+        smtplib.SMTP.sendmail commande par commande, pour savoir si une
+        coupure a lieu avant DATA (message renvoyable) ou apres.
+
+        Memes exceptions et meme valeur de retour que smtplib.SMTP.sendmail.
+        """
+        smtp = self._smtp
+        smtp.ehlo_or_helo_if_needed()
+        options = [f"size={len(data)}"] if smtp.does_esmtp and smtp.has_extn("size") else []
+
+        code, resp = smtp.mail(sender, options)
+        if code != 250:
+            if code == 421:
+                smtp.close()
+            else:
+                smtp._rset()
+            raise smtplib.SMTPSenderRefused(code, resp, sender)
+
+        refused = {}
+        for rcpt in recipients:
+            code, resp = smtp.rcpt(rcpt)
+            if code not in (250, 251):
+                refused[rcpt] = (code, resp)
+            if code == 421:
+                smtp.close()
+                raise smtplib.SMTPRecipientsRefused(refused)
+        if len(refused) == len(recipients):
+            smtp._rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+        self._committed = True
+        code, resp = smtp.data(data)
+        if code != 250:
+            if code == 421:
+                smtp.close()
+            else:
+                smtp._rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+
+    def _sendmail_pipelined(self, sender: str, recipients: List[str], data: bytes) -> Dict[str, Tuple[int, bytes]]:
+        """
+        Envoie MAIL FROM, RCPT TO et DATA en un seul groupe (RFC 2920),
+        puis lit les reponses dans l'ordre: un aller-retour au lieu de
+        2 + nombre de destinataires avant le contenu.
+
+        Memes exceptions et meme valeur de retour que smtplib.SMTP.sendmail.
+        """
+        smtp = self._smtp
+        options = f" SIZE={len(data)}" if smtp.has_extn("size") else ""
+        commands = [f"MAIL FROM:{smtplib.quoteaddr(sender)}{options}"]
+        commands += [f"RCPT TO:{smtplib.quoteaddr(rcpt)}" for rcpt in recipients]
+        commands.append("DATA")
+        smtp.send("\r\n".join(commands) + "\r\n")
+
+        # Lire toutes les reponses du groupe, meme en cas d'erreur
+        mail_reply = smtp.getreply()
+        refused = {}
+        for rcpt in recipients:
+            code, resp = smtp.getreply()
+            if code not in (250, 251):
+                refused[rcpt] = (code, resp)
+        data_code, data_resp = smtp.getreply()
+
+        failed = mail_reply[0] != 250 or len(refused) == len(recipients)
+        if data_code == 354 and failed:
+            # Le serveur attend quand meme le contenu: transaction vide puis RSET
+            smtp.send(b".\r\n")
+            smtp.getreply()
+        if failed or data_code != 354:
+            if 421 in (mail_reply[0], data_code):
+                smtp.close()
+            else:
+                smtp._rset()
+
+        if mail_reply[0] != 250:
+            raise smtplib.SMTPSenderRefused(mail_reply[0], mail_reply[1], sender)
+        if len(refused) == len(recipients):
+            raise smtplib.SMTPRecipientsRefused(refused)
+        if data_code != 354:
+            raise smtplib.SMTPDataError(data_code, data_resp)
+
+        # Contenu (points en debut de ligne doubles) et fin de message
+        payload = _DOT_RE.sub(b"..", data)
+        if not payload.endswith(b"\r\n"):
+            payload += b"\r\n"
+        self._committed = True
+        smtp.send(payload + b".\r\n")
+        code, resp = smtp.getreply()
+        if code != 250:
+            if code == 421:
+                smtp.close()
+            else:
+                smtp._rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+
+    def noop(self) -> bool:
+        """
+        Envoie NOOP pour garder la connexion ouverte (pendant une pause) ou
+        la verifier apres une inactivite. La reponse est attendue au plus
+        SMTP_NOOP_TIMEOUT secondes. Une connexion perdue est abandonnee et
+        sera rouverte au prochain envoi.
+
+        Returns:
+            True si la connexion est toujours utilisable
+        """
+        if self._smtp is None:
+            return False
+        try:
+            self._smtp.sock.settimeout(min(self.timeout, SMTP_NOOP_TIMEOUT))
+            code, _ = self._smtp.noop()
+            self._smtp.sock.settimeout(self.timeout)
+        except (smtplib.SMTPException, OSError, AttributeError):
+            # AttributeError: socket deja ferme (sock = None)
+            self._drop()
+            return False
+        if code != 250:
+            self._drop()
+            return False
+        self._last_used = time.monotonic()
+        return True
+
+    def close(self):
+        """Ferme proprement la connexion."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._drop()
+
+    def _drop(self):
+        """Abandonne la connexion courante sans QUIT."""
+        if self._smtp is not None:
+            try:
+                self._smtp.close()
+            except Exception:
+                pass
+        self._smtp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
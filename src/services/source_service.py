@@ -0,0 +1,194 @@
+"""
+Destinataires lus depuis le disque, par lots, pour les tres grandes campagnes.
+"""
+
+import os
+import zipfile
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from ..config import IMPORT_CHUNK_ROWS, RECIPIENT_COLUMNS
+from ..models import Recipient
+from .data_service import DataService, ProgressCallback
+
+# numpy/pandas charges au premier scan (demarrage de l'application plus rapide)
+if TYPE_CHECKING:
+    import numpy as np
+
+
+_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+
+def _email_hashes(emails: List[str]) -> "np.ndarray":
+    """Empreintes 64 bits des adresses normalisees (une operation par lot)."""
+    import pandas as pd
+
+    normalized = pd.Series(emails, dtype=object).str.strip().str.lower()
+    return pd.util.hash_array(normalized.to_numpy(dtype=object))
+
+
+class ImageFolder:
+    """
+    Images personnelles lues a la demande depuis un ZIP ou un dossier.
+    Le nom du fichier sans extension est l'adresse du destinataire (comme
+    DataService.load_images_zip); seul l'index des noms reste en memoire.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip: Optional[zipfile.ZipFile] = None
+        # Adresse normalisee -> [(membre du ZIP ou chemin, nom du fichier)]
+        self._index: Dict[str, List[Tuple[str, str]]] = {}
+
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                names = [(entry.path, entry.name) for entry in entries if entry.is_file()]
+        else:
+            self._zip = zipfile.ZipFile(path)
+            names = [(name, os.path.basename(name)) for name in self._zip.namelist()]
+
+        for location, name in names:
+            if name.lower().endswith(_IMAGE_EXTENSIONS):
+                key = DataService.normalize_email(os.path.splitext(name)[0])
+                self._index.setdefault(key, []).append((location, name))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, email: str) -> List[Tuple[bytes, str]]:
+        """Images (donnees, nom) d'un destinataire, lues a l'appel."""
+        images = []
+        for location, name in self._index.get(DataService.normalize_email(email), ()):
+            if self._zip is not None:
+                images.append((self._zip.read(location), name))
+            else:
+                with open(location, "rb") as f:
+                    images.append((f.read(), name))
+        return images
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+
+class RecipientSource:
+    """
+    Destinataires lus par lots depuis un ou plusieurs fichiers importes
+    (CSV, .xlsx, Parquet, Arrow), images personnelles chargees au moment
+    de l'envoi. Utilisable a la place d'une liste par SendEngine et
+    CampaignScheduler: seuls les lots en cours restent en memoire.
+
+    scan() doit etre appele avant l'envoi: il verifie les colonnes, compte
+    les lignes et repere les doublons (premiere occurrence gardee, comme
+    DataService.deduplicate) a partir d'empreintes de 8 octets par ligne.
+    """
+
+    def __init__(
+        self,
+        filepaths: List[str],
+        images: Optional[str] = None,
+        chunk_rows: int = IMPORT_CHUNK_ROWS
+    ):
+        self.filepaths = list(filepaths)
+        self.images_path = images
+        self.chunk_rows = chunk_rows
+        self.images: Optional[ImageFolder] = None
+        self.rows = 0
+        self.duplicates = 0
+        # Empreinte dupliquee -> rang de la ligne gardee
+        self._keep: Dict[int, int] = {}
+        self._duplicate_hashes: Optional["np.ndarray"] = None
+        self._scanned = False
+
+    def __len__(self) -> int:
+        """Nombre de destinataires envoyes (doublons exclus)."""
+        return self.rows - self.duplicates
+
+    def scan(self, on_progress: Optional[ProgressCallback] = None) -> Optional[str]:
+        """
+        Premiere lecture: colonnes, nombre de lignes et doublons.
+
+        Returns:
+            Message d'erreur ou None si succes
+        """
+        import numpy as np
+
+        try:
+            hashes = []
+            self.rows = 0
+            for chunk in self._chunks():
+                hashes.append(_email_hashes([row[0] for row in chunk]))
+                self.rows += len(chunk)
+                if on_progress:
+                    on_progress(self.rows, 0)
+
+            all_hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+            unique, first, counts = np.unique(all_hashes, return_index=True, return_counts=True)
+            repeated = counts > 1
+            self._duplicate_hashes = unique[repeated]
+            self._keep = dict(zip(unique[repeated].tolist(), first[repeated].tolist()))
+            self.duplicates = int((counts[repeated] - 1).sum())
+
+            if self.images_path and self.images is None:
+                self.images = ImageFolder(self.images_path)
+            self._scanned = True
+            return None
+        except Exception as e:
+            return str(e)
+
+    def __iter__(self) -> Iterator[Recipient]:
+        return self.iter_from(0)
+
+    def iter_from(self, start: int = 0) -> Iterator[Recipient]:
+        """
+        Parcourt les destinataires a partir du rang `start` (doublons exclus).
+        Les lignes sautees ne sont pas converties en Recipient.
+        """
+        if not self._scanned:
+            error = self.scan()
+            if error:
+                raise RuntimeError(error)
+
+        import numpy as np
+
+        row_index = 0
+        position = 0
+        for chunk in self._chunks():
+            keep = np.ones(len(chunk), dtype=bool)
+            if len(self._duplicate_hashes):
+                hashes = _email_hashes([row[0] for row in chunk])
+                for offset in np.flatnonzero(np.isin(hashes, self._duplicate_hashes)).tolist():
+                    keep[offset] = self._keep[int(hashes[offset])] == row_index + offset
+            row_index += len(chunk)
+
+            kept = int(keep.sum())
+            if position + kept <= start:
+                position += kept
+                continue
+
+            for offset in np.flatnonzero(keep).tolist():
+                if position >= start:
+                    email, nom, prenom, numero = chunk[offset]
+                    yield Recipient(
+                        email=email, nom=nom, prenom=prenom, numero=numero,
+                        images=self.images.get(email) if self.images is not None else []
+                    )
+                position += 1
+
+    def close(self):
+        """Ferme l'archive d'images."""
+        if self.images is not None:
+            self.images.close()
+            self.images = None
+        self._scanned = False
+
+    def _chunks(self) -> Iterator[List[Tuple[str, ...]]]:
+        """Lots de lignes (email, nom, prenom, numero) de tous les fichiers."""
+        for filepath in self.filepaths:
+            rows = DataService.iter_file(filepath, self.chunk_rows)
+            header, _ = next(rows)
+            missing = [c for c in RECIPIENT_COLUMNS if c not in header]
+            if missing:
+                raise ValueError(f"{os.path.basename(filepath)}: Colonnes manquantes : {', '.join(missing)}")
+            for chunk in rows:
+                yield chunk
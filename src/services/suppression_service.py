@@ -0,0 +1,271 @@
+"""
+Service de liste d'opposition (adresses a ne jamais contacter).
+"""
+
+import csv
+import hashlib
+import os
+import struct
+import threading
+from functools import partial
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import SUPPRESSION_FILE, SUPPRESSION_BLOOM_BITS, SUPPRESSION_BLOOM_PROBES
+from ..models import Recipient
+from .data_service import DataService
+
+
+_blake2b_64 = partial(hashlib.blake2b, digest_size=8)
+
+# Taille des lots pour les calculs vectorises (borne la memoire temporaire)
+_CHUNK = 1 << 18
+
+
+class SuppressionList:
+    """
+    Liste d'opposition persistante.
+
+    Les adresses normalisees sont stockees sous forme de hash 64 bits
+    tries (8 octets par adresse), memory-mappes a l'ouverture, avec un
+    filtre de Bloom optionnel devant la recherche dichotomique.
+
+    Format du fichier:
+        en-tete (32 octets): MAGIC, nb d'adresses, nb de bits Bloom, nb de sondes
+        hash tries (uint64 little-endian)
+        bits du filtre de Bloom
+    """
+
+    MAGIC = b"CSSUP1\0\0"
+    HEADER = struct.Struct("<8sQQQ")
+
+    _default = None
+
+    def __init__(self, path: str = SUPPRESSION_FILE, use_bloom: bool = True):
+        self.path = path
+        self.use_bloom = use_bloom
+        self._lock = threading.Lock()
+        self._index = np.empty(0, dtype="<u8")
+        self._bloom: Optional[np.ndarray] = None
+        self._bloom_bits = 0
+        self._probes = SUPPRESSION_BLOOM_PROBES
+
+    @classmethod
+    def default(cls) -> "SuppressionList":
+        """Liste partagee par l'application, chargee au premier appel."""
+        if cls._default is None:
+            cls._default = cls()
+            cls._default.load()
+        return cls._default
+
+    # --- Hash -----------------------------------------------------------
+
+    @staticmethod
+    def hash_email(email: str) -> int:
+        """Hash 64 bits de l'adresse normalisee."""
+        digest = _blake2b_64(DataService.normalize_email(email).encode("utf-8")).digest()
+        return int.from_bytes(digest, "little")
+
+    @staticmethod
+    def hash_emails(emails: Iterable[str]) -> np.ndarray:
+        """Hash 64 bits d'une serie d'adresses (tableau numpy uint64)."""
+        normalize = DataService.normalize_email
+        digests = b"".join([
+            _blake2b_64(normalize(email).encode("utf-8")).digest()
+            for email in emails
+        ])
+        return np.frombuffer(digests, dtype="<u8")
+
+    # --- Persistance ----------------------------------------------------
+
+    def load(self) -> Optional[str]:
+        """
+        Ouvre le fichier d'index (memory-map). Un fichier absent donne une liste vide.
+
+        Returns:
+            Message d'erreur ou None si succes
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                magic, count, bloom_bits, probes = self.HEADER.unpack(f.read(self.HEADER.size))
+            if magic != self.MAGIC:
+                return "Fichier de liste d'opposition invalide"
+
+            offset = self.HEADER.size
+            index = (
+                np.memmap(self.path, dtype="<u8", mode="r", offset=offset, shape=(count,))
+                if count else np.empty(0, dtype="<u8")
+            )
+            bloom = None
+            if bloom_bits:
+                bloom = np.memmap(
+                    self.path, dtype=np.uint8, mode="r",
+                    offset=offset + count * 8, shape=(bloom_bits // 8,)
+                )
+            with self._lock:
+                self._index = index
+                self._bloom = bloom
+                self._bloom_bits = bloom_bits
+                self._probes = probes
+            return None
+        except Exception as e:
+            return str(e)
+
+    def save(self) -> Optional[str]:
+        """
+        Ecrit l'index (fichier temporaire puis remplacement atomique).
+
+        Returns:
+            Message d'erreur ou None si succes
+        """
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with self._lock:
+                index = np.ascontiguousarray(self._index, dtype="<u8")
+                bloom = self._bloom if self._bloom is not None else np.empty(0, dtype=np.uint8)
+                bloom = np.ascontiguousarray(bloom)
+                tmp = self.path + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(self.HEADER.pack(self.MAGIC, len(index), self._bloom_bits, self._probes))
+                    f.write(index.tobytes())
+                    f.write(bloom.tobytes())
+                # Liberer les memory-maps avant de remplacer le fichier
+                self._index = np.array(index)
+                self._bloom = np.array(bloom) if self._bloom_bits else None
+            os.replace(tmp, self.path)
+            return None
+        except Exception as e:
+            return str(e)
+
+    # --- Modification ---------------------------------------------------
+
+    def add(self, emails: Iterable[str]) -> int:
+        """
+        Ajoute des adresses (non persiste: appeler save()).
+
+        Returns:
+            Nombre d'adresses nouvelles
+        """
+        hashes = np.unique(self.hash_emails(emails))
+        with self._lock:
+            before = len(self._index)
+            merged = np.union1d(self._index, hashes).astype("<u8")
+            self._index = merged
+            self._rebuild_bloom()
+            return len(merged) - before
+
+    def load_csv(self, filepath: str) -> Tuple[int, Optional[str]]:
+        """
+        Importe un CSV d'adresses et sauvegarde la liste.
+        Utilise la colonne 'email' si presente, sinon la premiere colonne.
+
+        Returns:
+            Tuple (nombre d'adresses ajoutees, message d'erreur ou None)
+        """
+        try:
+            with open(filepath, newline="", encoding="utf-8-sig") as f:
+                reader = csv.reader(f)
+                first = next(reader, None)
+                if first is None:
+                    return 0, None
+
+                header = [c.strip().lower() for c in first]
+                column = header.index("email") if "email" in header else 0
+                emails = [] if "email" in header else [first[0]]
+                emails.extend(row[column] for row in reader if len(row) > column)
+
+            added = self.add(e for e in emails if "@" in e)
+            error = self.save()
+            return added, error
+        except Exception as e:
+            return 0, str(e)
+
+    def clear(self) -> Optional[str]:
+        """Vide la liste et sauvegarde."""
+        with self._lock:
+            self._index = np.empty(0, dtype="<u8")
+            self._bloom = None
+            self._bloom_bits = 0
+        return self.save()
+
+    def _rebuild_bloom(self):
+        """Reconstruit le filtre de Bloom a partir de l'index (verrou tenu)."""
+        if not self.use_bloom or not len(self._index):
+            self._bloom = None
+            self._bloom_bits = 0
+            return
+        bits = max(64, len(self._index) * SUPPRESSION_BLOOM_BITS)
+        bits = (bits + 63) // 64 * 64
+        self._bloom_bits = bits
+        self._probes = SUPPRESSION_BLOOM_PROBES
+        flags = np.zeros(bits, dtype=bool)
+        for start in range(0, len(self._index), _CHUNK):
+            chunk = np.asarray(self._index[start:start + _CHUNK])
+            flags[self._bloom_positions(chunk, bits, self._probes).ravel()] = True
+        self._bloom = np.packbits(flags, bitorder="little")
+
+    @staticmethod
+    def _bloom_positions(hashes: np.ndarray, bits: int, probes: int) -> np.ndarray:
+        """Positions des bits (double hachage) pour chaque hash: forme (n, probes)."""
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(probes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(bits)
+
+    @classmethod
+    def _bloom_candidates(cls, hashes: np.ndarray, bloom: np.ndarray, bits: int, probes: int) -> np.ndarray:
+        """Indices des hash possiblement presents (tous les bits Bloom a 1)."""
+        positions = cls._bloom_positions(hashes, bits, probes)
+        hit = (np.asarray(bloom)[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return np.nonzero(hit.all(axis=1))[0]
+
+    # --- Recherche ------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, email: str) -> bool:
+        if not len(self._index):
+            return False
+        return bool(self.contains_hashes(np.array([self.hash_email(email)], dtype="<u8"))[0])
+
+    def contains_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        """Masque booleen: True pour chaque hash present dans la liste."""
+        with self._lock:
+            index, bloom, bits, probes = self._index, self._bloom, self._bloom_bits, self._probes
+
+        found = np.zeros(len(hashes), dtype=bool)
+        if not len(index) or not len(hashes):
+            return found
+
+        candidates = np.arange(len(hashes))
+        if bloom is not None and bits:
+            candidates = np.concatenate([
+                start + self._bloom_candidates(hashes[start:start + _CHUNK], bloom, bits, probes)
+                for start in range(0, len(hashes), _CHUNK)
+            ])
+            if not len(candidates):
+                return found
+
+        subset = hashes[candidates]
+        pos = np.searchsorted(index, subset)
+        pos[pos >= len(index)] = 0
+        found[candidates] = np.asarray(index[pos]) == subset
+        return found
+
+    def filter(self, recipients: List[Recipient]) -> Tuple[List[Recipient], List[Recipient]]:
+        """
+        Separe les destinataires autorises de ceux en liste d'opposition.
+
+        Returns:
+            Tuple (destinataires conserves, destinataires exclus)
+        """
+        if not len(self._index) or not recipients:
+            return list(recipients), []
+        mask = self.contains_hashes(self.hash_emails(r.email for r in recipients))
+        kept = [r for r, excluded in zip(recipients, mask) if not excluded]
+        suppressed = [r for r, excluded in zip(recipients, mask) if excluded]
+        return kept, suppressed
@@ -0,0 +1,335 @@
+"""
+Vue triee et filtree des destinataires (tableau de l'onglet Donnees).
+"""
+
+import math
+import re
+import shlex
+from bisect import bisect_left
+from itertools import islice
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..config import RECIPIENT_COLUMNS
+from ..models import Recipient
+from .search_service import RecipientSearch
+
+
+# Colonnes du tableau: champs du destinataire + nombre d'images
+TABLE_COLUMNS = RECIPIENT_COLUMNS + ["images"]
+
+# Terme de filtre: champ, operateur, valeur ("nom=dupont", "images>0", "email:gmail")
+_TERM_RE = re.compile(r"^(%s)(!=|>=|<=|=|>|<|:)(.*)$" % "|".join(TABLE_COLUMNS))
+# Au-dela de ce nombre de destinataires modifies, un ordre de tri est recalcule
+_REINDEX_LIMIT = 1000
+
+
+class RecipientTable:
+    """
+    Destinataires tries par colonne et filtres, pour n'afficher qu'une page.
+
+    Chaque colonne triee garde un tableau ordonne de cles (valeur normalisee,
+    numero d'ordre) et les destinataires correspondants, construit au premier
+    tri ou filtre sur cette colonne. Le meme tableau sert au tri et aux
+    filtres par dichotomie (=, prefixe*, >, <...). Le texte libre passe par
+    RecipientSearch. Les modifications (ajout, remplacement, champs,
+    retrait) mettent ces index a jour sans tout recalculer.
+
+    Syntaxe du filtre (termes combines par ET):
+        texte           nom, prenom ou adresse contenant le texte
+        nom=dupont      valeur exacte (casse et accents ignores)
+        nom=dup*        valeur commencant par
+        email:gmail     valeur contenant
+        nom!=dupont     valeur differente
+        images>0        comparaison (>, <, >=, <=), nombre pour images
+    Les valeurs avec espaces s'ecrivent entre guillemets: nom="le goff".
+    """
+
+    def __init__(self, recipients: List[Recipient]):
+        self.sort_column: Optional[str] = None
+        self.descending = False
+        self._terms: List[Tuple[str, str, object]] = []
+        self._text = ""
+        self.reset(recipients)
+
+    def reset(self, recipients: List[Recipient]):
+        """Nouvelle liste (import, projet ouvert): index recalcules a la demande."""
+        self.recipients = recipients
+        # Numero d'ordre de chaque ligne: croissant dans la liste, departage les cles egales
+        self._seqs: List[int] = list(range(len(recipients)))
+        self._next_seq = len(recipients)
+        # id du destinataire -> rang (construit a la demande)
+        self._positions: Optional[Dict[int, int]] = None
+        self._search = RecipientSearch(recipients)
+        # Colonne -> (cles triees, destinataires), et cle indexee par destinataire
+        self._orders: Dict[str, Tuple[List[tuple], List[Recipient]]] = {}
+        self._keys: Dict[str, Dict[int, tuple]] = {}
+        self._matched: Optional[Dict[int, Recipient]] = None
+
+    # --- Tri et filtre ---
+
+    def set_sort(self, column: Optional[str], descending: bool = False):
+        """Trie sur une colonne de TABLE_COLUMNS (None: ordre de la liste)."""
+        if column is not None and column not in TABLE_COLUMNS:
+            raise ValueError(f"Colonne inconnue: {column}")
+        self.sort_column = column
+        self.descending = descending
+
+    def set_filter(self, text: str) -> Optional[str]:
+        """
+        Analyse et applique un filtre.
+
+        Returns:
+            Message d'erreur (filtre precedent conserve) ou None si succes
+        """
+        try:
+            words = shlex.split(text)
+        except ValueError:
+            return "Guillemet non ferme"
+
+        terms = []
+        plain = []
+        for word in words:
+            match = _TERM_RE.match(word)
+            if match is None:
+                plain.append(word)
+                continue
+            column, op, value = match.groups()
+            if column == "images":
+                if op == ":" or not value.strip().isdigit():
+                    return f"{word}: nombre attendu (images=0, images>1...)"
+                value = int(value)
+            else:
+                value = RecipientSearch.normalize(value).strip()
+            terms.append((column, op, value))
+
+        self._terms = terms
+        self._text = " ".join(plain)
+        self._matched = None
+        return None
+
+    @property
+    def filtered(self) -> bool:
+        return bool(self._terms or self._text.strip())
+
+    def view(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Recipient], int]:
+        """
+        Une page de la vue triee et filtree.
+
+        Returns:
+            Tuple (destinataires de la page, nombre total de destinataires filtres)
+        """
+        stop = None if limit is None else offset + limit
+        matched = self._match()
+        if matched is None:
+            order = self._ordered()
+            return list(islice(order, offset, stop)), len(self.recipients)
+
+        total = len(matched)
+        if total * 16 < len(self.recipients):
+            # Peu de resultats: les trier directement
+            rows = sorted(matched.values(), key=self._sort_key, reverse=self.descending)
+            return rows[offset:stop], total
+        rows = (r for r in self._ordered() if id(r) in matched)
+        return list(islice(rows, offset, stop)), total
+
+    def matching(self) -> List[Recipient]:
+        """Tous les destinataires du filtre courant, dans l'ordre de la liste."""
+        matched = self._match()
+        if matched is None:
+            return list(self.recipients)
+        return sorted(matched.values(), key=self.position)
+
+    def _ordered(self) -> Iterable[Recipient]:
+        if self.sort_column is None:
+            items = self.recipients
+        else:
+            items = self._order(self.sort_column)[1]
+        return reversed(items) if self.descending else items
+
+    def _sort_key(self, recipient: Recipient) -> tuple:
+        position = self.position(recipient)
+        if self.sort_column is None:
+            return (position,)
+        return (self._value(self.sort_column, recipient), self._seqs[position])
+
+    def _match(self) -> Optional[Dict[int, Recipient]]:
+        """Destinataires du filtre (id -> destinataire), None sans filtre."""
+        if not self.filtered:
+            return None
+        if self._matched is not None:
+            return self._matched
+
+        included: List[Dict[int, Recipient]] = []
+        excluded: Dict[int, Recipient] = {}
+        if self._text.strip():
+            recipients = self.recipients
+            included.append({id(recipients[i]): recipients[i] for i in self._search.matches(self._text)})
+        for column, op, value in self._terms:
+            keys, items = self._order(column)
+            if op == ":":
+                included.append({id(r): r for k, r in zip(keys, items) if value in k[0]})
+                continue
+            if op == "!=":
+                start, end = self._range(keys, "=", value)
+                excluded.update((id(r), r) for r in items[start:end])
+                continue
+            start, end = self._range(keys, op, value)
+            included.append({id(r): r for r in items[start:end]})
+
+        if included:
+            included.sort(key=len)
+            smallest, others = included[0], included[1:]
+            matched = {
+                i: r for i, r in smallest.items()
+                if i not in excluded and all(i in other for other in others)
+            }
+        else:
+            matched = {id(r): r for r in self.recipients if id(r) not in excluded}
+        self._matched = matched
+        return matched
+
+    @staticmethod
+    def _range(keys: List[tuple], op: str, value) -> Tuple[int, int]:
+        """Bornes [debut, fin) des cles satisfaisant `op value` (cles: (valeur, ordre))."""
+        if op == "=" and isinstance(value, str) and value.endswith("*"):
+            prefix = value[:-1]
+            return bisect_left(keys, (prefix,)), bisect_left(keys, (prefix + "\U0010ffff",))
+        before = bisect_left(keys, (value,))
+        after = bisect_left(keys, (value, math.inf))
+        if op == "=":
+            return before, after
+        if op == ">":
+            return after, len(keys)
+        if op == ">=":
+            return before, len(keys)
+        if op == "<":
+            return 0, before
+        return 0, after
+
+    # --- Index par colonne ---
+
+    @staticmethod
+    def _value(column: str, recipient: Recipient):
+        if column == "images":
+            return len(recipient.images)
+        return RecipientSearch.normalize(getattr(recipient, column))
+
+    def _order(self, column: str) -> Tuple[List[tuple], List[Recipient]]:
+        order = self._orders.get(column)
+        if order is None:
+            recipients, seqs = self.recipients, self._seqs
+            if column == "images":
+                values = [len(r.images) for r in recipients]
+            else:
+                values = list(map(RecipientSearch.normalize, map(attrgetter(column), recipients)))
+            # Tri stable des rangs: les cles egales restent dans l'ordre de la liste
+            ranks = sorted(range(len(values)), key=values.__getitem__)
+            order = self._orders[column] = (
+                [(values[i], seqs[i]) for i in ranks],
+                [recipients[i] for i in ranks]
+            )
+        return order
+
+    def _column_keys(self, column: str) -> Dict[int, tuple]:
+        """Cle de chaque destinataire dans l'ordre d'une colonne (construit a la premiere modification)."""
+        keys = self._keys.get(column)
+        if keys is None:
+            keys = self._keys[column] = {id(r): k for k, r in zip(*self._orders[column])}
+        return keys
+
+    def _unindex(self, recipient: Recipient):
+        """Retire un destinataire des ordres de tri construits (cle d'avant la modification)."""
+        for column, (keys, items) in self._orders.items():
+            key = self._column_keys(column).pop(id(recipient), None)
+            if key is not None:
+                index = bisect_left(keys, key)
+                del keys[index]
+                del items[index]
+
+    def _index(self, recipient: Recipient):
+        """Insere un destinataire dans les ordres de tri construits."""
+        seq = self._seqs[self.position(recipient)]
+        for column, (keys, items) in self._orders.items():
+            key = (self._value(column, recipient), seq)
+            index = bisect_left(keys, key)
+            keys.insert(index, key)
+            items.insert(index, recipient)
+            self._column_keys(column)[id(recipient)] = key
+
+    def position(self, recipient: Recipient) -> int:
+        """Rang d'un destinataire dans la liste (par identite)."""
+        if self._positions is None:
+            self._positions = {id(r): i for i, r in enumerate(self.recipients)}
+        return self._positions[id(recipient)]
+
+    # --- Modifications de la liste ---
+
+    def added(self, recipients: List[Recipient]):
+        """Destinataires ajoutes en fin de liste (les derniers de la liste, dans l'ordre)."""
+        first = len(self.recipients) - len(recipients)
+        self._seqs.extend(range(self._next_seq, self._next_seq + len(recipients)))
+        self._next_seq += len(recipients)
+        if self._positions is not None:
+            for offset, recipient in enumerate(recipients):
+                self._positions[id(recipient)] = first + offset
+        if len(recipients) > _REINDEX_LIMIT:
+            self._orders.clear()
+            self._keys.clear()
+        else:
+            for recipient in recipients:
+                self._index(recipient)
+        self._search.update(range(first, len(self.recipients)))
+        self._matched = None
+
+    def replaced(self, position: int, old: Recipient, new: Recipient):
+        """
+        Destinataire remplace a la meme place de la liste.
+
+        Args:
+            position: Rang du destinataire (la liste contient deja `new`)
+            old: Destinataire remplace
+            new: Nouveau destinataire
+        """
+        self._unindex(old)
+        if self._positions is not None:
+            self._positions.pop(id(old), None)
+            self._positions[id(new)] = position
+        self._index(new)
+        self._search.update([position])
+        self._matched = None
+
+    def updated(self, recipients: List[Recipient]):
+        """Destinataires modifies sur place (champs, images)."""
+        if len(recipients) > _REINDEX_LIMIT:
+            # Moins cher de retrier a la demande que d'inserer un par un
+            self._orders.clear()
+            self._keys.clear()
+        else:
+            for recipient in recipients:
+                self._unindex(recipient)
+                self._index(recipient)
+        self._search.update(self.position(r) for r in recipients)
+        self._matched = None
+
+    def removed(self, kept: List[Recipient], removed: List[Recipient]):
+        """
+        Destinataires retires (un parcours par index).
+
+        Args:
+            kept: Nouvelle liste
+            removed: Destinataires retires
+        """
+        ids = {id(r) for r in removed}
+        for column, (keys, items) in self._orders.items():
+            kept_ranks = [i for i, r in enumerate(items) if id(r) not in ids]
+            self._orders[column] = ([keys[i] for i in kept_ranks], [items[i] for i in kept_ranks])
+            column_keys = self._keys.get(column)
+            if column_keys is not None:
+                for i in ids:
+                    column_keys.pop(i, None)
+        self._seqs = [seq for seq, r in zip(self._seqs, self.recipients) if id(r) not in ids]
+        self._search.remove(kept, removed)
+        self.recipients = kept
+        self._positions = None
+        self._matched = None
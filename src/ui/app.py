@@ -2,27 +2,54 @@
 Application principale Mail Sender.
 """
 
+import os
+from dataclasses import fields
+from typing import Optional
+
 import customtkinter as ctk
+from tkinter import filedialog, messagebox
 
-from ..config import COLORS
+from ..config import COLORS, PROJECT_EXTENSION
 from ..models import AppState, SMTPConfig
+from .startup import StartupProfile
 from .theme import setup_theme
-from .tabs import DataTab, MessageTab, SendTab
+
+
+TAB_DATA = "1. Donnees"
+TAB_MESSAGE = "2. Message"
+TAB_SEND = "3. Envoi"
 
 
 class MailSenderApp(ctk.CTk):
-    """Application principale."""
+    """
+    Application principale.
+
+    La fenetre s'affiche avec des onglets vides: chaque onglet (et les
+    modules qu'il utilise) est construit a sa premiere activation, le
+    premier juste apres l'affichage.
+    """
 
-    def __init__(self):
+    def __init__(self, profile: Optional[StartupProfile] = None):
         setup_theme()
         super().__init__()
+        self._profile = profile
+        self._mark("fenetre creee")
 
         self.title("Mail Sender")
         self.geometry("1250x900")
         self.minsize(1100, 800)
 
         self.app_data = AppState()
+        self._project_path = None
+        # Onglets construits a la demande (None tant que jamais affiches)
+        self.data_tab = None
+        self.message_tab = None
+        self.send_tab = None
         self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._shown = False
+        self.bind("<Map>", self._on_first_map, add="+")
+        self._mark("interface de base")
 
     def _build_ui(self):
         """Construit l'interface utilisateur."""
@@ -55,23 +82,83 @@ class MailSenderApp(ctk.CTk):
         )
         self.theme_switch.pack(side="right", padx=25, pady=15)
 
+        # Projet de campagne
+        for text, command in (("Enregistrer", self._save_project), ("Ouvrir", self._open_project)):
+            ctk.CTkButton(
+                header,
+                text=text,
+                width=100,
+                height=30,
+                fg_color="white",
+                text_color=COLORS["primary"],
+                hover_color=COLORS["light_gray"],
+                command=command
+            ).pack(side="right", padx=(0, 10), pady=15)
+
     def _build_tabs(self):
         """Construit les onglets."""
         self.tabview = ctk.CTkTabview(
             self,
-            segmented_button_selected_color=COLORS["primary"]
+            segmented_button_selected_color=COLORS["primary"],
+            command=lambda: self._ensure_tab(self.tabview.get())
         )
         self.tabview.pack(fill="both", expand=True, padx=20, pady=20)
 
-        # Créer les onglets
-        tab_data = self.tabview.add("1. Donnees")
-        tab_message = self.tabview.add("2. Message")
-        tab_send = self.tabview.add("3. Envoi")
+        # Créer les onglets (contenu construit a la premiere activation)
+        for name in (TAB_DATA, TAB_MESSAGE, TAB_SEND):
+            self.tabview.add(name)
+
+    def _ensure_tab(self, name: str):
+        """
+        Construit l'onglet `name` s'il ne l'a pas encore ete.
+        Le module de l'onglet est importe a ce moment (PIL, pandas, services).
+
+        Returns:
+            L'onglet (DataTab, MessageTab ou SendTab)
+        """
+        if name == TAB_DATA and self.data_tab is None:
+            from .tabs.data_tab import DataTab
+            self.data_tab = DataTab(self.tabview.tab(name), self.app_data)
+            if self.theme_switch.get() == 1:
+                self.data_tab.apply_theme()
+        elif name == TAB_MESSAGE and self.message_tab is None:
+            from .tabs.message_tab import MessageTab
+            self.message_tab = MessageTab(self.tabview.tab(name), self.app_data)
+        elif name == TAB_SEND and self.send_tab is None:
+            from .tabs.send_tab import SendTab
+            self.send_tab = SendTab(self.tabview.tab(name), self.app_data, self._get_config)
+            self.send_tab.update_summary()
+        return {TAB_DATA: self.data_tab, TAB_MESSAGE: self.message_tab, TAB_SEND: self.send_tab}[name]
+
+    def _on_first_map(self, event):
+        """Fenetre affichee: fermer le splash, puis construire l'onglet visible."""
+        if event.widget is not self or self._shown:
+            return
+        self._shown = True
+        self._mark("fenetre affichee")
+        try:
+            # Executable PyInstaller construit avec --splash (build.bat)
+            import pyi_splash
+            pyi_splash.close()
+        except ImportError:
+            pass
+        self.after(0, self._build_first_tab)
+
+    def _build_first_tab(self):
+        # Laisser Tk dessiner la fenetre avant l'import des modules de l'onglet
+        self.update_idletasks()
+        name = self.tabview.get()
+        self._ensure_tab(name)
+        self.update_idletasks()
+        self._mark(f"onglet {name}")
+
+        if self._profile is not None and self._profile.output:
+            self._profile.write()
+            self.after(0, self.destroy)
 
-        # Initialiser les composants
-        self.data_tab = DataTab(tab_data, self.app_data)
-        self.message_tab = MessageTab(tab_message, self.app_data)
-        self.send_tab = SendTab(tab_send, self.app_data, self._get_config)
+    def _mark(self, name: str):
+        if self._profile is not None:
+            self._profile.mark(name)
 
     def _build_footer(self):
         """Ajoute la signature en bas a droite."""
@@ -90,10 +177,73 @@ class MailSenderApp(ctk.CTk):
             ctk.set_appearance_mode("light")
 
         # ttk widgets (ex: Treeview) ne suivent pas CustomTkinter: re-synchroniser.
-        if hasattr(self, "data_tab"):
+        if self.data_tab is not None:
             self.data_tab.apply_theme()
         self.update_idletasks()
 
+    def _open_project(self):
+        """Ouvre un projet de campagne (images lues a la demande)."""
+        path = filedialog.askopenfilename(
+            filetypes=[("Projet ColdSender", f"*{PROJECT_EXTENSION}")]
+        )
+        if not path:
+            return
+        from ..services import ProjectService
+
+        state, error = ProjectService.load(path)
+        if error:
+            messagebox.showerror("Projet", f"Impossible d'ouvrir le projet :\n{error}")
+            return
+
+        # Meme objet AppState: les onglets en gardent la reference
+        for field in fields(AppState):
+            setattr(self.app_data, field.name, getattr(state, field.name))
+        self._ensure_tab(TAB_MESSAGE).load_state(state.smtp)
+        self._ensure_tab(TAB_DATA).refresh()
+        if self.send_tab is not None:
+            self.send_tab.update_summary()
+        self._set_project(path)
+
+    def _save_project(self, save_as: bool = False) -> bool:
+        """
+        Enregistre le projet (objet, corps, SMTP sans mot de passe, destinataires, images).
+
+        Returns:
+            True si le projet a ete enregistre
+        """
+        path = self._project_path
+        if save_as or not path:
+            path = filedialog.asksaveasfilename(
+                defaultextension=PROJECT_EXTENSION,
+                filetypes=[("Projet ColdSender", f"*{PROJECT_EXTENSION}")],
+                initialfile=f"campagne{PROJECT_EXTENSION}"
+            )
+            if not path:
+                return False
+
+        from ..services import ProjectService
+
+        self.app_data.subject, self.app_data.body = self._get_config(get_message=True)
+        self.app_data.smtp = self._get_config()
+        error = ProjectService.save(path, self.app_data)
+        if error:
+            messagebox.showerror("Projet", f"Impossible d'enregistrer le projet :\n{error}")
+            return False
+        self._set_project(path)
+        return True
+
+    def _set_project(self, path: str):
+        self._project_path = path
+        self.title(f"Mail Sender - {os.path.basename(path)}")
+
+    def _on_close(self):
+        """Propose d'enregistrer le projet avant de quitter."""
+        if self.app_data.recipients:
+            answer = messagebox.askyesnocancel("Quitter", "Enregistrer le projet avant de quitter ?")
+            if answer is None or (answer and not self._save_project()):
+                return
+        self.destroy()
+
     def _get_config(self, get_message: bool = False):
         """
         Retourne la configuration email.
@@ -104,14 +254,15 @@ class MailSenderApp(ctk.CTk):
         Returns:
             SMTPConfig ou tuple (subject, body)
         """
+        message_tab = self._ensure_tab(TAB_MESSAGE)
         if get_message:
-            return self.message_tab.get_subject(), self.message_tab.get_body()
+            return message_tab.get_subject(), message_tab.get_body()
 
         return SMTPConfig(
-            server=self.message_tab.get_smtp_server(),
-            port=self.message_tab.get_smtp_port(),
-            email=self.message_tab.get_email(),
-            password=self.message_tab.get_password()
+            server=message_tab.get_smtp_server(),
+            port=message_tab.get_smtp_port(),
+            email=message_tab.get_email(),
+            password=message_tab.get_password()
         )
 
     def run(self):
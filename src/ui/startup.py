@@ -0,0 +1,54 @@
+"""
+Profil de demarrage: temps ecoules jusqu'a l'affichage de la fenetre.
+"""
+
+import json
+import sys
+import time
+from typing import List, Optional, Tuple
+
+
+class StartupProfile:
+    """
+    Etapes du demarrage, en millisecondes depuis `started` (debut de main.py).
+
+    Le temps passe avant Python (extraction de l'executable PyInstaller
+    --onefile, demarrage de l'interpreteur) n'est pas compte ici: voir
+    benchmarks/bench_startup.py qui mesure aussi le temps total vu de l'exterieur.
+    """
+
+    def __init__(self, started: float, output: Optional[str] = None):
+        """
+        Args:
+            started: time.perf_counter() au lancement
+            output: Fichier JSON du rapport, "-" pour la sortie standard,
+                None pour ne pas ecrire de rapport
+        """
+        self.started = started
+        self.output = output
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str):
+        """Enregistre la fin d'une etape."""
+        self.marks.append((name, (time.perf_counter() - self.started) * 1000))
+
+    def report(self) -> str:
+        """Rapport lisible: temps cumule et duree de chaque etape."""
+        lines = ["Demarrage (ms depuis main.py):"]
+        previous = 0.0
+        for name, ms in self.marks:
+            lines.append(f"  {name:<28} {ms:8.1f}  (+{ms - previous:.1f})")
+            previous = ms
+        return "\n".join(lines)
+
+    def write(self):
+        """Ecrit le rapport dans `output` (JSON) ou sur la sortie standard."""
+        if not self.output:
+            return
+        if self.output == "-":
+            # Executable --windowed: pas de console
+            if sys.stdout is not None:
+                print(self.report(), flush=True)
+            return
+        with open(self.output, "w", encoding="utf-8") as f:
+            json.dump({"marks": [{"name": n, "ms": round(ms, 2)} for n, ms in self.marks]}, f, indent=2)
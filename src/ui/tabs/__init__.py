@@ -1,9 +1,22 @@
 """
 Onglets de l'application.
+
+Les modules des onglets (et leurs dependances: PIL, pandas, services) sont
+importes a la premiere utilisation, pas a l'import du paquet.
 """
 
-from .data_tab import DataTab
-from .message_tab import MessageTab
-from .send_tab import SendTab
+import importlib
+
+_MODULES = {
+    'DataTab': '.data_tab',
+    'MessageTab': '.message_tab',
+    'SendTab': '.send_tab',
+}
 
 __all__ = ['DataTab', 'MessageTab', 'SendTab']
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        return getattr(importlib.import_module(_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
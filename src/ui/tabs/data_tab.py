@@ -4,13 +4,16 @@ Onglet Données - Import et gestion des destinataires avec images personnalisée
 
 import os
 import io
+import threading
 import customtkinter as ctk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image
 
-from ...config import COLORS
+from ...config import COLORS, DEDUP_KEEP, IMPORT_MODES, SEARCH_DELAY_MS, TABLE_VIEW_LIMIT
 from ...models import AppState, Recipient
-from ...services import DataService
+from ...services import (
+    DataService, SuppressionList, BounceService, MessageIndex, RecipientTable, DiffService
+)
 
 
 class DataTab:
@@ -22,6 +25,13 @@ class DataTab:
         self.selected_image_index = None
         self._ttk_style = None
         self._tree_style = "Recipients.Treeview"
+        # Ligne du tableau (iid = id du destinataire) -> destinataire
+        self._rows = {}
+        # Vue triee/filtree: seule une page de lignes est inseree dans le Treeview
+        self._table = RecipientTable(app_data.recipients)
+        self._shown = 0
+        self._total = 0
+        self._filter_job = None
         self._build()
 
     def _build(self):
@@ -78,6 +88,43 @@ class DataTab:
             command=self._import_file
         ).pack(side="left")
 
+        ctk.CTkButton(
+            btn_frame,
+            text="Liste d'opposition (CSV)",
+            fg_color=COLORS["gray"],
+            hover_color="#4b5563",
+            command=self._import_suppression
+        ).pack(side="left", padx=(10, 0))
+
+        ctk.CTkButton(
+            btn_frame,
+            text="Retours (DSN)",
+            fg_color=COLORS["gray"],
+            hover_color="#4b5563",
+            command=self._import_bounces
+        ).pack(side="left", padx=(10, 0))
+
+        # Options d'import: remplacement, ajout ou mise a jour de la liste actuelle, dedoublonnage
+        options_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        options_frame.pack(fill="x", padx=20, pady=(0, 10))
+
+        self.mode_var = ctk.StringVar(value=IMPORT_MODES["replace"])
+        ctk.CTkOptionMenu(
+            options_frame,
+            values=list(IMPORT_MODES.values()),
+            variable=self.mode_var,
+            width=230
+        ).pack(side="left", padx=(0, 15))
+
+        ctk.CTkLabel(options_frame, text="Doublons :", font=("Segoe UI", 12)).pack(side="left", padx=(0, 5))
+        self.dedup_var = ctk.StringVar(value=DEDUP_KEEP["first"])
+        ctk.CTkOptionMenu(
+            options_frame,
+            values=list(DEDUP_KEEP.values()),
+            variable=self.dedup_var,
+            width=190
+        ).pack(side="left")
+
         self.import_status = ctk.CTkLabel(frame, text="", font=("Segoe UI", 12))
         self.import_status.pack(anchor="w", padx=20, pady=(0, 15))
 
@@ -125,8 +172,80 @@ class DataTab:
             fg_color=COLORS["error"],
             hover_color="#b91c1c",
             command=self._delete_recipient
+        ).pack(side="left", padx=(0, 5))
+
+        # Actions groupees (selection ou filtre), en un seul parcours de la liste
+        self._bulk_actions = {
+            "Modifier nom...": lambda: self._set_field_selected("nom"),
+            "Modifier prenom...": lambda: self._set_field_selected("prenom"),
+            "Modifier numero...": lambda: self._set_field_selected("numero"),
+            "Retirer les images": self._clear_images_selected,
+            "Supprimer le resultat du filtre": self._delete_by_filter,
+        }
+        self.bulk_menu = ctk.CTkOptionMenu(
+            btn_frame,
+            values=list(self._bulk_actions),
+            width=110,
+            height=28,
+            fg_color=COLORS["gray"],
+            button_color="#4b5563",
+            command=self._on_bulk_action
+        )
+        self.bulk_menu.set("Groupe...")
+        self.bulk_menu.pack(side="left", padx=(0, 5))
+
+        ctk.CTkButton(
+            btn_frame,
+            text="Exporter",
+            width=80,
+            height=28,
+            fg_color=COLORS["gray"],
+            hover_color="#4b5563",
+            command=self._export_recipients
+        ).pack(side="left", padx=(0, 5))
+
+        ctk.CTkButton(
+            btn_frame,
+            text="Reporter",
+            width=80,
+            height=28,
+            fg_color=COLORS["gray"],
+            hover_color="#4b5563",
+            command=self._write_back
         ).pack(side="left")
 
+        # Filtre et nombre de lignes affichees
+        filter_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        filter_frame.pack(fill="x", padx=20, pady=(0, 10))
+
+        self.filter_entry = ctk.CTkEntry(
+            filter_frame,
+            placeholder_text="Filtrer: texte, nom=dupont, nom=dup*, email:gmail, images>0",
+            height=28
+        )
+        self.filter_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.filter_entry.bind("<KeyRelease>", self._on_filter_key)
+
+        self.more_btn = ctk.CTkButton(
+            filter_frame,
+            text="Afficher plus",
+            width=100,
+            height=28,
+            fg_color=COLORS["gray"],
+            hover_color="#4b5563",
+            state="disabled",
+            command=self._show_more
+        )
+        self.more_btn.pack(side="right")
+
+        self.view_label = ctk.CTkLabel(
+            filter_frame,
+            text="",
+            font=("Segoe UI", 11),
+            text_color=COLORS["gray"]
+        )
+        self.view_label.pack(side="right", padx=(0, 10))
+
         # Treeview
         tree_container = ctk.CTkFrame(frame, fg_color=("white", "#111827"), corner_radius=8)
         tree_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
@@ -156,11 +275,12 @@ class DataTab:
         columns = ['email', 'nom', 'prenom', 'numero', 'images']
         self.tree["columns"] = columns
 
-        self.tree.heading('email', text='EMAIL')
-        self.tree.heading('nom', text='NOM')
-        self.tree.heading('prenom', text='PRENOM')
-        self.tree.heading('numero', text='NUMERO')
-        self.tree.heading('images', text='IMAGES')
+        # Clic sur un en-tete: tri croissant, decroissant, puis ordre de la liste
+        self._headings = {
+            'email': 'EMAIL', 'nom': 'NOM', 'prenom': 'PRENOM', 'numero': 'NUMERO', 'images': 'IMAGES'
+        }
+        for column, text in self._headings.items():
+            self.tree.heading(column, text=text, command=lambda c=column: self._sort_by(c))
 
         self.tree.column('email', width=180, anchor="w")
         self.tree.column('nom', width=100, anchor="w")
@@ -221,9 +341,7 @@ class DataTab:
             self._clear_images_preview()
             return
 
-        item = selected[0]
-        index = self.tree.index(item)
-        recipient = self.app_data.recipients[index]
+        recipient = self._rows[selected[0]]
 
         self.selected_info.configure(
             text=f"{recipient.prenom} {recipient.nom}",
@@ -312,7 +430,7 @@ class DataTab:
         """Supprime une image specifique."""
         if 0 <= index < len(recipient.images):
             del recipient.images[index]
-            self._update_preview()
+            self._update_rows([recipient])
             self._update_images_preview(recipient)
 
     def _clear_images_preview(self):
@@ -338,9 +456,7 @@ class DataTab:
             title="Selectionner une ou plusieurs images"
         )
         if files:
-            item = selected[0]
-            index = self.tree.index(item)
-            recipient = self.app_data.recipients[index]
+            recipient = self._rows[selected[0]]
 
             for file in files:
                 try:
@@ -351,7 +467,7 @@ class DataTab:
                 except Exception as e:
                     messagebox.showerror("Erreur", f"Impossible de charger {file}: {e}")
 
-            self._update_preview()
+            self._update_rows([recipient])
             self._update_images_preview(recipient)
 
     def _download_template(self):
@@ -369,44 +485,374 @@ class DataTab:
                 self.import_status.configure(text="Template telecharge !", text_color=COLORS["success"])
 
     def _import_file(self):
-        """Importe un fichier de destinataires."""
-        file = filedialog.askopenfilename(
-            filetypes=[("Excel/CSV", "*.xlsx *.xls *.csv")]
+        """Importe un ou plusieurs fichiers de destinataires (fusionnes et dedoublonnes)."""
+        files = filedialog.askopenfilenames(
+            filetypes=[
+                ("Excel/CSV/Parquet", "*.xlsx *.xls *.csv *.parquet *.arrow *.feather"),
+                ("Parquet/Arrow", "*.parquet *.pq *.arrow *.feather *.ipc")
+            ]
         )
-        if file:
-            recipients, error = DataService.load_file(file)
+        if files:
+            mode = next(k for k, label in IMPORT_MODES.items() if label == self.mode_var.get())
+            keep = next(k for k, label in DEDUP_KEEP.items() if label == self.dedup_var.get())
+            self.import_status.configure(text="Import en cours...", text_color=COLORS["primary"])
+            # Lecture en arriere-plan: l'interface reste reactive sur les gros fichiers
+            threading.Thread(
+                target=self._read_files, args=(list(files), mode, keep), daemon=True
+            ).start()
+
+    def _post_status(self, text: str, color: str):
+        """Affiche un statut depuis un thread de travail (via le thread de l'interface)."""
+        self.parent.after(0, lambda: self.import_status.configure(text=text, text_color=color))
+
+    def _read_files(self, files, mode: str, keep: str):
+        """Lit les fichiers (thread), puis confie le resultat au thread de l'interface."""
+        def on_progress(count, total):
+            progress = f"{count} / {total}" if total else str(count)
+            self._post_status(f"Import en cours... {progress} lignes", COLORS["primary"])
+
+        recipients, error = DataService.load_files(files, on_progress)
+        self.parent.after(0, self._load_files, files, mode, keep, recipients, error)
+
+    def _load_files(self, files, mode: str, keep: str, recipients: list, error):
+        """
+        Fusionne, dedoublonne et filtre les destinataires lus (thread de l'interface).
+
+        Args:
+            files: Fichiers importes
+            mode: Cle de IMPORT_MODES ("replace", "append" ou "update")
+            keep: Cle de DEDUP_KEEP
+            recipients: Destinataires lus
+            error: Erreur de lecture ou None
+        """
+        if error:
+            self.import_status.configure(text=f"Erreur: {error}", text_color=COLORS["error"])
+            if mode == "replace":
+                self.app_data.recipients = []
+                self._update_preview()
+            return
+
+        if mode == "append":
+            recipients = self.app_data.recipients + recipients
+            sources = self.app_data.source_files + [f for f in files if f not in self.app_data.source_files]
+        else:
+            sources = list(files)
+
+        recipients, duplicates = DataService.deduplicate(recipients, keep=keep)
+        recipients, suppressed = SuppressionList.default().filter(recipients)
+        self.app_data.source_files = sources
+        if mode == "update":
+            diff = self._apply_reimport(recipients)
+            loaded = f"Mise a jour: {diff.summary()}"
+        else:
+            diff = None
+            self.app_data.recipients = recipients
+            self._update_preview()
+            loaded = f"{len(recipients)} destinataires charges"
+        self._clear_images_preview()
+
+        details = []
+        if duplicates:
+            details.append(f"{len(duplicates)} doublons ignores")
+        if suppressed:
+            details.append(f"{len(suppressed)} exclus: liste d'opposition")
+        excluded = f" ({', '.join(details)})" if details else ""
+        self.import_status.configure(
+            text=f"{loaded}{excluded}",
+            text_color=COLORS["success"]
+        )
+
+        if diff is not None and diff.changed:
+            messagebox.showinfo("Mise a jour de la liste", diff.details())
+
+        if duplicates:
+            shown = "\n".join(r.email for r in duplicates[:20])
+            more = f"\n... et {len(duplicates) - 20} autres" if len(duplicates) > 20 else ""
+            messagebox.showinfo(
+                "Doublons",
+                f"{len(duplicates)} ligne(s) en double ignoree(s) :\n\n{shown}{more}"
+            )
+
+    def _apply_reimport(self, recipients: list):
+        """
+        Met a jour la liste actuelle d'apres un fichier modifie (comparaison par adresse):
+        images, statuts et resultats d'envoi des destinataires gardes sont conserves.
+        """
+        current = self.app_data.recipients
+        diff = DiffService.diff(current, recipients)
+        self.app_data.recipients = DiffService.apply(current, diff)
+
+        # Index du tableau mis a jour sans tout recalculer
+        self._table.removed(self.app_data.recipients, diff.removed)
+        self._table.added(diff.added)
+        self._table.updated([old for old, _ in diff.updated])
+        self._render()
+        return diff
+
+    def _export_recipients(self):
+        """Exporte les destinataires et leurs resultats (CSV, Excel, Parquet, Arrow)."""
+        if not self.app_data.recipients:
+            return
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV", "*.csv"), ("Excel", "*.xlsx"),
+                ("Parquet", "*.parquet"), ("Arrow", "*.arrow")
+            ],
+            initialfile="resultats.csv"
+        )
+        if filepath:
+            error = DataService.export_recipients(self.app_data.recipients, filepath)
             if error:
                 self.import_status.configure(text=f"Erreur: {error}", text_color=COLORS["error"])
-                self.app_data.recipients = []
             else:
-                self.app_data.recipients = recipients
                 self.import_status.configure(
-                    text=f"{len(recipients)} destinataires charges",
+                    text=f"{len(self.app_data.recipients)} destinataires exportes",
                     text_color=COLORS["success"]
                 )
+
+    def _write_back(self):
+        """Reporte les resultats d'envoi dans les fichiers importes."""
+        sources = self.app_data.source_files
+        if not self.app_data.recipients or not sources:
+            messagebox.showinfo("Reporter", "Aucun fichier importe")
+            return
+        in_place = messagebox.askyesnocancel(
+            "Reporter les resultats",
+            "Ajouter les colonnes de resultat au fichier d'origine ?\n"
+            "(Non: copie *_resultats a cote du fichier)"
+        )
+        if in_place is None:
+            return
+        recipients = list(self.app_data.recipients)
+
+        def do_write():
+            messages = []
+            for filepath in sources:
+                updated, error = DataService.write_back(filepath, recipients, in_place=in_place)
+                if error:
+                    self._post_status(f"Erreur ({os.path.basename(filepath)}): {error}", COLORS["error"])
+                    return
+                target = filepath if in_place else DataService.results_path(filepath)
+                messages.append(f"{os.path.basename(target)}: {updated} lignes")
+            self._post_status(f"Resultats reportes - {', '.join(messages)}", COLORS["success"])
+
+        self.import_status.configure(text="Report des resultats...", text_color=COLORS["primary"])
+        threading.Thread(target=do_write, daemon=True).start()
+
+    def _import_suppression(self):
+        """Ajoute un fichier CSV d'adresses a la liste d'opposition."""
+        file = filedialog.askopenfilename(
+            filetypes=[("CSV", "*.csv")],
+            title="Liste d'opposition (colonne email)"
+        )
+        if file:
+            suppression = SuppressionList.default()
+            added, error = suppression.load_csv(file)
+            if error:
+                self.import_status.configure(text=f"Erreur: {error}", text_color=COLORS["error"])
+                return
+
+            # Appliquer aussi aux destinataires deja charges
+            recipients, suppressed = suppression.filter(self.app_data.recipients)
+            if suppressed:
+                self.app_data.recipients = recipients
                 self._update_preview()
+                self._clear_images_preview()
+            self.import_status.configure(
+                text=f"Liste d'opposition: {added} adresses ajoutees ({len(suppression)} au total), "
+                     f"{len(suppressed)} destinataires retires",
+                text_color=COLORS["success"]
+            )
 
-    def _update_preview(self):
-        """Met a jour l'apercu des donnees."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def _import_bounces(self):
+        """Lit une archive de retours (Maildir ou mbox) et marque les destinataires."""
+        is_maildir = messagebox.askyesnocancel(
+            "Retours (DSN)",
+            "Les retours sont-ils dans un dossier Maildir ?\n(Non: fichier mbox)"
+        )
+        if is_maildir is None:
+            return
+        if is_maildir:
+            path = filedialog.askdirectory(title="Maildir des retours")
+        else:
+            path = filedialog.askopenfilename(
+                filetypes=[("mbox", "*.mbox *.mbx"), ("Tous", "*.*")],
+                title="Fichier mbox des retours"
+            )
+        if not path:
+            return
+
+        def show_bounces(outcome, hard, soft, error):
+            # Thread de l'interface: statuts mis a jour ici, pas pendant la lecture
+            BounceService.mark(outcome, self.app_data.recipients)
+            if error:
+                self.import_status.configure(text=f"Erreur: {error}", text_color=COLORS["error"])
+                return
+            self.import_status.configure(
+                text=f"Retours: {hard} echecs definitifs (ajoutes a la liste d'opposition), "
+                     f"{soft} temporaires",
+                text_color=COLORS["success"]
+            )
+
+        def do_import():
+            def on_progress(count, found):
+                self._post_status(
+                    f"Lecture des retours: {count} messages, {found} retours", COLORS["primary"]
+                )
+
+            bounces, error = BounceService.scan(path, on_progress)
+            if error:
+                self._post_status(f"Erreur: {error}", COLORS["error"])
+                return
 
-        for r in self.app_data.recipients:
-            img_count = len(r.images)
-            img_status = f"{img_count} image(s)" if img_count > 0 else "---"
-            self.tree.insert("", "end", values=(r.email, r.nom, r.prenom, r.numero, img_status))
+            # Lecture de l'index et liste d'opposition dans le thread
+            outcome = BounceService.resolve(bounces, MessageIndex.default())
+            hard, soft, error = BounceService.suppress(outcome, SuppressionList.default())
+            self.parent.after(0, show_bounces, outcome, hard, soft, error)
 
+        self.import_status.configure(text="Lecture des retours...", text_color=COLORS["primary"])
+        threading.Thread(target=do_import, daemon=True).start()
+
+    @staticmethod
+    def _row_values(r: Recipient) -> tuple:
+        img_count = len(r.images)
+        img_status = f"{img_count} image(s)" if img_count > 0 else "---"
+        return (r.email, r.nom, r.prenom, r.numero, img_status)
+
+    def _update_preview(self):
+        """Met a jour l'apercu des donnees (nouvelle liste: index recalcules a la demande)."""
+        self._table.reset(self.app_data.recipients)
+        self._render()
+        self._update_count()
+
+    def _render(self):
+        """Affiche la premiere page de la vue triee et filtree."""
+        self.tree.delete(*self.tree.get_children())
+        self._rows = {}
+        rows, self._total = self._table.view(0, TABLE_VIEW_LIMIT)
+        for r in rows:
+            self._insert_row("end", r)
+        self._shown = len(rows)
+        self._update_view_label()
+
+    def _show_more(self):
+        """Ajoute la page suivante de la vue au tableau."""
+        rows, self._total = self._table.view(self._shown, TABLE_VIEW_LIMIT)
+        for r in rows:
+            self._insert_row("end", r)
+        self._shown += len(rows)
+        self._update_view_label()
+
+    def _update_view_label(self, error: str = None):
+        if error:
+            self.view_label.configure(text=error, text_color=COLORS["error"])
+            return
+        filtered = " (filtre)" if self._table.filtered else ""
+        self.view_label.configure(
+            text=f"{self._shown} affiches sur {self._total}{filtered}",
+            text_color=COLORS["gray"]
+        )
+        self.more_btn.configure(state="normal" if self._shown < self._total else "disabled")
+
+    def _sort_by(self, column: str):
+        """Trie le tableau sur une colonne (croissant, decroissant, puis ordre de la liste)."""
+        table = self._table
+        if table.sort_column != column:
+            table.set_sort(column)
+        elif not table.descending:
+            table.set_sort(column, descending=True)
+        else:
+            table.set_sort(None)
+        for name, text in self._headings.items():
+            if name == table.sort_column:
+                text += " \u25bc" if table.descending else " \u25b2"
+            self.tree.heading(name, text=text)
+        self._render()
+
+    def _on_filter_key(self, event=None):
+        """Applique le filtre apres une courte pause de frappe."""
+        if self._filter_job is not None:
+            self.parent.after_cancel(self._filter_job)
+        self._filter_job = self.parent.after(SEARCH_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        error = self._table.set_filter(self.filter_entry.get())
+        if error:
+            self._update_view_label(error)
+            return
+        self._render()
+
+    def _insert_row(self, position, recipient: Recipient):
+        iid = str(id(recipient))
+        self._rows[iid] = recipient
+        self.tree.insert("", position, iid=iid, values=self._row_values(recipient))
+
+    def _replace_row(self, old: Recipient, new: Recipient):
+        """Remplace la ligne d'un destinataire par celle de son remplacant, a la meme place."""
+        iid = str(id(old))
+        if iid in self._rows:
+            position = self.tree.index(iid)
+            self.tree.delete(iid)
+            del self._rows[iid]
+            self._insert_row(position, new)
+
+    def _update_count(self):
         self.import_status.configure(
             text=f"{len(self.app_data.recipients)} destinataires",
             text_color=COLORS["success"] if self.app_data.recipients else COLORS["gray"]
         )
 
+    def _update_rows(self, recipients: list):
+        """Reindexe et reaffiche les lignes de destinataires modifies sur place."""
+        self._table.updated(recipients)
+        for recipient in recipients:
+            iid = str(id(recipient))
+            if iid in self._rows:
+                self.tree.item(iid, values=self._row_values(recipient))
+
+    def _selected_recipients(self) -> list:
+        return [self._rows[iid] for iid in self.tree.selection()]
+
+    def _remove(self, removed: list):
+        """Retire un groupe de destinataires de la liste et du tableau, sans tout reafficher."""
+        self.app_data.recipients, _ = DataService.remove_recipients(self.app_data.recipients, removed)
+        self._table.removed(self.app_data.recipients, removed)
+        iids = [iid for iid in (str(id(r)) for r in removed) if iid in self._rows]
+        self.tree.delete(*iids)
+        for iid in iids:
+            del self._rows[iid]
+        self._shown -= len(iids)
+        _, self._total = self._table.view(0, 0)
+        self._update_view_label()
+        self._clear_images_preview()
+        self._update_count()
+
     def _add_recipient(self):
         """Ajoute un destinataire manuellement."""
         dialog = RecipientDialog(self.parent, "Ajouter un destinataire")
         if dialog.result:
-            self.app_data.recipients.append(dialog.result)
-            self._update_preview()
+            existing = DataService.find_email(self.app_data.recipients, dialog.result.email)
+            if existing is not None:
+                if not messagebox.askyesno(
+                    "Doublon",
+                    f"{dialog.result.email} est deja dans la liste.\nRemplacer le destinataire existant ?"
+                ):
+                    return
+                old = self.app_data.recipients[existing]
+                self.app_data.recipients[existing] = dialog.result
+                self._table.replaced(existing, old, dialog.result)
+                self._replace_row(old, dialog.result)
+            else:
+                self.app_data.recipients.append(dialog.result)
+                self._table.added([dialog.result])
+                # Affiche a la fin du tableau, meme hors du tri ou du filtre courant
+                self._insert_row("end", dialog.result)
+                self._shown += 1
+                self._total += 1
+                self._update_view_label()
+            self._update_count()
 
     def _edit_recipient(self):
         """Modifie le destinataire selectionne."""
@@ -415,15 +861,19 @@ class DataTab:
             messagebox.showwarning("Attention", "Selectionnez un destinataire a modifier")
             return
 
-        item = selected[0]
-        index = self.tree.index(item)
-        recipient = self.app_data.recipients[index]
+        recipient = self._rows[selected[0]]
+        index = self._table.position(recipient)
 
         dialog = RecipientDialog(self.parent, "Modifier le destinataire", recipient)
         if dialog.result:
+            existing = DataService.find_email(self.app_data.recipients, dialog.result.email, exclude=index)
+            if existing is not None:
+                messagebox.showwarning("Doublon", f"{dialog.result.email} est deja dans la liste")
+                return
             self.app_data.recipients[index] = dialog.result
-            self._update_preview()
-            self._on_selection_change(None)
+            self._table.replaced(index, recipient, dialog.result)
+            self._replace_row(recipient, dialog.result)
+            self.tree.selection_set(str(id(dialog.result)))
 
     def _delete_recipient(self):
         """Supprime le(s) destinataire(s) selectionne(s)."""
@@ -433,11 +883,58 @@ class DataTab:
             return
 
         if messagebox.askyesno("Confirmer", f"Supprimer {len(selected)} destinataire(s) ?"):
-            indices = sorted([self.tree.index(item) for item in selected], reverse=True)
-            for idx in indices:
-                del self.app_data.recipients[idx]
-            self._update_preview()
-            self._clear_images_preview()
+            self._remove(self._selected_recipients())
+
+    def _on_bulk_action(self, choice: str):
+        """Lance une action groupee du menu."""
+        self.bulk_menu.set("Groupe...")
+        self._bulk_actions[choice]()
+
+    def _set_field_selected(self, field: str):
+        """Donne la meme valeur a un champ de tous les destinataires selectionnes."""
+        recipients = self._selected_recipients()
+        if not recipients:
+            messagebox.showwarning("Attention", "Selectionnez des destinataires a modifier")
+            return
+        value = ctk.CTkInputDialog(
+            title="Modification groupee",
+            text=f"Nouveau {field} pour {len(recipients)} destinataire(s) :"
+        ).get_input()
+        if value is None:
+            return
+        count = DataService.set_field(recipients, field, value.strip())
+        self._update_rows(recipients)
+        self.import_status.configure(text=f"{count} destinataires modifies", text_color=COLORS["success"])
+
+    def _clear_images_selected(self):
+        """Retire les images personnelles des destinataires selectionnes."""
+        recipients = self._selected_recipients()
+        if not recipients:
+            messagebox.showwarning("Attention", "Selectionnez des destinataires")
+            return
+        if not messagebox.askyesno("Confirmer", f"Retirer les images de {len(recipients)} destinataire(s) ?"):
+            return
+        count = DataService.clear_images(recipients)
+        self._update_rows(recipients)
+        self._clear_images_preview()
+        self.import_status.configure(text=f"{count} images retirees", text_color=COLORS["success"])
+
+    def _delete_by_filter(self):
+        """Supprime tous les destinataires du filtre courant (pas seulement les lignes affichees)."""
+        if not self._table.filtered:
+            messagebox.showwarning("Attention", "Saisissez d'abord un filtre au-dessus du tableau")
+            return
+        matched = self._table.matching()
+        if not matched:
+            messagebox.showinfo("Supprimer le resultat du filtre", "Aucun destinataire ne correspond au filtre")
+            return
+        if messagebox.askyesno("Confirmer", f"Supprimer les {len(matched)} destinataire(s) du filtre ?"):
+            self._remove(matched)
+
+    def refresh(self):
+        """Reaffiche les destinataires apres un changement externe (projet ouvert)."""
+        self._update_preview()
+        self._clear_images_preview()
 
     def apply_theme(self):
         """
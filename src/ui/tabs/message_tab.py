@@ -9,7 +9,7 @@ from tkinter import filedialog
 from PIL import Image, ImageTk
 
 from ...config import COLORS, SMTP_PROVIDERS, ALL_PROVIDERS
-from ...models import AppState, Recipient
+from ...models import AppState, Recipient, SMTPConfig
 from ...services import EmailService
 
 
@@ -359,6 +359,32 @@ class MessageTab:
             text="Gmail : myaccount.google.com/apppasswords" if choice == "Gmail" else ""
         )
 
+    def load_state(self, smtp: SMTPConfig):
+        """Recharge objet, corps, image et configuration (projet ouvert). Mot de passe inchange."""
+        self.subject_entry.delete(0, "end")
+        self.subject_entry.insert(0, self.app_data.subject)
+        self.body_text.delete("1.0", "end")
+        self.body_text.insert("1.0", self.app_data.body)
+
+        if self.app_data.default_image:
+            self.image_status.configure(text="Image: projet", text_color=COLORS["success"])
+        else:
+            self.image_status.configure(text="Aucune image", text_color=COLORS["gray"])
+
+        provider = next(
+            (name for name, (server, _) in SMTP_PROVIDERS.items() if server and server == smtp.server),
+            "Autre"
+        )
+        self.provider_var.set(provider)
+        self._on_provider_change(provider)
+        if provider == "Autre":
+            self.server_entry.insert(0, smtp.server)
+            self.port_entry.delete(0, "end")
+            self.port_entry.insert(0, str(smtp.port))
+        self.email_entry.delete(0, "end")
+        self.email_entry.insert(0, smtp.email)
+        self._update_preview()
+
     def get_subject(self) -> str:
         """Retourne l'objet du mail."""
         return self.subject_entry.get()
@@ -3,15 +3,30 @@ Onglet Envoi - Envoi des emails et resultats.
 """
 
 import io
+import re
 import time
 import threading
+from typing import Optional
 import customtkinter as ctk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from PIL import Image
 
-from ...config import COLORS
-from ...models import AppState, SMTPConfig, Recipient, SendStatus
-from ...services import EmailService
+from ...config import (
+    COLORS, IMAGE_MAX_WIDTH, IMAGE_QUALITY, IMAGE_QUALITIES, DRYRUN_FORMATS, DRYRUN_WRITERS,
+    FAILURE_CATEGORIES, FAILURE_VIEW_LIMIT, FAILURE_TOP_DOMAINS, SEARCH_PAGE_SIZE, SEARCH_DELAY_MS,
+    SCHEDULE_WINDOWS
+)
+from ...models import AppState, SMTPConfig, Recipient, SendStatus, SendWindow
+from ...services import (
+    EmailService, ImageOptimizer, SendEngine, SuppressionList, MessageStore, DryRunSession,
+    CampaignEstimator, CampaignScheduler, MessageIndex, PreflightService, RecipientSource,
+    FailureIndex, RecipientSearch, DataService
+)
+from ...services.estimate_service import provider_limits
+
+
+# Plage horaire saisie: "09:00-12:00"
+_WINDOW_RE = re.compile(r"^(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})$")
 
 
 class SendTab:
@@ -21,6 +36,17 @@ class SendTab:
         self.parent = parent
         self.app_data = app_data
         self.get_config = get_config_func
+        self._optimizer = None
+        # Arret de la campagne planifiee en cours (None si aucune)
+        self._schedule_stop = None
+        # Envoi en cours (pause/annulation) et position d'une campagne annulee
+        self._engine = None
+        self._resume_from = 0
+        # Echecs indexes (categorie, domaine) et filtres affiches: libelle -> cle
+        self._failures = FailureIndex()
+        self._failures_refreshed = 0.0
+        self._category_choices = {}
+        self._domain_choices = {}
         self._build()
 
     def _build(self):
@@ -77,6 +103,15 @@ class SendTab:
             command=self._send_test
         ).pack(side="left", padx=(0, 10))
 
+        ctk.CTkButton(
+            btn_frame,
+            text="Estimer",
+            width=100,
+            fg_color=COLORS["gray"],
+            hover_color="#4b5563",
+            command=self._estimate
+        ).pack(side="left", padx=(0, 10))
+
         ctk.CTkButton(
             btn_frame,
             text="ENVOYER A TOUS",
@@ -85,8 +120,87 @@ class SendTab:
             hover_color="#047857",
             font=("Segoe UI", 13, "bold"),
             command=self._send_all
+        ).pack(side="left", padx=(0, 10))
+
+        # Tres grandes listes: envoi direct depuis les fichiers, sans import
+        ctk.CTkButton(
+            btn_frame,
+            text="Depuis fichiers",
+            width=120,
+            fg_color=COLORS["gray"],
+            hover_color="#4b5563",
+            command=self._send_from_files
+        ).pack(side="left", padx=(0, 10))
+
+        # Controle de la campagne en cours
+        self.pause_btn = ctk.CTkButton(
+            btn_frame,
+            text="Pause",
+            width=100,
+            fg_color=COLORS["warning"],
+            state="disabled",
+            command=self._toggle_pause
+        )
+        self.pause_btn.pack(side="left", padx=(0, 10))
+
+        self.cancel_btn = ctk.CTkButton(
+            btn_frame,
+            text="Annuler",
+            width=100,
+            fg_color=COLORS["error"],
+            state="disabled",
+            command=self._cancel_send
+        )
+        self.cancel_btn.pack(side="left")
+
+        # Options d'optimisation des images
+        options_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        options_frame.pack(fill="x", padx=20, pady=(0, 15))
+
+        self.optimize_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            options_frame,
+            text=f"Optimiser les images ({IMAGE_MAX_WIDTH}px, sans metadonnees)",
+            variable=self.optimize_var,
+            font=("Segoe UI", 12)
+        ).pack(side="left", padx=(0, 10))
+
+        ctk.CTkLabel(options_frame, text="Qualite", font=("Segoe UI", 12)).pack(side="left", padx=(0, 5))
+        self.quality_var = ctk.StringVar(value=str(IMAGE_QUALITY))
+        ctk.CTkOptionMenu(
+            options_frame,
+            values=IMAGE_QUALITIES,
+            variable=self.quality_var,
+            width=70
         ).pack(side="left")
 
+        # Simulation: rendu complet de la campagne sur disque, sans envoi
+        self.dryrun_format_var = ctk.StringVar(value=DRYRUN_FORMATS["eml"])
+        ctk.CTkOptionMenu(
+            options_frame,
+            values=list(DRYRUN_FORMATS.values()),
+            variable=self.dryrun_format_var,
+            width=140
+        ).pack(side="right")
+
+        ctk.CTkButton(
+            options_frame,
+            text="Simulation",
+            width=100,
+            fg_color=COLORS["gray"],
+            hover_color="#4b5563",
+            command=self._dry_run
+        ).pack(side="right", padx=(0, 10))
+
+        ctk.CTkButton(
+            options_frame,
+            text="Planifier",
+            width=100,
+            fg_color=COLORS["gray"],
+            hover_color="#4b5563",
+            command=self._schedule
+        ).pack(side="right", padx=(0, 10))
+
     def _build_progress_section(self, parent: ctk.CTkFrame):
         """Section progression."""
         frame = ctk.CTkFrame(parent)
@@ -138,6 +252,20 @@ class SendTab:
         self.success_list = ctk.CTkTextbox(success_frame, font=("Consolas", 10), state="disabled")
         self.success_list.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
+        # Colonne exclus (liste d'opposition)
+        suppressed_frame = ctk.CTkFrame(columns_frame)
+        suppressed_frame.pack(side="right", fill="both", expand=True, padx=(10, 0))
+
+        ctk.CTkLabel(
+            suppressed_frame,
+            text="Exclus (opposition)",
+            font=("Segoe UI", 12, "bold"),
+            text_color=COLORS["gray"]
+        ).pack(anchor="w", padx=15, pady=(10, 5))
+
+        self.suppressed_list = ctk.CTkTextbox(suppressed_frame, font=("Consolas", 10), state="disabled")
+        self.suppressed_list.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
         # Colonne echecs
         failed_frame = ctk.CTkFrame(columns_frame)
         failed_frame.pack(side="right", fill="both", expand=True, padx=(10, 0))
@@ -149,6 +277,45 @@ class SendTab:
             text_color=COLORS["error"]
         ).pack(anchor="w", padx=15, pady=(10, 5))
 
+        # Comptes par categorie et par domaine, mis a jour pendant l'envoi
+        self.failure_counts = ctk.CTkLabel(
+            failed_frame,
+            text="",
+            font=("Segoe UI", 11),
+            justify="left",
+            anchor="w",
+            wraplength=320
+        )
+        self.failure_counts.pack(fill="x", padx=15, pady=(0, 5))
+
+        filters = ctk.CTkFrame(failed_frame, fg_color="transparent")
+        filters.pack(fill="x", padx=10, pady=(0, 5))
+
+        self.failure_category = ctk.CTkOptionMenu(
+            filters,
+            values=["Toutes categories"],
+            width=150,
+            command=lambda _: self._show_failures()
+        )
+        self.failure_category.pack(side="left", padx=(0, 5))
+
+        self.failure_domain = ctk.CTkOptionMenu(
+            filters,
+            values=["Tous domaines"],
+            width=130,
+            command=lambda _: self._show_failures()
+        )
+        self.failure_domain.pack(side="left", padx=(0, 5))
+
+        self.requeue_btn = ctk.CTkButton(
+            filters,
+            text="Renvoyer",
+            width=80,
+            fg_color=COLORS["error"],
+            command=self._requeue_failures
+        )
+        self.requeue_btn.pack(side="right")
+
         self.failed_list = ctk.CTkTextbox(failed_frame, font=("Consolas", 10), state="disabled")
         self.failed_list.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
@@ -165,6 +332,12 @@ class SendTab:
             text=f"{count} destinataires  |  Image defaut: {has_img}  |  {custom_count} avec images perso ({total_images} total)"
         )
 
+        # Echecs deja enregistres (projet ouvert, envoi precedent)
+        if self._engine is None and self._schedule_stop is None:
+            self._failures = FailureIndex.from_recipients(self.app_data.recipients)
+            self._refresh_failures()
+            self._show_failures()
+
     def _show_preview(self):
         """Affiche la preview du mail pour un destinataire."""
         if not self.app_data.recipients:
@@ -191,6 +364,13 @@ class SendTab:
         self.failed_list.see("end")
         self.failed_list.configure(state="disabled")
 
+    def _log_suppressed(self, text: str):
+        """Ajoute une entree dans la liste des exclus."""
+        self.suppressed_list.configure(state="normal")
+        self.suppressed_list.insert("end", text + "\n")
+        self.suppressed_list.see("end")
+        self.suppressed_list.configure(state="disabled")
+
     def _clear_logs(self):
         """Vide les logs."""
         self.success_list.configure(state="normal")
@@ -199,6 +379,9 @@ class SendTab:
         self.failed_list.configure(state="normal")
         self.failed_list.delete("1.0", "end")
         self.failed_list.configure(state="disabled")
+        self.suppressed_list.configure(state="normal")
+        self.suppressed_list.delete("1.0", "end")
+        self.suppressed_list.configure(state="disabled")
 
     def _send_email(self, config, recipient, subject, body, default_image, personal_images):
         """Envoie un email via SMTP."""
@@ -208,6 +391,17 @@ class SendTab:
             personal_images=personal_images
         )
 
+    def _get_optimizer(self):
+        """Retourne l'optimiseur d'images si l'option est active, sinon None."""
+        if not self.optimize_var.get():
+            return None
+        quality = int(self.quality_var.get())
+        if self._optimizer is None or self._optimizer.quality != quality:
+            if self._optimizer is not None:
+                self._optimizer.close()
+            self._optimizer = ImageOptimizer(quality=quality)
+        return self._optimizer
+
     def _send_test(self):
         """Envoie un email de test."""
         config = self.get_config()
@@ -233,9 +427,14 @@ class SendTab:
         )
 
         subject, body = self.get_config(get_message=True)
+        default_image = self.app_data.default_image
+        optimizer = self._get_optimizer()
+        if optimizer and default_image:
+            default_image = optimizer.optimize(default_image)
+
         success, error = self._send_email(
             config, test_recipient, subject, body,
-            default_image=self.app_data.default_image,
+            default_image=default_image,
             personal_images=None
         )
 
@@ -267,58 +466,793 @@ class SendTab:
             )
             return
 
+        if self._engine is not None:
+            return
+
+        start = 0
+        if 0 < self._resume_from < len(self.app_data.recipients):
+            if messagebox.askyesno(
+                "Reprendre",
+                f"L'envoi precedent a ete annule apres {self._resume_from} destinataires.\n"
+                "Reprendre a partir de cette position ?"
+            ):
+                start = self._resume_from
+        self._resume_from = 0
+
+        optimizer = self._get_optimizer()
+        subject, body = self.get_config(get_message=True)
+        recipients = self.app_data.recipients[start:]
+        if not self._confirm_preflight(subject, body, recipients, offset=start):
+            # Garder la position de reprise pour le prochain essai
+            self._resume_from = start
+            return
+
+        # Echecs deja connus avant la position de reprise
+        self._failures = FailureIndex.from_recipients(self.app_data.recipients, stop=start)
+        self._run_send(
+            config, subject, body, optimizer,
+            range(start, len(self.app_data.recipients)), resume_offset=start
+        )
+
+    def _run_send(
+        self, config, subject, body, optimizer, indices,
+        resume_offset: Optional[int] = None, source: Optional[RecipientSource] = None
+    ):
+        """
+        Envoie les destinataires de rangs `indices` dans un thread.
+
+        Args:
+            indices: Rangs dans app_data.recipients (croissants), ou dans la source
+            resume_offset: Rang du premier destinataire si l'envoi peut etre
+                repris apres annulation (envoi complet), None pour un renvoi
+            source: Fichiers relus pendant l'envoi a la place de app_data.recipients
+        """
+        if source is not None:
+            recipients = source
+        else:
+            recipients = [self.app_data.recipients[i] for i in indices]
+
+        # Rendu des messages en parallele, session SMTP reutilisee
+        engine = self._engine = SendEngine(
+            config, subject, body,
+            default_image=self.app_data.default_image,
+            optimizer=optimizer,
+            suppression=SuppressionList.default(),
+            message_index=MessageIndex.default()
+        )
+        self._set_controls(True)
+        self._clear_logs()
+        self._show_failures()
+        self.send_status.configure(
+            text="Envoi en cours...",
+            text_color=COLORS["primary"]
+        )
+        self.progress.set(0)
+
+        total = len(recipients)
+        done = [0]
+
+        def show_result(idx, recipient, success, error):
+            # Thread de l'interface. Un echec renvoye ne quitte l'index qu'une
+            # fois traite (conserve si annule)
+            if success:
+                self._failures.remove(indices[idx])
+                self._log_success(f"{recipient.prenom} {recipient.nom} <{recipient.email}>")
+            elif error is None:
+                self._failures.remove(indices[idx])
+                self._log_suppressed(recipient.email)
+            else:
+                self._record_failure(indices[idx], recipient, error)
+
+            done[0] += 1
+            self.progress.set(done[0] / total)
+
+        def on_result(idx, recipient, success, error):
+            # Appele par le thread d'envoi: affichage confie au thread de l'interface
+            self.parent.after(0, show_result, idx, recipient, success, error)
+
+        def finish():
+            self._engine = None
+            self._set_controls(False)
+            self._refresh_failures()
+            if source is not None:
+                source.close()
+            success_count, failed_count = engine.success_count, engine.failed_count
+            excluded = f", {engine.suppressed_count} exclus" if engine.suppressed_count else ""
+            # Reprise des sessions TLS: seulement si la connexion a ete rouverte
+            tls = f"\n{engine.tls.summary()}" if engine.tls.handshakes > 1 else ""
+
+            # Resultat final
+            if engine.error:
+                self.send_status.configure(
+                    text=f"Erreur apres {engine.position} destinataires: {engine.error}\n"
+                         f"{success_count} envoyes, {failed_count} echoues{excluded}",
+                    text_color=COLORS["error"]
+                )
+            elif engine.cancelled and resume_offset is not None:
+                position = resume_offset + engine.position
+                # Reprise proposee pour la liste chargee seulement
+                if source is None:
+                    self._resume_from = position
+                self.send_status.configure(
+                    text=f"Annule apres {position} destinataires: "
+                         f"{success_count} envoyes, {failed_count} echoues{excluded}{tls}",
+                    text_color=COLORS["warning"]
+                )
+            elif engine.cancelled:
+                self.send_status.configure(
+                    text=f"Renvoi annule: {success_count} envoyes, {failed_count} echoues{excluded}{tls}",
+                    text_color=COLORS["warning"]
+                )
+            elif failed_count == 0:
+                self.send_status.configure(
+                    text=f"Termine ! {success_count} envoyes{excluded}{tls}",
+                    text_color=COLORS["success"]
+                )
+            else:
+                self.send_status.configure(
+                    text=f"{success_count} envoyes, {failed_count} echoues{excluded}{tls}",
+                    text_color=COLORS["warning"]
+                )
+
         def do_send():
-            self._clear_logs()
+            try:
+                engine.run(recipients, on_result)
+            finally:
+                # Poste apres les resultats: l'index des echecs est complet
+                self.parent.after(0, finish)
+
+        threading.Thread(target=do_send, daemon=True).start()
+
+    def _failure_filter(self):
+        """(categorie, domaine) selectionnes dans les filtres, None = tous."""
+        return (
+            self._category_choices.get(self.failure_category.get()),
+            self._domain_choices.get(self.failure_domain.get())
+        )
+
+    def _record_failure(self, index: int, recipient: Recipient, error: str):
+        """Indexe un echec, l'affiche s'il correspond aux filtres, met a jour les comptes."""
+        failure = self._failures.add(index, recipient.email, error or "")
+        category, domain = self._failure_filter()
+        if category in (None, failure.category) and domain in (None, failure.domain):
+            self._log_failed(str(failure))
+
+        # Comptes rafraichis au plus deux fois par seconde
+        now = time.monotonic()
+        if now - self._failures_refreshed >= 0.5:
+            self._refresh_failures()
+
+    def _refresh_failures(self):
+        """Met a jour les comptes par categorie / domaine et les choix des filtres."""
+        self._failures_refreshed = time.monotonic()
+        category, domain = self._failure_filter()
+
+        categories = self._failures.by_category()
+        domains = self._failures.by_domain(category=category)
+        if categories:
+            text = "  ".join(f"{FAILURE_CATEGORIES[key]}: {count}" for key, count in categories)
+            top = ", ".join(f"{name} {count}" for name, count in domains[:5])
+            self.failure_counts.configure(text=f"{len(self._failures)} echecs  |  {text}\nDomaines: {top}")
+        else:
+            self.failure_counts.configure(text="")
+
+        # Choix des filtres avec leur nombre; la selection courante est gardee
+        self._category_choices = {"Toutes categories": None}
+        self._category_choices.update(
+            {f"{FAILURE_CATEGORIES[key]} ({count})": key for key, count in categories}
+        )
+        self._domain_choices = {"Tous domaines": None}
+        self._domain_choices.update(
+            {f"{name} ({count})": name for name, count in domains[:FAILURE_TOP_DOMAINS]}
+        )
+        self.failure_category.configure(values=list(self._category_choices))
+        self.failure_domain.configure(values=list(self._domain_choices))
+        self.failure_category.set(next(
+            (label for label, key in self._category_choices.items() if key == category),
+            "Toutes categories"
+        ))
+        self.failure_domain.set(next(
+            (label for label, key in self._domain_choices.items() if key == domain),
+            "Tous domaines"
+        ))
+
+    def _show_failures(self):
+        """Affiche les echecs de la categorie / du domaine selectionnes."""
+        self._refresh_failures()
+        selection = self._failures.select(*self._failure_filter())
+        lines = [str(failure) for failure in selection[:FAILURE_VIEW_LIMIT]]
+        if len(selection) > FAILURE_VIEW_LIMIT:
+            lines.append(f"... {len(selection) - FAILURE_VIEW_LIMIT} autres")
+
+        self.failed_list.configure(state="normal")
+        self.failed_list.delete("1.0", "end")
+        if lines:
+            self.failed_list.insert("end", "\n".join(lines) + "\n")
+        self.failed_list.configure(state="disabled")
+
+    def _requeue_failures(self):
+        """Renvoie les destinataires en echec de la categorie / du domaine affiches."""
+        if self._engine is not None or self._schedule_stop is not None:
+            return
+        config = self.get_config()
+        if not config.is_valid():
             self.send_status.configure(
-                text="Envoi en cours...",
-                text_color=COLORS["primary"]
+                text="Configure l'email (onglet Message)",
+                text_color=COLORS["error"]
             )
-            self.progress.set(0)
+            return
 
-            subject, body = self.get_config(get_message=True)
+        # Ignorer les echecs dont le destinataire a change depuis (liste modifiee)
+        recipients = self.app_data.recipients
+        selection = [
+            f for f in self._failures.select(*self._failure_filter())
+            if f.index < len(recipients) and recipients[f.index].email == f.email
+        ]
+        if not selection:
+            return
+
+        category, domain = self._failure_filter()
+        label = " / ".join(filter(None, (FAILURE_CATEGORIES.get(category), domain))) or "tous les echecs"
+        if not messagebox.askyesno("Renvoyer", f"Renvoyer {len(selection)} messages ({label}) ?"):
+            return
+
+        subject, body = self.get_config(get_message=True)
+        self._run_send(config, subject, body, self._get_optimizer(), [f.index for f in selection])
+
+    def _confirm_preflight(self, subject: str, body: str, recipients, offset: int = 0) -> bool:
+        """Verifie le message sur tous les destinataires; demande confirmation si probleme."""
+        report = PreflightService.check(subject, body, recipients)
+        if report.ok:
+            return True
+
+        lines = []
+        if report.unknown:
+            lines.append(f"Placeholders inconnus (envoyes tels quels) : {', '.join(report.unknown)}")
+        for name, indices in report.empty.items():
+            lines.append(f"{{{{{name}}}}} vide pour {len(indices)} destinataire(s)")
+        if report.long_subjects:
+            lines.append(
+                f"Objet trop long pour {len(report.long_subjects)} destinataire(s) "
+                f"(jusqu'a {report.max_subject_length} caracteres)"
+            )
+
+        affected = report.affected
+        if affected:
+            lines.append("")
+            for idx in affected[:15]:
+                recipient = recipients[idx]
+                problems = [name for name, indices in report.empty.items() if idx in indices]
+                if idx in report.long_subjects:
+                    problems.append("objet")
+                lines.append(f"#{offset + idx + 1} {recipient.email} : {', '.join(problems)}")
+            if len(affected) > 15:
+                lines.append(f"... et {len(affected) - 15} autres")
+
+        return messagebox.askyesno(
+            "Verification avant envoi",
+            "\n".join(lines) + "\n\nEnvoyer quand meme ?"
+        )
+
+    def _send_from_files(self):
+        """
+        Envoie directement depuis des fichiers, sans les importer (tres grandes
+        listes): les destinataires sont relus par lots pendant l'envoi.
+        """
+        config = self.get_config()
+        if not config.is_valid():
+            self.send_status.configure(
+                text="Configure l'email (onglet Message)",
+                text_color=COLORS["error"]
+            )
+            return
+        if self._engine is not None or self._schedule_stop is not None:
+            return
+
+        files = filedialog.askopenfilenames(
+            filetypes=[
+                ("Excel/CSV/Parquet", "*.xlsx *.csv *.parquet *.pq *.arrow *.feather *.ipc"),
+                ("Tous", "*.*")
+            ],
+            title="Destinataires (lus pendant l'envoi)"
+        )
+        if not files:
+            return
+        images = filedialog.askopenfilename(
+            filetypes=[("ZIP", "*.zip")],
+            title="Images personnelles (optionnel, nom du fichier = email)"
+        ) or None
+
+        source = RecipientSource(list(files), images=images)
+        optimizer = self._get_optimizer()
+        subject, body = self.get_config(get_message=True)
+        self.send_status.configure(text="Lecture des fichiers...", text_color=COLORS["primary"])
+
+        def start(error):
+            # Thread de l'interface
+            if error:
+                source.close()
+                self.send_status.configure(text=f"Erreur: {error}", text_color=COLORS["error"])
+                return
+            if self._engine is not None or self._schedule_stop is not None or not messagebox.askyesno(
+                "Envoyer depuis les fichiers",
+                f"{len(source)} destinataires ({source.duplicates} doublons ignores).\n"
+                "Envoyer maintenant ?"
+            ):
+                source.close()
+                self.send_status.configure(text="En attente...", text_color=COLORS["gray"])
+                return
+            # Echecs indexes par rang dans les fichiers (pas de renvoi depuis la liste)
+            self._failures = FailureIndex()
+            self._run_send(config, subject, body, optimizer, range(len(source)), resume_offset=0, source=source)
+
+        def do_scan():
+            def on_progress(count, total):
+                self.parent.after(0, lambda: self.send_status.configure(
+                    text=f"Lecture des fichiers... {count} lignes", text_color=COLORS["primary"]
+                ))
+
+            self.parent.after(0, start, source.scan(on_progress))
+
+        threading.Thread(target=do_scan, daemon=True).start()
+
+    def _set_controls(self, running: bool):
+        """Active les boutons Pause/Annuler pendant un envoi."""
+        state = "normal" if running else "disabled"
+        self.pause_btn.configure(text="Pause", state=state)
+        self.cancel_btn.configure(state=state)
+
+    def _toggle_pause(self):
+        """Met l'envoi en pause ou le reprend (sessions SMTP conservees)."""
+        engine = self._engine
+        if engine is None:
+            return
+        if engine.paused:
+            engine.resume()
+            self.pause_btn.configure(text="Pause")
+            self.send_status.configure(text="Envoi en cours...", text_color=COLORS["primary"])
+        else:
+            engine.pause()
+            self.pause_btn.configure(text="Reprendre")
+            self.send_status.configure(
+                text=f"En pause apres {engine.position} destinataires",
+                text_color=COLORS["warning"]
+            )
+
+    def _cancel_send(self):
+        """Arrete l'envoi apres le message en cours."""
+        engine = self._engine
+        if engine is None:
+            return
+        engine.cancel()
+        self.cancel_btn.configure(state="disabled")
+        self.pause_btn.configure(state="disabled")
+        self.send_status.configure(text="Annulation...", text_color=COLORS["warning"])
 
-            success_count = 0
-            failed_count = 0
-            total = len(self.app_data.recipients)
-
-            for idx, recipient in enumerate(self.app_data.recipients):
-                # Image par defaut + images personnalisees du destinataire
-                success, error = self._send_email(
-                    config,
-                    recipient,
-                    subject,
-                    body,
+    def _estimate(self):
+        """Estime le volume et la duree de la campagne sans rien envoyer."""
+        if not self.app_data.recipients:
+            self.send_status.configure(
+                text="Importe des destinataires (onglet Donnees)",
+                text_color=COLORS["error"]
+            )
+            return
+
+        config = self.get_config()
+        subject, body = self.get_config(get_message=True)
+        optimizer = self._get_optimizer()
+
+        recipients = self.app_data.recipients
+        self.send_status.configure(text="Estimation en cours...", text_color=COLORS["primary"])
+
+        def show_estimate(estimate, error):
+            # Thread de l'interface
+            if error is not None:
+                self.send_status.configure(text=f"Erreur: {error}", text_color=COLORS["error"])
+                return
+
+            minutes, seconds = divmod(int(estimate.duration_seconds), 60)
+            hours, minutes = divmod(minutes, 60)
+            lines = [
+                f"Messages: {estimate.messages}",
+                f"Volume total: {estimate.total_bytes / 1_048_576:.1f} Mo",
+                f"Taille: min {estimate.min_bytes / 1024:.0f} Ko, "
+                f"moyenne {estimate.average_bytes / 1024:.0f} Ko, "
+                f"max {estimate.max_bytes / 1024:.0f} Ko",
+                f"Duree estimee: {hours} h {minutes:02d} min {seconds:02d} s",
+            ]
+            if estimate.daily_quota:
+                lines.append(
+                    f"Quota quotidien: {estimate.daily_quota} mails, "
+                    f"soit {estimate.days_needed} jour(s) d'envoi"
+                )
+            if estimate.oversized:
+                lines.append("")
+                lines.append(
+                    f"{len(estimate.oversized)} message(s) depassent la limite de "
+                    f"{estimate.max_message_size / 1_048_576:.0f} Mo:"
+                )
+                lines.extend(
+                    f"  {email} ({size / 1_048_576:.1f} Mo)"
+                    for _, email, size in estimate.oversized[:10]
+                )
+                if len(estimate.oversized) > 10:
+                    lines.append(f"  ... et {len(estimate.oversized) - 10} autres")
+
+            self.send_status.configure(
+                text=f"Estimation: {estimate.total_bytes / 1_048_576:.1f} Mo, "
+                     f"{hours} h {minutes:02d} min",
+                text_color=COLORS["warning"] if estimate.oversized else COLORS["success"]
+            )
+            messagebox.showinfo("Estimation de la campagne", "\n".join(lines))
+
+        def do_estimate():
+            # Rendu de tous les messages dans le thread, affichage via after()
+            try:
+                estimator = CampaignEstimator(
+                    config.email, subject, body,
                     default_image=self.app_data.default_image,
-                    personal_images=recipient.images if recipient.images else None
+                    optimizer=optimizer
                 )
+                estimate, error = estimator.estimate(recipients, server=config.server), None
+            except Exception as e:
+                estimate, error = None, str(e)
+            self.parent.after(0, show_estimate, estimate, error)
 
-                if success:
-                    recipient.status = SendStatus.SUCCESS
-                    success_count += 1
-                    self._log_success(f"{recipient.prenom} {recipient.nom} <{recipient.email}>")
-                else:
-                    recipient.status = SendStatus.FAILED
-                    recipient.error = error
-                    failed_count += 1
-                    self._log_failed(f"{recipient.email}: {error}")
+        threading.Thread(target=do_estimate, daemon=True).start()
 
-                self.progress.set((idx + 1) / total)
-                self.parent.update()
-                time.sleep(0.5)
+    def _schedule(self):
+        """Cree ou reprend une campagne planifiee (plages horaires, quota quotidien)."""
+        config = self.get_config()
+        if not config.is_valid():
+            self.send_status.configure(
+                text="Configure l'email (onglet Message)",
+                text_color=COLORS["error"]
+            )
+            return
 
-            # Resultat final
-            if failed_count == 0:
+        if self._schedule_stop is not None:
+            if messagebox.askyesno("Campagne planifiee", "Arreter la campagne planifiee en cours ?"):
+                self._schedule_stop.set()
+            return
+
+        path = filedialog.askdirectory(title="Dossier de la campagne planifiee")
+        if not path:
+            return
+
+        if CampaignScheduler.exists(path):
+            if not messagebox.askyesno(
+                "Campagne planifiee",
+                "Ce dossier contient deja une campagne.\nReprendre a la position enregistree ?"
+            ):
+                return
+            scheduler, error = CampaignScheduler.load(path)
+        else:
+            if not self.app_data.recipients:
                 self.send_status.configure(
-                    text=f"Termine ! {success_count} envoyes",
+                    text="Importe des destinataires (onglet Donnees)",
+                    text_color=COLORS["error"]
+                )
+                return
+            subject, body = self.get_config(get_message=True)
+            if not self._confirm_preflight(subject, body, self.app_data.recipients):
+                return
+
+            # Tres grandes listes: relire les fichiers importes pendant l'envoi
+            source = None
+            if self.app_data.source_files:
+                from_files = messagebox.askyesnocancel(
+                    "Campagne planifiee",
+                    "Relire les fichiers importes pendant l'envoi (memoire constante) ?\n\n"
+                    "Les modifications faites dans l'application ne seront pas reprises; "
+                    "les images personnelles viennent d'un ZIP (nom du fichier = email)."
+                )
+                if from_files is None:
+                    return
+                if from_files:
+                    images = filedialog.askopenfilename(
+                        filetypes=[("ZIP", "*.zip")],
+                        title="Images personnelles (optionnel)"
+                    ) or None
+                    source = RecipientSource(self.app_data.source_files, images=images)
+
+            dialog = ScheduleDialog(self.parent, provider_limits(config.server)["daily_quota"])
+            if dialog.result is None:
+                return
+            windows, daily_quota = dialog.result
+
+            scheduler, error = CampaignScheduler.create(
+                path, config, subject, body, self.app_data.recipients,
+                default_image=self.app_data.default_image,
+                windows=windows,
+                daily_quota=daily_quota,
+                source=source
+            )
+        if error:
+            self.send_status.configure(text=f"Erreur: {error}", text_color=COLORS["error"])
+            return
+
+        optimizer = self._get_optimizer()
+        stop = self._schedule_stop = threading.Event()
+
+        self._clear_logs()
+        self._failures = FailureIndex()
+        self._show_failures()
+        total = len(scheduler.recipients)
+        # Destinataires de la campagne = copies: resultats reportes sur la liste par email
+        ranks = {
+            DataService.normalize_email(r.email): i
+            for i, r in enumerate(self.app_data.recipients)
+        }
+
+        def show_result(idx, recipient, success, error, position):
+            # Thread de l'interface
+            rank = ranks.get(DataService.normalize_email(recipient.email))
+            if rank is not None:
+                target = self.app_data.recipients[rank]
+                target.status = recipient.status
+                target.error = recipient.error
+                target.message_id = recipient.message_id
+                target.sent_at = recipient.sent_at
+            if success:
+                self._log_success(f"{recipient.prenom} {recipient.nom} <{recipient.email}>")
+            elif error is None:
+                self._log_suppressed(recipient.email)
+            else:
+                self._record_failure(idx if rank is None else rank, recipient, error)
+            self.progress.set(position / total)
+            self.send_status.configure(
+                text=f"Campagne planifiee: {position}/{total}",
+                text_color=COLORS["primary"]
+            )
+
+        def show_wait(resume, reason, position):
+            self.send_status.configure(
+                text=f"Campagne planifiee: {position}/{total}, "
+                     f"reprise le {resume:%d/%m a %H:%M} ({reason})",
+                text_color=COLORS["warning"]
+            )
+
+        def finish(success_count, failed_count, error):
+            self._schedule_stop = None
+            self._refresh_failures()
+            if error is not None:
+                self.send_status.configure(text=f"Erreur: {error}", text_color=COLORS["error"])
+            elif scheduler.finished:
+                tls = f"\n{scheduler.tls.summary()}" if scheduler.tls.handshakes > 1 else ""
+                self.send_status.configure(
+                    text=f"Campagne terminee: {success_count} envoyes, {failed_count} echoues{tls}",
                     text_color=COLORS["success"]
                 )
             else:
                 self.send_status.configure(
-                    text=f"{success_count} envoyes, {failed_count} echoues",
+                    text=f"Campagne arretee a {scheduler.state.position}/{total} (reprise possible)",
                     text_color=COLORS["warning"]
                 )
 
-        threading.Thread(target=do_send, daemon=True).start()
+        def do_schedule():
+            # Callbacks appeles par le thread de la campagne: affichage via after()
+            def on_result(idx, recipient, success, error):
+                self.parent.after(
+                    0, show_result, idx, recipient, success, error, scheduler.state.position
+                )
+
+            def on_wait(resume, reason):
+                self.parent.after(0, show_wait, resume, reason, scheduler.state.position)
+
+            success_count = failed_count = 0
+            error = None
+            try:
+                success_count, failed_count = scheduler.run(
+                    config.password, on_result, on_wait, stop_event=stop,
+                    optimizer=optimizer, suppression=SuppressionList.default(),
+                    message_index=MessageIndex.default()
+                )
+            except Exception as e:
+                error = str(e)
+            finally:
+                self.parent.after(0, finish, success_count, failed_count, error)
+
+        threading.Thread(target=do_schedule, daemon=True).start()
+
+    def _dry_run(self):
+        """Rend tous les messages et les ecrit sur disque (Maildir, mbox ou .eml)."""
+        if self._engine is not None:
+            return
+        if not self.app_data.recipients:
+            self.send_status.configure(
+                text="Importe des destinataires (onglet Donnees)",
+                text_color=COLORS["error"]
+            )
+            return
+
+        fmt = next(k for k, label in DRYRUN_FORMATS.items() if label == self.dryrun_format_var.get())
+        if fmt == "mbox":
+            path = filedialog.asksaveasfilename(
+                defaultextension=".mbox",
+                filetypes=[("mbox", "*.mbox")],
+                initialfile="simulation.mbox"
+            )
+        else:
+            path = filedialog.askdirectory(title="Dossier de sortie de la simulation")
+        if not path:
+            return
+
+        config = self.get_config()
+        if not config.email:
+            config.email = "expediteur@exemple.com"
+        subject, body = self.get_config(get_message=True)
+        optimizer = self._get_optimizer()
+
+        try:
+            store = MessageStore(path, fmt)
+        except Exception as e:
+            self.send_status.configure(text=f"Erreur: {e}", text_color=COLORS["error"])
+            return
+
+        # Moteur cree avant le thread: un second clic est ignore
+        engine = self._engine = SendEngine(
+            config, subject, body,
+            default_image=self.app_data.default_image,
+            optimizer=optimizer,
+            suppression=SuppressionList.default(),
+            sessions=DRYRUN_WRITERS,
+            delay=0,
+            session_factory=lambda: DryRunSession(store),
+            update_status=False
+        )
+        self._set_controls(True)
+        self._clear_logs()
+        self.send_status.configure(text="Simulation en cours...", text_color=COLORS["primary"])
+        self.progress.set(0)
+
+        recipients = self.app_data.recipients
+        total = len(recipients)
+        done = [0]
+        lock = threading.Lock()
+
+        def on_result(idx, recipient, success, error):
+            # Appele par les writers en parallele: affichage confie au thread de l'interface
+            if not success and error is None:
+                self.parent.after(0, self._log_suppressed, recipient.email)
+            elif not success:
+                self.parent.after(0, self._log_failed, f"{recipient.email}: {error}")
+            with lock:
+                done[0] += 1
+                count = done[0]
+            if count % 100 == 0 or count == total:
+                self.parent.after(0, self.progress.set, count / total)
+
+        def finish(elapsed):
+            self._engine = None
+            self._set_controls(False)
+            rate = store.messages / elapsed if elapsed else 0
+            self.send_status.configure(
+                text=f"Simulation: {store.messages} messages ecrits ({store.bytes / 1_048_576:.1f} Mo) "
+                     f"en {elapsed:.1f} s, {rate:.0f} msg/s",
+                text_color=COLORS["success"] if not engine.failed_count else COLORS["warning"]
+            )
+
+        def do_dry_run():
+            start = time.perf_counter()
+            try:
+                engine.run(recipients, on_result)
+            finally:
+                store.close()
+                self.parent.after(0, finish, time.perf_counter() - start)
+
+        threading.Thread(target=do_dry_run, daemon=True).start()
+
+
+class ScheduleDialog(ctk.CTkToplevel):
+    """Dialog des plages horaires et du quota d'une nouvelle campagne planifiee."""
+
+    DAYS = ["Lun", "Mar", "Mer", "Jeu", "Ven", "Sam", "Dim"]
+
+    def __init__(self, parent, daily_quota: Optional[int]):
+        super().__init__(parent)
+        # (plages, quota quotidien ou 0 sans limite), None si annule
+        self.result = None
+
+        self.title("Campagne planifiee")
+        self.geometry("450x360")
+        self.resizable(False, False)
+
+        self.transient(parent)
+        self.grab_set()
+
+        self._build_ui(daily_quota)
+
+        self.update_idletasks()
+        x = parent.winfo_rootx() + (parent.winfo_width() - 450) // 2
+        y = parent.winfo_rooty() + (parent.winfo_height() - 360) // 2
+        self.geometry(f"+{x}+{y}")
+
+        self.wait_window()
+
+    def _build_ui(self, daily_quota: Optional[int]):
+        """Construit l'interface du dialog."""
+        ctk.CTkLabel(
+            self, text="Plages horaires (vide = sans restriction)", font=("Segoe UI", 12)
+        ).pack(anchor="w", padx=20, pady=(20, 5))
+        self.windows_entry = ctk.CTkEntry(self, width=410, height=35, placeholder_text="09:00-12:00, 14:00-18:00")
+        self.windows_entry.pack(padx=20)
+        self.windows_entry.insert(0, ", ".join(f"{start}-{end}" for start, end in SCHEDULE_WINDOWS))
+
+        ctk.CTkLabel(self, text="Jours", font=("Segoe UI", 12)).pack(anchor="w", padx=20, pady=(10, 5))
+        days_frame = ctk.CTkFrame(self, fg_color="transparent")
+        days_frame.pack(fill="x", padx=20)
+        default_days = SendWindow().days
+        self.day_vars = []
+        for index, day in enumerate(self.DAYS):
+            var = ctk.BooleanVar(value=index in default_days)
+            ctk.CTkCheckBox(
+                days_frame, text=day, variable=var, width=55, font=("Segoe UI", 12)
+            ).pack(side="left")
+            self.day_vars.append(var)
+
+        ctk.CTkLabel(
+            self, text="Quota quotidien (vide = sans limite)", font=("Segoe UI", 12)
+        ).pack(anchor="w", padx=20, pady=(10, 5))
+        self.quota_entry = ctk.CTkEntry(self, width=410, height=35)
+        self.quota_entry.pack(padx=20)
+        if daily_quota:
+            self.quota_entry.insert(0, str(daily_quota))
+
+        self.error_label = ctk.CTkLabel(self, text="", text_color=COLORS["error"])
+        self.error_label.pack(anchor="w", padx=20, pady=(10, 0))
+
+        # Boutons
+        btn_frame = ctk.CTkFrame(self, fg_color="transparent")
+        btn_frame.pack(fill="x", padx=20, pady=15)
+
+        ctk.CTkButton(
+            btn_frame,
+            text="Annuler",
+            width=100,
+            fg_color=COLORS["gray"],
+            command=self.destroy
+        ).pack(side="left")
+
+        ctk.CTkButton(
+            btn_frame,
+            text="Valider",
+            width=100,
+            fg_color=COLORS["success"],
+            command=self._validate
+        ).pack(side="right")
+
+    def _validate(self):
+        """Valide et ferme le dialog."""
+        days = tuple(index for index, var in enumerate(self.day_vars) if var.get())
+        windows = []
+        for part in self.windows_entry.get().split(","):
+            part = part.strip()
+            if not part:
+                continue
+            match = _WINDOW_RE.match(part)
+            hours = [int(match.group(1)), int(match.group(3))] if match else []
+            minutes = [int(match.group(2)), int(match.group(4))] if match else []
+            if not match or max(hours) > 23 or max(minutes) > 59:
+                self.error_label.configure(text=f"Plage invalide: {part} (ex: 09:00-12:00)")
+                return
+            start = f"{hours[0]:02d}:{minutes[0]:02d}"
+            end = f"{hours[1]:02d}:{minutes[1]:02d}"
+            if start >= end:
+                self.error_label.configure(text=f"Plage invalide: {part} (debut apres la fin)")
+                return
+            windows.append(SendWindow(start, end, days))
+        if windows and not days:
+            self.error_label.configure(text="Choisis au moins un jour")
+            return
+
+        quota = self.quota_entry.get().strip()
+        if quota and not quota.isdigit():
+            self.error_label.configure(text="Quota quotidien: nombre attendu")
+            return
+
+        self.result = (windows, int(quota or 0))
+        self.destroy()
 
 
 class PreviewDialog(ctk.CTkToplevel):
@@ -328,6 +1262,12 @@ class PreviewDialog(ctk.CTkToplevel):
         super().__init__(parent)
         self.app_data = app_data
         self.get_config = get_config_func
+        # Index construit a la premiere recherche: ouverture immediate
+        self._search = RecipientSearch(app_data.recipients)
+        self._query = ""
+        self._page = 0
+        self._page_rows = {}
+        self._search_job = None
 
         self.title("Preview du mail")
         self.geometry("800x600")
@@ -355,19 +1295,43 @@ class PreviewDialog(ctk.CTkToplevel):
             font=("Segoe UI", 12)
         ).pack(side="left", padx=(0, 10))
 
-        # Liste des destinataires
-        recipients_list = [f"{r.prenom} {r.nom} <{r.email}>" for r in self.app_data.recipients]
-        self.recipient_var = ctk.StringVar(value=recipients_list[0] if recipients_list else "")
+        # Recherche (nom, prenom, adresse): seule la page affichee est listee
+        self.search_entry = ctk.CTkEntry(
+            top_frame,
+            placeholder_text="Rechercher...",
+            width=160
+        )
+        self.search_entry.pack(side="left", padx=(0, 10))
+        self.search_entry.bind("<KeyRelease>", self._on_search_key)
 
+        self.recipient_var = ctk.StringVar(value="")
         self.recipient_combo = ctk.CTkComboBox(
             top_frame,
-            values=recipients_list,
+            values=[],
             variable=self.recipient_var,
-            width=400,
+            width=320,
+            state="readonly",
             command=self._on_recipient_change
         )
         self.recipient_combo.pack(side="left", padx=(0, 10))
 
+        self.prev_page_btn = ctk.CTkButton(
+            top_frame, text="<", width=30, command=lambda: self._show_page(self._page - 1)
+        )
+        self.prev_page_btn.pack(side="left", padx=(0, 5))
+        self.next_page_btn = ctk.CTkButton(
+            top_frame, text=">", width=30, command=lambda: self._show_page(self._page + 1)
+        )
+        self.next_page_btn.pack(side="left", padx=(0, 10))
+
+        self.page_label = ctk.CTkLabel(
+            top_frame,
+            text="",
+            font=("Segoe UI", 11),
+            text_color=COLORS["gray"]
+        )
+        self.page_label.pack(side="left")
+
         # Zone de preview
         preview_frame = ctk.CTkFrame(self)
         preview_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
@@ -418,17 +1382,58 @@ class PreviewDialog(ctk.CTkToplevel):
         )
         self.images_scroll.pack(fill="both", expand=True, padx=15, pady=(0, 15))
 
-        # Afficher la preview du premier destinataire
-        if self.app_data.recipients:
-            self._update_preview(self.app_data.recipients[0])
+        # Premiere page et preview du premier destinataire
+        self._show_page(0)
+
+    def _on_search_key(self, event=None):
+        """Relance la recherche apres une courte pause de frappe."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DELAY_MS, self._on_search)
+
+    def _on_search(self):
+        self._search_job = None
+        query = self.search_entry.get()
+        if query != self._query:
+            self._query = query
+            self._show_page(0)
+
+    def _show_page(self, page: int):
+        """Affiche une page de resultats et la preview de son premier destinataire."""
+        if page < 0:
+            return
+        rows, total = self._search.search(self._query, page * SEARCH_PAGE_SIZE, SEARCH_PAGE_SIZE)
+        if not rows and page > 0:
+            return
+        self._page = page
+
+        recipients = self.app_data.recipients
+        # Libelle -> rang (le numero de ligne rend chaque libelle unique)
+        self._page_rows = {f"{i + 1}. {RecipientSearch.label(recipients[i])}": i for i in rows}
+        labels = list(self._page_rows)
+        self.recipient_combo.configure(values=labels)
+        self.recipient_var.set(labels[0] if labels else "")
+
+        first = page * SEARCH_PAGE_SIZE
+        if not rows:
+            text = "Aucun resultat"
+        elif total is None:
+            text = f"{first + 1}-{first + len(rows)} sur {first + len(rows)}+"
+        else:
+            text = f"{first + 1}-{first + len(rows)} sur {total}"
+        self.page_label.configure(text=text)
+        self.prev_page_btn.configure(state="normal" if page > 0 else "disabled")
+        has_next = total is None or first + len(rows) < total
+        self.next_page_btn.configure(state="normal" if has_next else "disabled")
+
+        if rows:
+            self._update_preview(recipients[rows[0]])
 
     def _on_recipient_change(self, selection):
         """Change le destinataire selectionne."""
-        # Trouver l'index du destinataire
-        for i, r in enumerate(self.app_data.recipients):
-            if f"{r.prenom} {r.nom} <{r.email}>" == selection:
-                self._update_preview(r)
-                break
+        index = self._page_rows.get(selection)
+        if index is not None:
+            self._update_preview(self.app_data.recipients[index])
 
     def _update_preview(self, recipient: Recipient):
         """Met a jour la preview pour un destinataire."""
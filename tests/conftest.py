@@ -0,0 +1,8 @@
+"""
+Configuration pytest: rend le paquet `src` importable depuis la racine du depot.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,162 @@
+"""
+Tests de BounceService: lecture des DSN (mbox et Maildir), echecs definitifs
+et temporaires, resolution par Message-ID, liste d'opposition.
+"""
+
+import os
+
+import pytest
+
+from src.models import Recipient, SendStatus
+from src.services import BounceService, MessageIndex, SuppressionList
+
+
+def _dsn(recipient, action, status, message_id=None, diagnostic=None, number=0):
+    """DSN (multipart/report) tel que genere par un MTA."""
+    lines = [
+        f"Message-ID: <dsn{number}@mx.example.net>",
+        "Subject: Undelivered Mail Returned to Sender",
+        'Content-Type: multipart/report; report-type=delivery-status; boundary="B"',
+        "",
+        "--B",
+        "Content-Type: text/plain",
+        "",
+        "This is the mail system.",
+        "From the postmaster: ligne commencant par From",
+        "",
+        "--B",
+        "Content-Type: message/delivery-status",
+        "",
+        "Reporting-MTA: dns; mx.example.net",
+        "",
+        f"Final-Recipient: rfc822; {recipient}",
+        f"Action: {action}",
+        f"Status: {status}",
+    ]
+    if diagnostic:
+        lines.append(f"Diagnostic-Code: smtp; {diagnostic}")
+    lines += ["", "--B", "Content-Type: text/rfc822-headers", "", "From: expediteur@example.com"]
+    if message_id:
+        lines.append(f"Message-ID: {message_id}")
+    lines += ["", "--B--", ""]
+    return "\n".join(lines).encode()
+
+
+MESSAGES = [
+    _dsn("user1@example.com", "failed", "5.1.1", "<m1@example.com>",
+         "550 5.1.1 <user1@example.com>:\n    Recipient address rejected"),
+    _dsn("user2@example.com", "delayed", "4.4.7", "<m2@example.com>"),
+    # 5.x.x mais simple retard: temporaire
+    _dsn("user3@example.com", "delayed", "5.4.7"),
+    _dsn("user4@example.com", "delivered", "2.0.0"),
+    b"Subject: message ordinaire\n\nRien a voir\n",
+]
+
+
+def _write_mbox(path, messages):
+    with open(path, "wb") as f:
+        for number, raw in enumerate(messages):
+            f.write(f"From MAILER-DAEMON Mon Jan  6 10:00:{number:02d} 2025\n".encode())
+            # Lignes "From " du corps echappees, comme dans toute mbox
+            f.write(raw.replace(b"\nFrom ", b"\n>From ") + b"\n")
+
+
+def _write_maildir(path, messages):
+    for sub in ("new", "cur", "tmp"):
+        os.makedirs(os.path.join(path, sub))
+    for number, raw in enumerate(messages):
+        sub = "new" if number % 2 else "cur"
+        with open(os.path.join(path, sub, f"{number}.mx:2,S"), "wb") as f:
+            f.write(raw)
+
+
+def _by_email(bounces):
+    return {b.email: b for b in bounces}
+
+
+def test_parse_hard_bounce():
+    bounce = BounceService.parse_dsn(MESSAGES[0])
+    assert bounce.hard
+    assert bounce.email == "user1@example.com"
+    assert bounce.status == "5.1.1"
+    # Message-ID du message renvoye, pas celui du DSN
+    assert bounce.message_id == "<m1@example.com>"
+    # Diagnostic replie sur plusieurs lignes
+    assert bounce.diagnostic == "smtp; 550 5.1.1 <user1@example.com>: Recipient address rejected"
+
+
+def test_parse_soft_and_ignored():
+    soft = BounceService.parse_dsn(MESSAGES[1])
+    assert not soft.hard and soft.status == "4.4.7"
+    assert not BounceService.parse_dsn(MESSAGES[2]).hard
+    assert BounceService.parse_dsn(MESSAGES[3]) is None
+    assert BounceService.parse_dsn(MESSAGES[4]) is None
+
+
+@pytest.mark.parametrize("layout", ["mbox", "maildir"])
+def test_scan(tmp_path, layout):
+    path = str(tmp_path / layout)
+    if layout == "mbox":
+        _write_mbox(path, MESSAGES)
+    else:
+        _write_maildir(path, MESSAGES)
+
+    bounces, error = BounceService.scan(path)
+    assert error is None
+    found = _by_email(bounces)
+    assert sorted(found) == ["user1@example.com", "user2@example.com", "user3@example.com"]
+    assert found["user1@example.com"].hard
+    assert not found["user2@example.com"].hard
+    assert not found["user3@example.com"].hard
+
+
+def test_scan_missing_file(tmp_path):
+    bounces, error = BounceService.scan(str(tmp_path / "absent.mbox"))
+    assert bounces == [] and error
+
+
+def test_apply(tmp_path):
+    # L'adresse du DSN a ete reecrite par un relais: resolution par Message-ID
+    index = MessageIndex(str(tmp_path / "messages.idx"))
+    index.record("<m9@example.com>", "User9@Example.com")
+    index.close()
+    messages = MESSAGES + [
+        _dsn("rewritten@relay.example", "failed", "5.2.2", "<m9@example.com>"),
+        # Retard puis echec definitif pour la meme adresse: le definitif l'emporte
+        _dsn("user2@example.com", "failed", "5.1.1", number=1),
+    ]
+    path = str(tmp_path / "bounces.mbox")
+    _write_mbox(path, messages)
+    bounces, _ = BounceService.scan(path)
+
+    recipients = [Recipient(email=f"user{i}@example.com", nom="", prenom="", numero="") for i in range(10)]
+    suppression = SuppressionList(str(tmp_path / "suppression.idx"))
+    hard, soft, error = BounceService.apply(bounces, recipients, index=index, suppression=suppression)
+
+    assert error is None
+    assert (hard, soft) == (3, 1)
+    statuses = {r.email: r.status for r in recipients}
+    assert statuses["user1@example.com"] == SendStatus.BOUNCED_HARD
+    assert statuses["user2@example.com"] == SendStatus.BOUNCED_HARD
+    assert statuses["user3@example.com"] == SendStatus.BOUNCED_SOFT
+    assert statuses["user9@example.com"] == SendStatus.BOUNCED_HARD
+    assert statuses["user4@example.com"] == SendStatus.PENDING
+    assert recipients[1].error.startswith("5.1.1")
+
+    # Echecs definitifs seulement dans la liste d'opposition
+    assert "user1@example.com" in suppression
+    assert "user9@example.com" in suppression
+    assert "user3@example.com" not in suppression
+    assert "rewritten@relay.example" not in suppression
+
+
+def test_resolve_then_mark(tmp_path):
+    path = str(tmp_path / "bounces.mbox")
+    _write_mbox(path, MESSAGES)
+    bounces, _ = BounceService.scan(path)
+
+    outcome = BounceService.resolve(bounces)
+    recipients = [Recipient(email="USER1@example.com ", nom="", prenom="", numero="")]
+    assert BounceService.mark(outcome, recipients) == 1
+    assert recipients[0].status == SendStatus.BOUNCED_HARD
+    assert BounceService.suppress(outcome) == (1, 2, None)
@@ -0,0 +1,543 @@
+"""
+Tests de DataService: import, export et report des resultats dans les fichiers importes.
+"""
+
+import re
+import sys
+import zipfile
+from xml.sax.saxutils import escape
+
+import openpyxl
+import pytest
+from openpyxl.styles import Font, PatternFill
+
+from src.config import RECIPIENT_COLUMNS, RESULT_COLUMNS
+from src.models import Recipient, SendStatus
+from src.services import DataService
+from src.services.data_service import _XLSX_PARTS
+
+
+def _workbook(path, rows, header=("numero", "email", "societe", "nom", "prenom")):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(list(header))
+    for cell in sheet[1]:
+        cell.font = Font(bold=True)
+    for row in rows:
+        sheet.append(list(row))
+    workbook.create_sheet("Notes").append(["a conserver"])
+    workbook.save(path)
+    return str(path)
+
+
+def _emails(recipients):
+    return [r.email for r in recipients]
+
+
+# --- Lecture .xlsx ------------------------------------------------------
+
+def test_xlsx_reader(tmp_path):
+    path = _workbook(tmp_path / "liste.xlsx", [
+        (1, "a@example.com", "ACME", "Dupont", "Jean"),
+        (None, None, None, None, None),
+        ("002", " b@example.com ", None, "Müller", "Zoé"),
+        (3.0, "c@example.com", "X", "L'Hôte & Fils", None),
+    ])
+    recipients, error = DataService.load_file(path)
+    assert error is None
+    assert [(r.email, r.nom, r.prenom, r.numero) for r in recipients] == [
+        ("a@example.com", "Dupont", "Jean", "1"),
+        ("b@example.com", "Müller", "Zoé", "002"),
+        ("c@example.com", "L'Hôte & Fils", "", "3"),
+    ]
+
+
+def test_xlsx_reader_chunks_and_total(tmp_path):
+    path = _workbook(tmp_path / "liste.xlsx", [(i, f"user{i}@example.com", "", "Nom", "P") for i in range(25)])
+    chunks = DataService.iter_excel_rows(path, chunk_rows=10)
+    header, total = next(chunks)
+    assert header == ["numero", "email", "societe", "nom", "prenom"]
+    assert total == 25
+    sizes = [len(chunk) for chunk in chunks]
+    assert sizes == [10, 10, 5]
+
+
+def test_xlsx_missing_column(tmp_path):
+    path = _workbook(tmp_path / "liste.xlsx", [("a@example.com", "Dupont")], header=("email", "nom"))
+    recipients, error = DataService.load_file(path)
+    assert recipients == []
+    assert "prenom" in error and "numero" in error
+
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _raw_xlsx(path, rows_xml, strings=()):
+    """Classeur ecrit a la main: XML de la feuille et chaines partagees (XML de chaque <si>)."""
+    with zipfile.ZipFile(path, "w") as z:
+        for name, content in _XLSX_PARTS.items():
+            z.writestr(name, content)
+        z.writestr(
+            "xl/worksheets/sheet1.xml",
+            f'<worksheet xmlns="{_MAIN_NS}"><dimension ref="A1:F6"/><sheetData>{rows_xml}</sheetData></worksheet>'
+        )
+        if strings:
+            z.writestr(
+                "xl/sharedStrings.xml",
+                f'<sst xmlns="{_MAIN_NS}" count="{len(strings)}">{"".join(strings)}</sst>'
+            )
+    return str(path)
+
+
+def _inline(text, ref=""):
+    ref = f' r="{ref}"' if ref else ""
+    return f'<c{ref} t="inlineStr"><is><t>{escape(text)}</t></is></c>'
+
+
+def test_xlsx_reader_raw_sheet(tmp_path):
+    strings = [
+        "<si><t>email</t></si>",
+        "<si><t>prenom</t></si>",
+        "<si><t>numero</t></si>",
+        "<si><t>a@example.com</t></si>",
+        # Texte formate avec lecture phonetique (ignoree)
+        "<si><r><t>Je</t></r><r><rPr><b/></rPr><t>an</t></r><rPh sb=\"0\" eb=\"1\"><t>ジャン</t></rPh></si>",
+        "<si><t>Martin</t></si>",
+    ]
+    rows = (
+        # Colonnes B et E absentes de l'en-tete: positions d'apres les lettres
+        '<row r="1"><c r="A1" t="s"><v>0</v></c>' + _inline("nom", "C1")
+        + '<c r="D1" t="s"><v>1</v></c><c r="F1" t="s"><v>2</v></c></row>'
+        '<row r="2" spans="1:6"><c r="A2" t="s"><v>3</v></c><c r="B2"><v>99</v></c>'
+        '<c r="C2" t="inlineStr"><is><r><t>Du</t></r><r><t>pont</t></r></is></c>'
+        '<c r="D2" t="s"><v>4</v></c><c r="F2"><v>12</v></c></row>'
+        # Ligne vide auto-fermante
+        '<row r="3"/>'
+        # Ligne et cellules sans attribut r: positions dans l'ordre
+        "<row>" + _inline("b@example.com") + '<c/><c t="s"><v>5</v></c>' + _inline("Marie")
+        + "<c/><c><v>1.5E1</v></c></row>"
+        '<row r="6"><c r="A6" t="str"><v>c@example.com</v></c><c r="F6"><v>3.0</v></c></row>'
+    )
+    path = _raw_xlsx(tmp_path / "brut.xlsx", rows, strings)
+
+    chunks = DataService.iter_excel_rows(path)
+    header, total = next(chunks)
+    assert header == ["email", "", "nom", "prenom", "", "numero"]
+    assert total == 5
+    assert [row for chunk in chunks for row in chunk] == [
+        ("a@example.com", "Dupont", "Jean", "12"),
+        ("b@example.com", "Martin", "Marie", "15"),
+        ("c@example.com", "", "", "3"),
+    ]
+
+
+def test_xlsx_reader_inline_strings_only(tmp_path):
+    # Sans sharedStrings.xml
+    rows = (
+        "<row>" + "".join(_inline(name) for name in ("email", "nom", "prenom", "numero")) + "</row>"
+        + "<row>" + "".join(_inline(value) for value in ("x@example.com", "A & B", "<Zoé>", "007")) + "</row>"
+    )
+    path = _raw_xlsx(tmp_path / "inline.xlsx", rows)
+    recipients, error = DataService.load_file(path)
+    assert error is None
+    assert [(r.email, r.nom, r.prenom, r.numero) for r in recipients] == [("x@example.com", "A & B", "<Zoé>", "007")]
+
+
+# --- Lecture CSV --------------------------------------------------------
+
+def test_csv_skips_blank_rows(tmp_path):
+    path = tmp_path / "liste.csv"
+    path.write_text(
+        "email,nom,prenom,numero\na@example.com,A,B,1\n,,,\n\n , , ,\nc@example.com,C,D,2\n",
+        encoding="utf-8"
+    )
+    recipients, error = DataService.load_file(str(path))
+    assert error is None
+    assert _emails(recipients) == ["a@example.com", "c@example.com"]
+
+
+# --- Dedoublonnage ------------------------------------------------------
+
+def _dedup_rows():
+    return [
+        Recipient(email="a@example.com", nom="", prenom="", numero="1"),
+        Recipient(email="b@example.com", nom="B", prenom="Bob", numero="2"),
+        Recipient(email=" A@Example.COM ", nom="Martin", prenom="Anne", numero="3"),
+        Recipient(email="c@example.com", nom="C", prenom="", numero="4"),
+        Recipient(email="a@example.com", nom="nan", prenom="", numero="5", images=[(b"img", "a.png")]),
+    ]
+
+
+@pytest.mark.parametrize("keep, numbers", [
+    ("first", ["1", "2", "4"]),
+    ("last", ["2", "4", "5"]),
+    # Plus de champs remplis l'emporte sur les images ("nan" compte comme vide)
+    ("complete", ["2", "3", "4"]),
+])
+def test_deduplicate(keep, numbers):
+    rows = _dedup_rows()
+    unique, duplicates = DataService.deduplicate(rows, keep=keep)
+    # Ordre d'origine conserve
+    assert [r.numero for r in unique] == numbers
+    assert sorted(r.numero for r in unique + duplicates) == ["1", "2", "3", "4", "5"]
+    assert len(duplicates) == 2
+
+
+def test_deduplicate_complete_counts_images():
+    rows = [
+        Recipient(email="a@example.com", nom="A", prenom="", numero="1"),
+        Recipient(email="a@example.com", nom="A", prenom="", numero="2", images=[(b"img", "a.png")]),
+    ]
+    unique, _ = DataService.deduplicate(rows, keep="complete")
+    assert [r.numero for r in unique] == ["2"]
+
+
+def test_deduplicate_invalid_keep():
+    with pytest.raises(ValueError):
+        DataService.deduplicate(_dedup_rows(), keep="random")
+
+
+def test_load_files_merges_in_order(tmp_path):
+    first = tmp_path / "un.csv"
+    first.write_text("email,nom,prenom,numero\na@example.com,A,,1\nb@example.com,B,,2\n", encoding="utf-8")
+    second = tmp_path / "deux.csv"
+    second.write_text("email,nom,prenom,numero\nB@example.com,B2,,3\nc@example.com,C,,4\n", encoding="utf-8")
+
+    recipients, error = DataService.load_files([str(first), str(second)])
+    assert error is None
+    assert [r.numero for r in recipients] == ["1", "2", "3", "4"]
+    unique, duplicates = DataService.deduplicate(recipients)
+    assert _emails(unique) == ["a@example.com", "b@example.com", "c@example.com"]
+    assert [r.numero for r in duplicates] == ["3"]
+
+    # Erreur attribuee au fichier fautif
+    bad = tmp_path / "mauvais.csv"
+    bad.write_text("adresse,nom\nx@example.com,X\n", encoding="utf-8")
+    recipients, error = DataService.load_files([str(first), str(bad)])
+    assert recipients == [] and error.startswith("mauvais.csv")
+
+
+def test_find_email():
+    rows = _dedup_rows()
+    assert DataService.find_email(rows, "B@EXAMPLE.com") == 1
+    assert DataService.find_email(rows, "a@example.com") == 0
+    # Ligne en cours de modification ignoree
+    assert DataService.find_email(rows, "a@example.com", exclude=0) == 2
+    assert DataService.find_email(rows, "z@example.com") is None
+
+
+# --- Operations de groupe ----------------------------------------------
+
+def _group_rows(count=10):
+    return [
+        Recipient(email=f"user{i}@example.com", nom=f"Nom{i}", prenom="", numero=str(i),
+                  images=[(b"img", f"{i}.png")] * (i % 3))
+        for i in range(count)
+    ]
+
+
+def test_remove_recipients_by_identity():
+    rows = _group_rows()
+    # Meme adresse mais autre objet: conserve (comparaison par identite)
+    twin = Recipient(email="user1@example.com", nom="", prenom="", numero="")
+    kept, count = DataService.remove_recipients(rows, [rows[7], rows[1], rows[1], twin])
+    assert count == 2
+    assert [r.numero for r in kept] == ["0", "2", "3", "4", "5", "6", "8", "9"]
+    assert len(rows) == 10
+
+    kept, count = DataService.remove_recipients(rows, iter(rows))
+    assert (kept, count) == ([], 10)
+    assert DataService.remove_recipients(rows, []) == (rows, 0)
+
+
+def test_set_field():
+    rows = _group_rows()
+    assert DataService.set_field(rows[2:5], "prenom", "Anne") == 3
+    assert [r.prenom for r in rows] == ["", "", "Anne", "Anne", "Anne", "", "", "", "", ""]
+    assert DataService.set_field((r for r in rows if r.prenom), "numero", "0") == 3
+    assert rows[3].numero == "0" and rows[5].numero == "5"
+
+
+@pytest.mark.parametrize("field", ["email", "societe"])
+def test_set_field_refused(field):
+    rows = _group_rows()
+    with pytest.raises(ValueError):
+        DataService.set_field(rows, field, "x")
+    assert rows[0].email == "user0@example.com"
+
+
+def test_clear_images():
+    rows = _group_rows()
+    # 0 + 1 + 2 + 0 images
+    assert DataService.clear_images(rows[:4]) == 3
+    assert all(r.images == [] for r in rows[:4])
+    assert len(rows[4].images) == 1
+    assert DataService.clear_images(rows[:4]) == 0
+
+
+# --- Export et formats Parquet/Arrow ----------------------------------
+
+def test_xlsx_export_round_trip(tmp_path):
+    recipients = [Recipient(f"user{i}@example.com", "Nom <&>", "Prénom", f"{i:03d}") for i in range(5)]
+    recipients[0].status = SendStatus.SUCCESS
+    path = str(tmp_path / "export.xlsx")
+    assert DataService.export_recipients(recipients, path) is None
+
+    loaded, error = DataService.load_file(path)
+    assert error is None
+    assert [(r.email, r.nom, r.prenom, r.numero) for r in loaded] == [
+        (r.email, r.nom, r.prenom, r.numero) for r in recipients
+    ]
+    sheet = openpyxl.load_workbook(path).active
+    assert [c.value for c in sheet[1]] == RECIPIENT_COLUMNS + RESULT_COLUMNS
+    assert sheet["E2"].value == "success"
+
+
+def test_missing_pyarrow_reported_for_parquet_only(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    path = tmp_path / "liste.parquet"
+    path.write_bytes(b"PAR1")
+    recipients, error = DataService.load_file(str(path))
+    assert recipients == []
+    assert "pyarrow" in error
+
+    csv = tmp_path / "liste.csv"
+    csv.write_text("email,nom,prenom,numero\na@example.com,A,B,1\n", encoding="utf-8")
+    assert DataService.load_file(str(csv))[1] is None
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".arrow"])
+def test_arrow_export_import_round_trip(tmp_path, extension):
+    pytest.importorskip("pyarrow")
+    recipients = [Recipient(f"user{i}@example.com", "Nom", "Prénom", f"{i:03d}") for i in range(5)]
+    recipients[1].status = SendStatus.SUCCESS
+    recipients[1].sent_at = 1_700_000_000.0
+    path = str(tmp_path / f"export{extension}")
+    assert DataService.export_recipients(recipients, path) is None
+
+    loaded, error = DataService.load_file(path)
+    assert error is None
+    assert [(r.email, r.nom, r.prenom, r.numero) for r in loaded] == [
+        (r.email, r.nom, r.prenom, r.numero) for r in recipients
+    ]
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".arrow"])
+def test_arrow_import_converts_types(tmp_path, extension):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    table = pa.table({
+        "societe": ["ACME", "X", None],
+        "email": [" a@example.com ", "b@example.com", None],
+        "nom": ["Dupont", None, None],
+        "prenom": ["Jean", "Marie", None],
+        "numero": [1.0, 2.5, None],
+    })
+    path = str(tmp_path / f"liste{extension}")
+    if extension == ".parquet":
+        pq.write_table(table, path)
+    else:
+        feather.write_feather(table, path)
+
+    recipients, error = DataService.load_file(path)
+    assert error is None
+    assert [(r.email, r.nom, r.prenom, r.numero) for r in recipients] == [
+        ("a@example.com", "Dupont", "Jean", "1"),
+        ("b@example.com", "", "Marie", "2.5"),
+    ]
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".arrow"])
+def test_arrow_write_back(tmp_path, extension):
+    pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    recipients = [Recipient(f"user{i}@example.com", "Nom", "P", str(i)) for i in range(3)]
+    path = str(tmp_path / f"liste{extension}")
+    DataService.export_recipients(recipients, path)
+
+    recipients[0].status = SendStatus.SUCCESS
+    recipients[0].sent_at = 1_700_000_000.0
+    recipients[0].message_id = "<1@example.com>"
+    recipients[2].status = SendStatus.FAILED
+    recipients[2].error = "550 5.1.1 User unknown"
+    updated, error = DataService.write_back(path, recipients[:1] + recipients[2:], in_place=True)
+    assert (updated, error) == (2, None)
+
+    table = pq.read_table(path) if extension == ".parquet" else feather.read_table(path)
+    # Colonnes existantes remplacees, pas dupliquees
+    assert table.column_names == RECIPIENT_COLUMNS + RESULT_COLUMNS
+    rows = table.to_pylist()
+    assert rows[0]["status"] == "success" and rows[0]["message_id"] == "<1@example.com>"
+    assert rows[0]["sent_at"] is not None
+    assert rows[1]["status"] is None
+    assert rows[2]["error"] == "550 5.1.1 User unknown"
+
+
+# --- Report des resultats -----------------------------------------------
+
+def _results(emails):
+    recipients = [Recipient(email, "", "", "") for email in emails]
+    recipients[0].status = SendStatus.SUCCESS
+    recipients[0].message_id = "<1@example.com>"
+    recipients[0].sent_at = 1_700_000_000.0
+    recipients[1].status = SendStatus.FAILED
+    recipients[1].error = "550 5.1.1 User unknown"
+    return recipients
+
+
+def test_xlsx_write_back(tmp_path):
+    path = _workbook(tmp_path / "liste.xlsx", [
+        (1, "a@example.com", "ACME", "Dupont", "Jean"),
+        (2, "B@Example.com", "", "Martin", "Marie"),
+        (3, "inconnu@example.com", "", "Durand", "Paul"),
+    ])
+    updated, error = DataService.write_back(path, _results(["a@example.com", "b@example.com"]))
+    assert error is None
+    assert updated == 2
+
+    workbook = openpyxl.load_workbook(DataService.results_path(path))
+    sheet = workbook.active
+    rows = [[c.value for c in row] for row in sheet.iter_rows()]
+    assert rows[0] == ["numero", "email", "societe", "nom", "prenom"] + RESULT_COLUMNS
+    assert rows[1][:5] == [1, "a@example.com", "ACME", "Dupont", "Jean"]
+    assert rows[1][5] == "success" and rows[1][8] == "<1@example.com>"
+    assert rows[1][7].startswith("2023-11-")
+    assert rows[2][5:7] == ["failed", "550 5.1.1 User unknown"]
+    # Ligne sans destinataire correspondant: inchangee
+    assert rows[3][5:] == [None] * len(RESULT_COLUMNS)
+    # Mise en forme et autres feuilles conservees
+    assert sheet["A1"].font.bold
+    assert workbook["Notes"]["A1"].value == "a conserver"
+    # Original intact
+    assert openpyxl.load_workbook(path).active.max_column == 5
+
+
+def test_xlsx_write_back_replaces_existing_columns(tmp_path):
+    path = _workbook(tmp_path / "liste.xlsx", [
+        (1, "a@example.com", "", "Dupont", "Jean"),
+        (2, "b@example.com", "", "Martin", "Marie"),
+    ])
+    recipients = _results(["a@example.com", "b@example.com"])
+    DataService.write_back(path, recipients, in_place=True)
+
+    # Nouvel envoi: les colonnes existantes sont remplacees, pas ajoutees
+    recipients[1].status = SendStatus.SUCCESS
+    recipients[1].error = None
+    updated, error = DataService.write_back(path, recipients, in_place=True)
+    assert (updated, error) == (2, None)
+    rows = [[c.value for c in row] for row in openpyxl.load_workbook(path).active.iter_rows()]
+    assert rows[0] == ["numero", "email", "societe", "nom", "prenom"] + RESULT_COLUMNS
+    assert rows[2][5:7] == ["success", None]
+
+
+def test_csv_write_back(tmp_path):
+    path = tmp_path / "liste.csv"
+    path.write_text(
+        "email,nom,prenom,numero,status\na@example.com,A,B,1,old\nb@example.com,C,D,2,old\nx@example.com,E,F,3,\n",
+        encoding="utf-8"
+    )
+    updated, error = DataService.write_back(str(path), _results(["a@example.com", "b@example.com"]))
+    assert (updated, error) == (2, None)
+    lines = open(DataService.results_path(str(path)), encoding="utf-8").read().splitlines()
+    assert lines[0] == ",".join(RECIPIENT_COLUMNS + RESULT_COLUMNS)
+    assert lines[1].startswith("a@example.com,A,B,1,success,,2023-11-")
+    assert lines[2] == "b@example.com,C,D,2,failed,550 5.1.1 User unknown,,"
+
+
+def test_write_back_unsupported_format(tmp_path):
+    path = tmp_path / "liste.txt"
+    path.write_text("email\n", encoding="utf-8")
+    updated, error = DataService.write_back(str(path), _results(["a@example.com", "b@example.com"]))
+    assert updated == 0
+    assert error.startswith("Format non supporte")
+
+
+def _styled_workbook(path):
+    """Classeur avec styles, formules, formats de nombre et chaines partagees."""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Contacts"
+    sheet.append(["email", "nom", "prenom", "numero", "montant", "total"])
+    for cell in sheet[1]:
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill("solid", fgColor="FFFF00")
+    for i in range(1, 5):
+        sheet.append([f"user{i}@example.com", "Dupont", "Jean", i, i * 1.5, f"=E{i + 1}*2"])
+        sheet.cell(row=i + 1, column=5).number_format = "0.00"
+    sheet["H1"] = "note"
+    sheet["H3"] = "Dupont"
+    sheet.column_dimensions["A"].width = 30
+    workbook.create_sheet("Notes").append(["Dupont", "=Contacts!E2"])
+    workbook.save(path)
+    return str(path)
+
+
+def _prefix_sheet(path, prefix="x"):
+    """Reecrit la premiere feuille avec un prefixe d'espace de noms (x:row, x:c...)."""
+    with zipfile.ZipFile(path) as z:
+        items = {info.filename: z.read(info) for info in z.infolist()}
+    name = "xl/worksheets/sheet1.xml"
+    xml = items[name].decode("utf-8")
+    xml = re.sub(r"<(/?)(\w+)(?=[\s>/])", rf"<\1{prefix}:\2", xml)
+    xml = xml.replace(' xmlns="', f' xmlns:{prefix}="', 1)
+    items[name] = xml.encode("utf-8")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for filename, data in items.items():
+            z.writestr(filename, data)
+
+
+@pytest.mark.parametrize("prefixed", [False, True], ids=["defaut", "prefixe"])
+def test_xlsx_write_back_preserves_workbook(tmp_path, prefixed):
+    path = _styled_workbook(tmp_path / "liste.xlsx")
+    if prefixed:
+        _prefix_sheet(path)
+    recipients = _results(["user1@example.com", "user3@example.com"])
+    updated, error = DataService.write_back(path, recipients)
+    assert (updated, error) == (2, None)
+
+    workbook = openpyxl.load_workbook(DataService.results_path(path))
+    sheet = workbook["Contacts"]
+    assert [c.value for c in sheet[1]] == [
+        "email", "nom", "prenom", "numero", "montant", "total", None, "note"
+    ] + RESULT_COLUMNS
+    # Formules, chaines partagees, styles et formats conserves
+    assert [sheet.cell(row=r, column=6).value for r in range(2, 6)] == ["=E2*2", "=E3*2", "=E4*2", "=E5*2"]
+    assert sheet["B5"].value == "Dupont" and sheet["H3"].value == "Dupont"
+    assert sheet["A1"].font.bold and sheet["A1"].fill.fgColor.rgb == "00FFFF00"
+    assert sheet["E2"].number_format == "0.00" and sheet["E2"].value == 1.5
+    assert sheet.column_dimensions["A"].width == 30
+    assert workbook["Notes"]["B1"].value == "=Contacts!E2"
+    # Resultats apres la derniere colonne existante
+    assert [c.value for c in sheet[2]][8:10] == ["success", None]
+    assert [c.value for c in sheet[4]][8:10] == ["failed", "550 5.1.1 User unknown"]
+    assert all(c.value is None for c in sheet[3][8:])
+    assert sheet.max_column == 8 + len(RESULT_COLUMNS)
+
+
+def test_xlsx_write_back_cells_without_references(tmp_path):
+    # Cellules sans attribut r (ecrites par certains outils): position par ordre
+    path = _styled_workbook(tmp_path / "liste.xlsx")
+    with zipfile.ZipFile(path) as z:
+        items = {info.filename: z.read(info) for info in z.infolist()}
+    name = "xl/worksheets/sheet1.xml"
+    xml = items[name].decode("utf-8")
+    # Ligne 3 sans reference de cellule ni de ligne (cellule H3 retiree: colonnes contigues)
+    row = re.search(r'<row r="3".*?</row>', xml).group(0)
+    bare = re.sub(r'<c r="H3".*?</c>', "", row)
+    bare = re.sub(r' r="[A-Z]*3"', "", bare)
+    items[name] = xml.replace(row, bare).encode("utf-8")
+    with zipfile.ZipFile(path, "w") as z:
+        for filename, data in items.items():
+            z.writestr(filename, data)
+
+    updated, error = DataService.write_back(path, _results(["user1@example.com", "user2@example.com"]))
+    assert (updated, error) == (2, None)
+    sheet = openpyxl.load_workbook(DataService.results_path(path))["Contacts"]
+    assert [c.value for c in sheet[3]][:6] == ["user2@example.com", "Dupont", "Jean", 2, 3, "=E3*2"]
+    assert [c.value for c in sheet[3]][8:10] == ["failed", "550 5.1.1 User unknown"]
+    assert [c.value for c in sheet[2]][8] == "success"
+
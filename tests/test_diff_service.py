@@ -0,0 +1,74 @@
+"""
+Tests de DiffService: comparaison par adresse et application a la liste actuelle.
+"""
+
+from src.models import Recipient, SendStatus
+from src.services import DiffService
+
+
+def _recipients(rows):
+    return [Recipient(email, nom, "Jean", numero) for email, nom, numero in rows]
+
+
+def test_diff_and_apply():
+    current = _recipients([
+        ("a@example.com", "Dupont", "1"),
+        ("b@example.com", "Martin", "2"),
+        ("c@example.com", "Durand", "3"),
+    ])
+    current[1].images = [(b"img", "b.png")]
+    current[1].status = SendStatus.SUCCESS
+    current[1].message_id = "<b@example.com>"
+    incoming = _recipients([
+        ("B@Example.com", "Martin-Nouveau", "2"),
+        ("a@example.com", "Dupont", "1"),
+        ("d@example.com", "Neuf", "4"),
+    ])
+
+    diff = DiffService.diff(current, incoming)
+    assert [r.email for r in diff.added] == ["d@example.com"]
+    assert diff.updated == [(current[1], incoming[0])]
+    assert diff.removed == [current[2]]
+    assert diff.unchanged == 1
+    assert diff.changed
+    assert diff.summary() == "1 ajoutes, 1 modifies, 1 retires, 1 inchanges"
+    assert "nom: Martin -> Martin-Nouveau" in diff.details()
+    # Aucune liste modifiee par diff()
+    assert current[1].nom == "Martin" and len(current) == 3
+
+    updated = current[1]
+    result = DiffService.apply(current, diff)
+    assert [r.email for r in result] == ["a@example.com", "B@Example.com", "d@example.com"]
+    # Destinataire modifie sur place: images, statut et Message-ID conserves
+    assert result[1] is updated
+    assert updated.nom == "Martin-Nouveau"
+    assert updated.images == [(b"img", "b.png")]
+    assert updated.status == SendStatus.SUCCESS
+    assert updated.message_id == "<b@example.com>"
+
+
+def test_diff_unchanged():
+    current = _recipients([("a@example.com", "Dupont", "1"), ("b@example.com", "Martin", "2")])
+    incoming = _recipients([("b@example.com", "Martin", "2"), ("a@example.com", "Dupont", "1")])
+    diff = DiffService.diff(current, incoming)
+    assert not diff.changed
+    assert diff.unchanged == 2
+    assert diff.details() == ""
+    assert DiffService.apply(current, diff) == current
+
+
+def test_diff_duplicates_in_current_list():
+    # Premiere occurrence mise a jour, toutes les occurrences gardees
+    current = _recipients([("a@example.com", "Un", "1"), ("A@example.com", "Deux", "2")])
+    incoming = _recipients([("a@example.com", "Trois", "1")])
+    diff = DiffService.diff(current, incoming)
+    assert diff.updated == [(current[0], incoming[0])]
+    assert diff.removed == []
+
+
+def test_details_limit():
+    current = []
+    incoming = _recipients([(f"user{i}@example.com", "Nom", str(i)) for i in range(30)])
+    details = DiffService.diff(current, incoming).details(limit=5)
+    assert details.startswith("Ajoutes (30) :\nuser0@example.com")
+    assert details.endswith("... et 25 autres")
@@ -0,0 +1,103 @@
+"""
+Tests de CampaignEstimator: tailles calculees contre les messages rendus.
+"""
+
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+import src.services.estimate_service as estimate_service
+from src.models import Recipient
+from src.services import CampaignEstimator, EmailService
+from src.services.estimate_service import base64_size, provider_limits
+
+
+SENDER = "expediteur@example.com"
+SUBJECT = "Bonjour {{prenom}}, votre dossier {{numero}}"
+BODY = "Cher {{prenom}} {{nom}},\n\nVoici votre numero: {{numero}}.\n\nCordialement"
+
+
+def _image(fmt, size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def _rendered_size(recipient, default_image=None, subject=SUBJECT):
+    _, data = EmailService.render_message(
+        SENDER, recipient, subject, BODY,
+        default_image=default_image,
+        personal_images=recipient.images or None
+    )
+    return len(data)
+
+
+@pytest.mark.parametrize("length", [0, 1, 2, 3, 56, 57, 58, 1000, 4097])
+def test_base64_size(length):
+    encoded = base64.encodebytes(b"x" * length).replace(b"\n", b"\r\n")
+    assert base64_size(length) == len(encoded)
+
+
+def test_message_size_matches_rendered_message():
+    default_image = _image("PNG")
+    recipients = [
+        Recipient(email="a@example.com", nom="Martin", prenom="Luc", numero="1"),
+        Recipient(email="tres.long.identifiant@sous-domaine.example.org", nom="Lefevre-Dupont",
+                  prenom="Jean-Edouard", numero="12345678901234567890"),
+        Recipient(email="b@example.com", nom="Garcon", prenom="Helene", numero="7",
+                  images=[(_image("JPEG"), "photo.jpg")]),
+        Recipient(email="c@example.com", nom="Noel", prenom="Zoe", numero="8",
+                  images=[(_image("PNG", (300, 200)), "plan du site.png"), (_image("JPEG"), "b.jpg")]),
+    ]
+    estimator = CampaignEstimator(SENDER, SUBJECT, BODY, default_image=default_image)
+    for recipient in recipients:
+        # Exact a quelques octets pres (Message-ID aleatoire)
+        assert abs(estimator.message_size(recipient) - _rendered_size(recipient, default_image)) <= 4
+
+
+def test_long_subject_is_folded():
+    subject = "Objet tres long pour {{prenom}} " + "mot " * 40
+    recipient = Recipient(email="a@example.com", nom="Nom", prenom="Prenom", numero="1")
+    estimator = CampaignEstimator(SENDER, subject, BODY)
+    assert abs(estimator.message_size(recipient) - _rendered_size(recipient, subject=subject)) <= 4
+
+
+def test_estimate_totals_and_quota():
+    recipients = [
+        Recipient(email=f"user{i}@example.com", nom="Nom", prenom="Prenom" * (i % 3 + 1), numero=str(i))
+        for i in range(1200)
+    ]
+    estimator = CampaignEstimator(SENDER, SUBJECT, BODY)
+    estimate = estimator.estimate(recipients, server="smtp.gmail.com", sessions=2, delay=1.0)
+
+    sizes = [estimator.message_size(r) for r in recipients]
+    assert estimate.messages == 1200
+    assert estimate.total_bytes == sum(sizes)
+    assert estimate.min_bytes == min(sizes)
+    assert estimate.max_bytes == max(sizes)
+    assert estimate.average_bytes == sum(sizes) // 1200
+    assert estimate.daily_quota == 500
+    assert estimate.days_needed == 3
+    assert estimate.duration_seconds > 1200 * 0.5
+    assert not estimate.oversized
+
+
+def test_oversized_messages(monkeypatch):
+    limits = dict(provider_limits(""), max_message_size=2000)
+    monkeypatch.setattr(estimate_service, "provider_limits", lambda server: limits)
+    recipients = [
+        Recipient(email="petit@example.com", nom="", prenom="", numero=""),
+        Recipient(email="gros@example.com", nom="", prenom="", numero="",
+                  images=[(_image("PNG", (400, 400)) + b"\0" * 4000, "gros.png")]),
+    ]
+    estimate = CampaignEstimator(SENDER, SUBJECT, BODY).estimate(recipients)
+    assert estimate.daily_quota is None
+    assert estimate.days_needed == 1
+    assert [(idx, email) for idx, email, _ in estimate.oversized] == [(1, "gros@example.com")]
+
+
+def test_provider_limits():
+    assert provider_limits("smtp-mail.outlook.com")["daily_quota"] == 300
+    assert provider_limits("mail.example.com")["daily_quota"] is None
@@ -0,0 +1,122 @@
+"""
+Tests de FailureService (analyse des erreurs SMTP) et de FailureIndex.
+"""
+
+import smtplib
+
+import pytest
+
+from src.models import Recipient, SendStatus
+from src.services import FailureIndex, FailureService
+
+
+def _refused(code, text):
+    return str(smtplib.SMTPRecipientsRefused({"x@example.com": (code, text)}))
+
+
+@pytest.mark.parametrize("error, code, status, category", [
+    (_refused(550, b"5.1.1 <x@example.com>: User unknown"), 550, "5.1.1", "mailbox"),
+    (_refused(550, b"5.1.2 Bad destination system address"), 550, "5.1.2", "domain"),
+    (_refused(553, b"5.1.10 Null MX"), 553, "5.1.10", "domain"),
+    (str(smtplib.SMTPDataError(552, b"5.2.2 Mailbox full")), 552, "5.2.2", "full"),
+    (str(smtplib.SMTPDataError(421, b"4.7.0 Too many messages, slow down")), 421, "4.7.0", "rate"),
+    (str(smtplib.SMTPDataError(550, b"5.7.1 Message rejected as spam")), 550, "5.7.1", "policy"),
+    (str(smtplib.SMTPAuthenticationError(535, b"5.7.8 Username and Password not accepted")), 535, "5.7.8", "auth"),
+    (str(smtplib.SMTPDataError(552, b"5.3.4 Message size exceeds fixed limit")), 552, "5.3.4", "message"),
+    (str(smtplib.SMTPDataError(451, b"4.4.1 Connection timed out")), 451, "4.4.1", "network"),
+    (str(smtplib.SMTPDataError(450, b"4.2.1 Mailbox busy")), 450, "4.2.1", "temporary"),
+    (str(smtplib.SMTPDataError(452, b"4.5.3 Too many recipients")), 452, "4.5.3", "rate"),
+    # Sans code etendu: code SMTP et texte de la reponse
+    (_refused(550, b"No such user here"), 550, None, "mailbox"),
+    (_refused(554, b"Transaction failed"), 554, None, "policy"),
+    (_refused(450, b"Try again later"), 450, None, "rate"),
+    (_refused(451, b"Local error in processing"), 451, None, "temporary"),
+    (_refused(552, b"Quota exceeded"), 552, None, "full"),
+    (_refused(500, b"Syntax error"), 500, None, "other"),
+    # Erreurs reseau (pas de reponse du serveur)
+    ("timed out", None, None, "network"),
+    ("[Errno 111] Connection refused", None, None, "network"),
+    ("Erreur inattendue", None, None, "other"),
+])
+def test_classify(error, code, status, category):
+    assert FailureService.classify(error)[:3] == (code, status, category)
+
+
+def test_reply_text_extracted():
+    _, _, _, message = FailureService.classify(_refused(550, b"5.1.1 User unknown"))
+    assert message == "5.1.1 User unknown"
+    # Reponse contenant une apostrophe: repr entre guillemets doubles
+    _, _, category, message = FailureService.classify(_refused(550, b"5.1.1 The user's mailbox does not exist"))
+    assert message == "5.1.1 The user's mailbox does not exist"
+    assert category == "mailbox"
+    assert FailureService.classify("timed out")[3] == "timed out"
+
+
+def test_parse():
+    failure = FailureService.parse(7, "Jean.Dupont@Gmail.COM", _refused(550, b"5.1.1 User unknown"))
+    assert (failure.index, failure.domain, failure.code, failure.status) == (7, "gmail.com", 550, "5.1.1")
+    assert failure.label == "Adresse inconnue"
+    assert str(failure) == "Jean.Dupont@Gmail.COM: [5.1.1] 5.1.1 User unknown"
+    assert str(FailureService.parse(0, "a@example.com", "timed out")) == "a@example.com: timed out"
+
+
+# --- Index -----------------------------------------------------------------
+
+UNKNOWN = _refused(550, b"5.1.1 User unknown")
+FULL = str(smtplib.SMTPDataError(552, b"5.2.2 Mailbox full"))
+TIMEOUT = "timed out"
+
+
+def _index():
+    index = FailureIndex()
+    index.add(0, "a@gmail.com", UNKNOWN)
+    index.add(3, "b@gmail.com", FULL)
+    index.add(5, "c@yahoo.fr", UNKNOWN)
+    index.add(8, "d@gmail.com", UNKNOWN)
+    index.add(9, "e@orange.fr", TIMEOUT)
+    return index
+
+
+def test_index_counts():
+    index = _index()
+    assert len(index) == 5
+    # Ordre de FAILURE_CATEGORIES
+    assert index.by_category() == [("mailbox", 3), ("full", 1), ("network", 1)]
+    assert index.by_domain() == [("gmail.com", 3), ("orange.fr", 1), ("yahoo.fr", 1)]
+    assert index.by_domain(limit=1) == [("gmail.com", 3)]
+    assert index.by_domain(category="mailbox") == [("gmail.com", 2), ("yahoo.fr", 1)]
+
+
+def test_index_select():
+    index = _index()
+    assert [f.index for f in index.select()] == [0, 3, 5, 8, 9]
+    assert [f.index for f in index.select("mailbox")] == [0, 5, 8]
+    assert [f.index for f in index.select(domain="gmail.com")] == [0, 3, 8]
+    assert [f.index for f in index.select("mailbox", "gmail.com")] == [0, 8]
+    assert index.select("auth") == []
+
+
+def test_index_add_replaces_and_remove():
+    index = _index()
+    # Nouvel echec du meme destinataire: remplace le precedent
+    index.add(0, "a@gmail.com", TIMEOUT)
+    assert len(index) == 5
+    assert index.by_category() == [("mailbox", 2), ("full", 1), ("network", 2)]
+
+    assert index.remove(3).category == "full"
+    assert index.remove(3) is None
+    assert 3 not in index
+    # Categories et domaines vides retires
+    assert ("full", 1) not in index.by_category()
+    assert index.select("full") == []
+
+
+def test_index_from_recipients():
+    recipients = [
+        Recipient(email=f"user{i}@example.com", nom="", prenom="", numero="",
+                  status=SendStatus.FAILED if i % 2 else SendStatus.SUCCESS,
+                  error=UNKNOWN if i % 2 else None)
+        for i in range(10)
+    ]
+    assert [f.index for f in FailureIndex.from_recipients(recipients).select()] == [1, 3, 5, 7, 9]
+    assert [f.index for f in FailureIndex.from_recipients(recipients, stop=5).select()] == [1, 3]
@@ -0,0 +1,132 @@
+"""
+Tests de l'optimisation des images: suppression des metadonnees sans
+reencodage (JPEG, PNG, WebP), redimensionnement, cache.
+"""
+
+import io
+
+import pytest
+from PIL import Image, ImageCms, ImageChops, features
+from PIL.PngImagePlugin import PngInfo
+
+from src.services import ImageOptimizer
+from src.services.image_service import _strip_jpeg, _strip_png, _strip_webp, _strip_metadata
+
+
+ICC = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+
+
+def _exif(orientation=1):
+    exif = Image.Exif()
+    exif[0x010F] = "Fabricant"
+    exif[0x0112] = orientation
+    return exif.tobytes()
+
+
+def _picture(size=(120, 80)):
+    img = Image.new("RGB", size)
+    # Degrade: un contenu non uniforme, comme une photo
+    img.putdata([(x * 2 % 256, y * 3 % 256, (x + y) % 256) for y in range(size[1]) for x in range(size[0])])
+    return img
+
+
+def _save(img, fmt, **kwargs):
+    buffer = io.BytesIO()
+    img.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def _same_pixels(a: bytes, b: bytes) -> bool:
+    first, second = Image.open(io.BytesIO(a)), Image.open(io.BytesIO(b))
+    return first.size == second.size and ImageChops.difference(
+        first.convert("RGB"), second.convert("RGB")
+    ).getbbox() is None
+
+
+def test_strip_jpeg():
+    data = _save(_picture(), "JPEG", exif=_exif(), icc_profile=ICC, comment=b"commentaire")
+    assert {"exif", "icc_profile", "comment"} <= set(Image.open(io.BytesIO(data)).info)
+
+    stripped = _strip_jpeg(data)
+    info = Image.open(io.BytesIO(stripped)).info
+    assert not {"exif", "icc_profile", "comment"} & set(info)
+    assert len(stripped) < len(data)
+    assert _same_pixels(stripped, data)
+
+
+def test_strip_png():
+    meta = PngInfo()
+    meta.add_text("Auteur", "Quelqu'un")
+    meta.add_text("Commentaire", "texte compresse " * 20, zip=True)
+    meta.add_itxt("Titre", "Ete a la plage", lang="fr")
+    data = _save(_picture(), "PNG", pnginfo=meta, icc_profile=ICC, exif=_exif())
+    for chunk in (b"tEXt", b"zTXt", b"iTXt", b"iCCP", b"eXIf"):
+        assert chunk in data
+
+    stripped = _strip_png(data)
+    for chunk in (b"tEXt", b"zTXt", b"iTXt", b"iCCP", b"eXIf"):
+        assert chunk not in stripped
+    img = Image.open(io.BytesIO(stripped))
+    assert not {"Auteur", "Commentaire", "Titre", "icc_profile", "exif"} & set(img.info)
+    assert _same_pixels(stripped, data)
+
+
+@pytest.mark.skipif(not features.check("webp"), reason="Pillow sans WebP")
+def test_strip_webp():
+    data = _save(_picture(), "WEBP", quality=80, exif=_exif(), icc_profile=ICC, xmp=b"<x:xmpmeta/>")
+    for chunk in (b"EXIF", b"ICCP", b"XMP "):
+        assert chunk in data
+
+    stripped = _strip_webp(data)
+    for chunk in (b"EXIF", b"ICCP", b"XMP "):
+        assert chunk not in stripped
+    # Taille RIFF recalculee
+    assert int.from_bytes(stripped[4:8], "little") == len(stripped) - 8
+    img = Image.open(io.BytesIO(stripped))
+    assert not {"exif", "icc_profile", "xmp"} & set(img.info)
+    assert _same_pixels(stripped, data)
+
+
+def test_strip_invalid_returns_original():
+    assert _strip_metadata(b"\xff\xd8\x00garbage", "JPEG") == b"\xff\xd8\x00garbage"
+    assert _strip_metadata(b"\x89PNG\r\n\x1a\n\x00\x00\xff\xff", "PNG") == b"\x89PNG\r\n\x1a\n\x00\x00\xff\xff"
+    assert _strip_metadata(b"GIF89a", "GIF") == b"GIF89a"
+
+
+def test_optimize_resizes_and_strips():
+    optimizer = ImageOptimizer(max_width=60)
+    try:
+        data = _save(_picture((240, 160)), "JPEG", quality=95, exif=_exif(), icc_profile=ICC)
+        result = optimizer.optimize(data)
+        img = Image.open(io.BytesIO(result))
+        assert img.size == (60, 40)
+        assert "exif" not in img.info and "icc_profile" not in img.info
+        # Cache par contenu
+        assert optimizer.optimize(data) is result
+    finally:
+        optimizer.close()
+
+
+def test_optimize_applies_orientation():
+    optimizer = ImageOptimizer()
+    try:
+        # Orientation 6: affichee tournee de 90 degres
+        data = _save(_picture((120, 80)), "JPEG", exif=_exif(orientation=6))
+        img = Image.open(io.BytesIO(optimizer.optimize(data)))
+        assert img.size == (80, 120)
+        assert "exif" not in img.info
+    finally:
+        optimizer.close()
+
+
+def test_optimize_without_gain_keeps_encoding():
+    optimizer = ImageOptimizer(quality=95)
+    try:
+        # Petite image deja compressee: recompression sans gain, seules les metadonnees partent
+        data = _save(_picture((40, 30)), "JPEG", quality=30, optimize=True, comment=b"commentaire")
+        result = optimizer.optimize(data)
+        assert result == _strip_jpeg(data)
+        images = optimizer.optimize_images([(data, "a.jpg"), (b"pas une image", "b.bin")])
+        assert images == [(result, "a.jpg"), (b"pas une image", "b.bin")]
+    finally:
+        optimizer.close()
@@ -0,0 +1,61 @@
+"""
+Tests de PreflightService: placeholders inconnus, champs vides, objet trop long.
+"""
+
+from src.config import SUBJECT_MAX_LENGTH
+from src.models import Recipient
+from src.services import EmailService, PreflightService
+
+
+def _recipients():
+    return [
+        Recipient(email="a@example.com", nom="Martin", prenom="Anne", numero="1"),
+        Recipient(email="b@example.com", nom="  ", prenom="Bob", numero="2"),
+        Recipient(email="c@example.com", nom="Lefebvre-Dupont de la Tour" * 3, prenom="", numero="3"),
+        Recipient(email="d@example.com", nom="Petit", prenom="Zoe", numero=""),
+    ]
+
+
+def test_clean_message():
+    report = PreflightService.check("Bonjour {{prenom}}", "Votre dossier", _recipients()[:1])
+    assert report.ok
+    assert report.recipients == 1
+    assert report.affected == []
+
+
+def test_unknown_placeholders():
+    report = PreflightService.check("Bonjour {{ nom }}", "Cher {{prenon}}, {{nom}} {{prenon}}", _recipients())
+    assert report.unknown == ["{{ nom }}", "{{prenon}}"]
+    assert not report.ok
+
+
+def test_empty_fields_only_for_used_placeholders():
+    report = PreflightService.check("Bonjour {{prenom}}", "Cher {{nom}}", _recipients())
+    # Espaces seuls = vide; numero vide ignore (non utilise)
+    assert report.empty == {"nom": [1], "prenom": [2]}
+    assert report.affected == [1, 2]
+
+
+def test_subject_length_matches_personalized_subject():
+    subject = "Dossier {{numero}} pour {{prenom}} {{nom}} ({{nom}})"
+    recipients = _recipients()
+    report = PreflightService.check(subject, "Corps", recipients)
+
+    lengths = [len(EmailService.replace_placeholders(subject, r)) for r in recipients]
+    assert report.max_subject_length == max(lengths)
+    assert report.long_subjects == [i for i, n in enumerate(lengths) if n > SUBJECT_MAX_LENGTH]
+    assert report.long_subjects == [2]
+
+
+def test_unknown_placeholder_counts_in_subject_length():
+    report = PreflightService.check("{{prenom}} {{inconnu}}", "", _recipients()[:1], max_subject_length=10)
+    # "Anne {{inconnu}}": le placeholder inconnu reste tel quel
+    assert report.max_subject_length == len("Anne {{inconnu}}")
+    assert report.long_subjects == [0]
+
+
+def test_fixed_subject_without_placeholders():
+    report = PreflightService.check("x" * 100, "Corps", _recipients())
+    assert report.max_subject_length == 100
+    assert report.long_subjects == [0, 1, 2, 3]
+    assert PreflightService.check("Objet", "Corps", []).ok
@@ -0,0 +1,118 @@
+"""
+Tests de ProjectService: enregistrement et reouverture d'un projet,
+images servies depuis la projection memoire.
+"""
+
+import mmap
+import os
+
+from src.models import AppState, Recipient, SendStatus, SMTPConfig
+from src.services import ProjectService
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x01" * 500
+JPEG = b"\xff\xd8\xff" + b"\x02" * 300
+
+
+def _state():
+    state = AppState(
+        smtp=SMTPConfig(server="smtp.example.com", port=465, email="expediteur@example.com",
+                        password="mot-de-passe-secret", use_tls=False),
+        subject="Bonjour {{prenom}}",
+        body="Corps du message",
+        default_image=JPEG,
+        source_files=["/donnees/liste.xlsx"]
+    )
+    state.recipients = [
+        Recipient(email="a@example.com", nom="Martin", prenom="Eleonore", numero="1", images=[(PNG, "a.png")]),
+        # Meme image deux fois: stockee une seule fois
+        Recipient(email="b@example.com", nom="Durand", prenom="Luc", numero="2",
+                  images=[(PNG, "b.png"), (JPEG, "b.jpg")],
+                  status=SendStatus.SUCCESS, message_id="<id@example.com>", sent_at=1700000000.0),
+        Recipient(email="c@example.com", nom="Petit", prenom="Zoe", numero="3",
+                  status=SendStatus.FAILED, error="550 5.1.1 User unknown"),
+    ]
+    return state
+
+
+def _mapped(data):
+    return isinstance(data, memoryview) and isinstance(data.obj, mmap.mmap)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "campagne.coldsender")
+    assert ProjectService.save(path, _state()) is None
+
+    with open(path, "rb") as f:
+        content = f.read()
+    # Mot de passe jamais enregistre, images dedoublonnees
+    assert b"mot-de-passe-secret" not in content
+    assert content.count(PNG) == 1 and content.count(JPEG) == 1
+
+    state, error = ProjectService.load(path)
+    assert error is None
+    assert state.smtp.password == ""
+    assert (state.smtp.server, state.smtp.port, state.smtp.use_tls) == ("smtp.example.com", 465, False)
+    assert state.subject == "Bonjour {{prenom}}"
+    assert state.default_image == JPEG
+    assert state.source_files == ["/donnees/liste.xlsx"]
+
+    a, b, c = state.recipients
+    assert (a.email, a.prenom) == ("a@example.com", "Eleonore")
+    assert (b.status, b.message_id, b.sent_at) == (SendStatus.SUCCESS, "<id@example.com>", 1700000000.0)
+    assert (c.status, c.error) == (SendStatus.FAILED, "550 5.1.1 User unknown")
+    assert c.images == []
+
+    # Images lues depuis la projection du fichier
+    assert all(_mapped(data) for data, _ in a.images + b.images)
+    assert [(bytes(data), name) for data, name in b.images] == [(PNG, "b.png"), (JPEG, "b.jpg")]
+    assert a.images[0][0].obj is b.images[0][0].obj
+
+
+def test_save_links_images_to_file(tmp_path):
+    path = str(tmp_path / "campagne.coldsender")
+    state = _state()
+    assert ProjectService.save(path, state) is None
+    data, name = state.recipients[0].images[0]
+    assert _mapped(data) and bytes(data) == PNG and name == "a.png"
+
+
+def test_resave_closes_previous_map(tmp_path):
+    path = str(tmp_path / "campagne.coldsender")
+    ProjectService.save(path, _state())
+    state, _ = ProjectService.load(path)
+    previous = ProjectService._maps[os.path.realpath(path)]
+
+    state.recipients.append(Recipient(email="d@example.com", nom="", prenom="", numero="", images=[(b"GIF89a", "d.gif")]))
+    assert ProjectService.save(path, state) is None
+    current = ProjectService._maps[os.path.realpath(path)]
+    assert current is not previous
+    assert previous.closed
+    assert all(data.obj is current for r in state.recipients for data, _ in r.images)
+
+    # Etat remplace par la reouverture: plus aucune vue de la projection courante
+    state = None
+    reloaded, error = ProjectService.load(path)
+    assert error is None
+    assert current.closed
+    assert bytes(reloaded.recipients[3].images[0][0]) == b"GIF89a"
+
+
+def test_map_kept_while_view_in_use(tmp_path):
+    path = str(tmp_path / "campagne.coldsender")
+    ProjectService.save(path, _state())
+    state, _ = ProjectService.load(path)
+    # Vue encore affichee (apercu ouvert): la projection reste lisible
+    held = state.recipients[0].images[0][0]
+    previous = held.obj
+
+    assert ProjectService.save(path, state) is None
+    assert not previous.closed
+    assert bytes(held) == PNG
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "autre.coldsender"
+    path.write_bytes(b"pas un projet" * 4)
+    state, error = ProjectService.load(str(path))
+    assert state is None and error
@@ -0,0 +1,135 @@
+"""
+Tests de CampaignScheduler: plages horaires, quota quotidien, reprise.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from benchmarks.smtp_sink import SMTPSink
+from src.models import Recipient, SendWindow, SMTPConfig
+from src.services import CampaignScheduler
+
+
+# Lundi 6 janvier 2025
+MONDAY = datetime(2025, 1, 6)
+
+
+def _scheduler(path, windows):
+    scheduler = CampaignScheduler(str(path))
+    scheduler.windows = windows
+    return scheduler
+
+
+def _recipients(count):
+    return [Recipient(email=f"user{i}@example.com", nom="Nom", prenom="Prenom", numero=str(i)) for i in range(count)]
+
+
+def test_window_end(tmp_path):
+    scheduler = _scheduler(tmp_path, [SendWindow("09:00", "12:00"), SendWindow("14:00", "18:00")])
+    assert scheduler.window_end(MONDAY.replace(hour=10)) == MONDAY.replace(hour=12)
+    assert scheduler.window_end(MONDAY.replace(hour=15, minute=30)) == MONDAY.replace(hour=18)
+    # Fin de plage exclue, pause de midi
+    assert scheduler.window_end(MONDAY.replace(hour=12)) is None
+    assert scheduler.window_end(MONDAY.replace(hour=13)) is None
+    # Samedi: hors des jours par defaut (lundi a vendredi)
+    assert scheduler.window_end(datetime(2025, 1, 11, 10)) is None
+
+
+def test_no_windows_means_always_open(tmp_path):
+    scheduler = _scheduler(tmp_path, [])
+    assert scheduler.window_end(MONDAY) == datetime.max
+    assert scheduler.next_window_start(MONDAY) == MONDAY
+
+
+def test_next_window_start(tmp_path):
+    scheduler = _scheduler(tmp_path, [SendWindow("09:00", "12:00"), SendWindow("14:00", "18:00")])
+    # Dans une plage: immediat
+    assert scheduler.next_window_start(MONDAY.replace(hour=10)) == MONDAY.replace(hour=10)
+    assert scheduler.next_window_start(MONDAY.replace(hour=7)) == MONDAY.replace(hour=9)
+    assert scheduler.next_window_start(MONDAY.replace(hour=12, minute=30)) == MONDAY.replace(hour=14)
+    # Vendredi soir: lundi suivant
+    assert scheduler.next_window_start(datetime(2025, 1, 10, 19)) == datetime(2025, 1, 13, 9)
+
+
+def test_create_and_load(tmp_path):
+    config = SMTPConfig(server="smtp.example.com", port=587, email="expediteur@example.com", password="secret")
+    recipients = _recipients(3)
+    recipients[1].images = [(b"\x89PNG image", "photo.png")]
+    scheduler, error = CampaignScheduler.create(
+        str(tmp_path), config, "Objet", "Corps", recipients,
+        default_image=b"image", windows=[SendWindow("08:00", "20:00", (0, 1))], daily_quota=0
+    )
+    assert error is None
+
+    # Mot de passe jamais enregistre
+    with open(os.path.join(tmp_path, CampaignScheduler.CAMPAIGN_FILE), encoding="utf-8") as f:
+        assert "secret" not in f.read()
+
+    scheduler.state.position = 2
+    scheduler.save_state()
+    loaded, error = CampaignScheduler.load(str(tmp_path))
+    assert error is None
+    assert loaded.config.password == ""
+    assert loaded.windows == [SendWindow("08:00", "20:00", (0, 1))]
+    assert loaded.daily_quota == 0
+    assert loaded.default_image == b"image"
+    assert [r.email for r in loaded.recipients] == [r.email for r in recipients]
+    assert loaded.recipients[1].images == [(b"\x89PNG image", "photo.png")]
+    assert loaded.state.position == 2
+    assert [r.email for r in loaded.iter_recipients(2)] == ["user2@example.com"]
+
+
+def test_daily_quota_waits_for_next_day(tmp_path):
+    with SMTPSink() as sink:
+        host, port = sink.address
+        config = SMTPConfig(server=host, port=port, email="expediteur@example.com", password="x", use_tls=False)
+        scheduler, error = CampaignScheduler.create(
+            str(tmp_path), config, "Objet", "Corps", _recipients(8), windows=[], daily_quota=5
+        )
+        assert error is None
+
+        stop = threading.Event()
+        waits, results = [], []
+
+        def on_wait(resume, reason):
+            waits.append((resume, reason))
+            stop.set()
+
+        success, failed = scheduler.run(
+            "x", lambda *args: results.append(args[0]), on_wait, stop_event=stop
+        )
+    assert (success, failed) == (5, 0)
+    assert sorted(results) == list(range(5))
+    assert sink.messages == 5
+    assert scheduler.state.sent_today == 5
+    assert scheduler.state.position == 5
+    assert not scheduler.finished
+
+    resume, reason = waits[0]
+    assert reason == "quota quotidien atteint"
+    assert resume.date() > datetime.now().date()
+
+    # Avancement enregistre: reprise a la position 5
+    with open(os.path.join(tmp_path, CampaignScheduler.STATE_FILE), encoding="utf-8") as f:
+        assert json.load(f)["position"] == 5
+
+
+def test_resume_finishes_campaign(tmp_path):
+    with SMTPSink() as sink:
+        host, port = sink.address
+        config = SMTPConfig(server=host, port=port, email="expediteur@example.com", password="x", use_tls=False)
+        scheduler, _ = CampaignScheduler.create(
+            str(tmp_path), config, "Objet", "Corps", _recipients(6), windows=[], daily_quota=0
+        )
+        scheduler.state.position = 4
+        scheduler.save_state()
+
+        loaded, error = CampaignScheduler.load(str(tmp_path))
+        assert error is None
+        results = []
+        assert loaded.run("x", lambda *args: results.append(args[0])) == (2, 0)
+    assert loaded.finished
+    assert sorted(results) == [4, 5]
+    assert sink.messages == 2
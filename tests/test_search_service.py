@@ -0,0 +1,79 @@
+"""
+Tests de RecipientSearch: classement, pagination et mises a jour incrementales.
+"""
+
+from src.models import Recipient
+from src.services import RecipientSearch
+
+
+def _recipients():
+    return [
+        Recipient("jean.dupont@example.com", "Dupont", "Jean", "1"),
+        Recipient("marie@example.com", "Martin", "Marie", "2"),
+        Recipient("contact@dupont-freres.fr", "Freres", "Paul", "3"),
+        Recipient("eloise@example.com", "Lefèvre", "Éloïse", "4"),
+        Recipient("x@example.com", "Ledupontel", "Luc", "5"),
+    ]
+
+
+def test_word_prefix_ranked_first():
+    search = RecipientSearch(_recipients())
+    rows, total = search.search("dupont")
+    # Debut de mot (nom, adresse) avant les simples sous-chaines
+    assert rows == [0, 2, 4]
+    assert total == 3
+    assert search.matches("dupont") == [0, 2, 4]
+
+
+def test_case_and_accents_ignored():
+    search = RecipientSearch(_recipients())
+    assert search.search("ELOISE")[0] == [3]
+    assert search.search("lefevre")[0] == [3]
+    assert search.search("Éloïse Lefèvre")[0] == [3]
+
+
+def test_empty_query_pages_the_list():
+    search = RecipientSearch(_recipients())
+    assert search.search("  ", offset=2, limit=2) == ([2, 3], 5)
+
+
+def test_pagination_stops_early():
+    recipients = [Recipient(f"user{i}@example.com", "Nom", "Prenom", str(i)) for i in range(100)]
+    search = RecipientSearch(recipients)
+    rows, total = search.search("user", offset=10, limit=5)
+    assert rows == [10, 11, 12, 13, 14]
+    # Assez de correspondances pour la page: total inconnu
+    assert total is None
+    assert search.search("user9", limit=50) == ([9] + list(range(90, 100)), 11)
+
+
+def test_update_modified_and_appended_rows():
+    recipients = _recipients()
+    search = RecipientSearch(recipients)
+    assert search.search("martin")[0] == [1]
+
+    recipients[1].nom = "Bernard"
+    recipients.append(Recipient("nouveau@example.com", "Martin", "Alain", "6"))
+    search.update([1, 5])
+    assert search.search("martin")[0] == [5]
+    assert search.search("bernard")[0] == [1]
+
+
+def test_update_before_first_search_is_ignored():
+    recipients = _recipients()
+    search = RecipientSearch(recipients)
+    recipients[0].nom = "Bernard"
+    search.update([0])
+    assert search.search("bernard")[0] == [0]
+
+
+def test_remove():
+    recipients = _recipients()
+    search = RecipientSearch(recipients)
+    search.search("dupont")
+    removed = [recipients[0], recipients[3]]
+    kept = [r for r in recipients if r not in removed]
+    search.remove(kept, removed)
+    assert search.search("dupont")[0] == [1, 2]
+    assert [kept[i].numero for i in search.matches("example")] == ["2", "5"]
+    assert search.search("eloise") == ([], 0)
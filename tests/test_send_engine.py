@@ -0,0 +1,189 @@
+"""
+Tests de SendEngine (pause, reprise, annulation, exclusions) avec une session factice.
+"""
+
+import threading
+import time
+
+from src.models import Recipient, SendStatus, SMTPConfig
+from src.services import EmailService, RenderPool, SendEngine
+
+
+class FakeSession:
+    """Session d'envoi en memoire: enregistre les destinataires envoyes."""
+
+    def __init__(self, sent):
+        self.sent = sent
+        self.noops = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def send_raw(self, sender, recipients, data):
+        self.sent.extend(recipients)
+
+    def noop(self):
+        self.noops += 1
+
+
+def _recipients(count):
+    return [Recipient(email=f"user{i}@example.com", nom="Nom", prenom="Prenom", numero=str(i)) for i in range(count)]
+
+
+def _engine(sent, **kwargs):
+    config = SMTPConfig(server="localhost", email="expediteur@example.com", password="x")
+    return SendEngine(
+        config, "Bonjour {{prenom}}", "Message {{numero}}",
+        workers=0, sessions=1, delay=0,
+        session_factory=lambda: FakeSession(sent),
+        **kwargs
+    )
+
+
+def test_sends_all_in_order():
+    sent, results = [], []
+    recipients = _recipients(20)
+    engine = _engine(sent)
+    assert engine.run(recipients, lambda *args: results.append(args[:3])) == (20, 0)
+    assert sent == [r.email for r in recipients]
+    assert [index for index, _, _ in results] == list(range(20))
+    assert engine.position == 20
+    assert all(r.status == SendStatus.SUCCESS and r.message_id for r in recipients)
+
+
+def test_pause_and_resume():
+    sent = []
+    recipients = _recipients(10)
+    engine = _engine(sent)
+    paused = threading.Event()
+
+    def on_result(index, recipient, success, error):
+        if index == 2:
+            engine.pause()
+            paused.set()
+
+    thread = threading.Thread(target=engine.run, args=(recipients, on_result))
+    thread.start()
+    assert paused.wait(5)
+    # En pause: rien de plus n'est envoye
+    thread.join(0.5)
+    assert thread.is_alive()
+    assert engine.paused
+    assert len(sent) == 3
+    assert engine.position == 3
+
+    engine.resume()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert len(sent) == 10
+    assert engine.success_count == 10
+
+
+def test_cancel_while_paused():
+    sent = []
+    recipients = _recipients(10)
+    engine = _engine(sent)
+    paused = threading.Event()
+
+    def on_result(index, recipient, success, error):
+        if index == 4:
+            engine.pause()
+            paused.set()
+
+    thread = threading.Thread(target=engine.run, args=(recipients, on_result))
+    thread.start()
+    assert paused.wait(5)
+    engine.cancel()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert engine.cancelled
+    # Position de reprise: premier destinataire non traite
+    assert engine.position == 5
+    assert sent == [r.email for r in recipients[:5]]
+    assert all(r.status == SendStatus.PENDING for r in recipients[5:])
+
+
+def test_cancel_before_run_sends_nothing():
+    sent = []
+    engine = _engine(sent)
+    engine.cancel()
+    assert engine.run(_recipients(5)) == (0, 0)
+    assert sent == []
+    assert engine.position == 0
+
+
+def test_shared_cancel_event():
+    sent = []
+    event = threading.Event()
+    engine = _engine(sent, cancel_event=event)
+
+    def on_result(index, recipient, success, error):
+        if index == 1:
+            event.set()
+
+    engine.run(_recipients(10), on_result)
+    assert len(sent) == 2
+    assert engine.position == 2
+
+
+def test_stop_when_leaves_rendered_messages_pending():
+    sent = []
+    recipients = _recipients(10)
+    engine = _engine(sent, stop_when=lambda: len(sent) >= 3)
+    assert engine.run(recipients) == (3, 0)
+    # Arret avant l'envoi: le 4e message, deja rendu, reste a traiter
+    assert engine.position == 3
+    assert not engine.cancelled
+    assert all(r.status == SendStatus.PENDING for r in recipients[3:])
+
+
+def test_suppressed_recipients_are_not_rendered(monkeypatch):
+    rendered = []
+    render = EmailService.render_message
+
+    def spy(sender, recipient, *args, **kwargs):
+        rendered.append(recipient.email)
+        return render(sender, recipient, *args, **kwargs)
+
+    monkeypatch.setattr(EmailService, "render_message", staticmethod(spy))
+    sent, results = [], []
+    recipients = _recipients(6)
+    engine = _engine(sent, suppression={"user1@example.com", "user4@example.com"})
+    assert engine.run(recipients, lambda *args: results.append((args[0], args[2], args[3]))) == (4, 0)
+
+    assert "user1@example.com" not in rendered and "user4@example.com" not in rendered
+    assert sent == ["user0@example.com", "user2@example.com", "user3@example.com", "user5@example.com"]
+    # Exclus signales (succes=False, erreur=None) et comptes dans la position
+    assert (1, False, None) in results and (4, False, None) in results
+    assert engine.suppressed_count == 2
+    assert engine.position == 6
+    assert recipients[1].status == SendStatus.SUPPRESSED
+
+
+def test_on_result_called_without_lock():
+    sent, locked = [], []
+    engine = _engine(sent)
+
+    def on_result(index, recipient, success, error):
+        acquired = engine._lock.acquire(blocking=False)
+        locked.append(not acquired)
+        if acquired:
+            engine._lock.release()
+
+    engine.run(_recipients(5), on_result)
+    assert locked == [False] * 5
+
+
+def test_render_pool_close_cancels_pending():
+    recipients = _recipients(200)
+    pool = RenderPool("expediteur@example.com", "Objet", "Corps", workers=1, queue_size=50)
+    pool.start(recipients)
+    first = pool.get()
+    assert first.index == 0 and first.data
+    start = time.monotonic()
+    pool.close()
+    assert time.monotonic() - start < 5
+    assert not pool._thread.is_alive()
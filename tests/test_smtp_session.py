@@ -0,0 +1,146 @@
+"""
+Tests de SMTPSession et de la reprise des sessions TLS contre le serveur
+local de benchmarks/smtp_sink.py.
+"""
+
+import shutil
+import smtplib
+import subprocess
+
+import pytest
+
+from benchmarks.smtp_sink import SMTPSink, SinkOptions
+from src.models import SMTPConfig
+from src.services import ResumableSSLContext, SMTPSession
+
+
+MESSAGE = b"Subject: test\r\n\r\nBonjour\r\n.ligne commencant par un point\r\n"
+
+
+def _session(sink, **kwargs):
+    host, port = sink.address
+    config = SMTPConfig(server=host, port=port, email="expediteur@example.com", password="x", use_tls=False)
+    kwargs.setdefault("retry_delay", 0)
+    return SMTPSession(config, timeout=5, **kwargs)
+
+
+def test_pipelined_session_reuses_connection():
+    with SMTPSink() as sink, _session(sink) as session:
+        for i in range(5):
+            session.send_raw("expediteur@example.com", [f"user{i}@example.com"], MESSAGE)
+        assert session.pipelined
+        assert session.connections == 1
+        assert session.messages_sent == 5
+    assert sink.messages == 5
+    assert sink.recipients == 5
+
+
+def test_sequential_when_pipelining_not_announced():
+    with SMTPSink(SinkOptions(pipelining=False)) as sink, _session(sink) as session:
+        session.send_raw("expediteur@example.com", ["a@example.com", "b@example.com"], MESSAGE)
+        assert not session.pipelined
+    assert sink.messages == 1
+    assert sink.recipients == 2
+
+
+def test_pipelined_refused_recipient():
+    with SMTPSink(SinkOptions(rcpt_error_rate=1.0)) as sink, _session(sink) as session:
+        with pytest.raises(smtplib.SMTPRecipientsRefused) as info:
+            session.send_raw("expediteur@example.com", ["inconnu@example.com"], MESSAGE)
+        assert info.value.recipients["inconnu@example.com"][0] == 550
+        # Refus definitif: pas de nouvelle tentative
+        assert session.reconnects == 0
+    assert sink.messages == 0
+
+
+def test_reconnect_after_421():
+    # Le serveur ferme la connexion (421) apres 2 messages: renvoi sur une nouvelle connexion
+    with SMTPSink(SinkOptions(max_messages=2)) as sink, _session(sink, max_messages=0) as session:
+        for i in range(5):
+            session.send_raw("expediteur@example.com", [f"user{i}@example.com"], MESSAGE)
+        assert session.messages_sent == 5
+        assert session.reconnects == 2
+        assert session.connections == 3
+    assert sink.messages == 5
+
+
+def test_421_after_retries_raises():
+    with SMTPSink(SinkOptions(max_messages=1)) as sink, _session(sink, max_messages=0, retries=0) as session:
+        session.send_raw("expediteur@example.com", ["a@example.com"], MESSAGE)
+        with pytest.raises(smtplib.SMTPException):
+            session.send_raw("expediteur@example.com", ["b@example.com"], MESSAGE)
+        assert not session.connected
+        # La connexion est rouverte au prochain envoi
+        session.send_raw("expediteur@example.com", ["b@example.com"], MESSAGE)
+    assert sink.messages == 2
+
+
+def test_recycles_connection_at_message_limit():
+    with SMTPSink() as sink, _session(sink, max_messages=2) as session:
+        for i in range(5):
+            session.send_raw("expediteur@example.com", [f"user{i}@example.com"], MESSAGE)
+        assert session.connections == 3
+        assert session.recycled == 2
+        assert session.reconnects == 0
+    assert sink.messages == 5
+
+
+# --- Reprise des sessions TLS (STARTTLS) ---------------------------------
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory):
+    """Certificat auto-signe genere par la commande openssl."""
+    if shutil.which("openssl") is None:
+        pytest.skip("commande openssl absente")
+    folder = tmp_path_factory.mktemp("tls")
+    certfile, keyfile = str(folder / "cert.pem"), str(folder / "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-keyout", keyfile, "-out", certfile],
+        check=True, capture_output=True, timeout=60
+    )
+    return certfile, keyfile
+
+
+def _send_tls(sink, tls, messages, max_messages=1):
+    host, port = sink.address
+    config = SMTPConfig(server=host, port=port, email="expediteur@example.com", password="x", use_tls=True)
+    # Une connexion par message: chaque reconnexion peut reprendre la session
+    with SMTPSession(config, timeout=5, max_messages=max_messages, tls=tls) as session:
+        for i in range(messages):
+            session.send_raw("expediteur@example.com", [f"user{i}@example.com"], MESSAGE)
+        return session.connections
+
+
+def test_reconnections_resume_session(certificate):
+    certfile, keyfile = certificate
+    tls = ResumableSSLContext()
+    with SMTPSink(SinkOptions(certfile=certfile, keyfile=keyfile)) as sink:
+        assert _send_tls(sink, tls, 5) == 5
+    assert sink.messages == 5
+    assert tls.handshakes == 5
+    # Premiere connexion complete, les suivantes reprises
+    assert tls.resumed == 4
+    assert tls.resumption_rate == pytest.approx(0.8)
+    assert "4 sessions reprises" in tls.summary()
+
+
+def test_context_shared_between_sessions(certificate):
+    certfile, keyfile = certificate
+    tls = ResumableSSLContext()
+    with SMTPSink(SinkOptions(certfile=certfile, keyfile=keyfile)) as sink:
+        _send_tls(sink, tls, 1)
+        # Nouvelle session SMTP, meme contexte: reprise des la premiere connexion
+        _send_tls(sink, tls, 2, max_messages=0)
+    assert tls.handshakes == 2
+    assert tls.resumed == 1
+
+
+def test_separate_contexts_do_not_resume(certificate):
+    certfile, keyfile = certificate
+    first, second = ResumableSSLContext(), ResumableSSLContext()
+    with SMTPSink(SinkOptions(certfile=certfile, keyfile=keyfile)) as sink:
+        _send_tls(sink, first, 1)
+        _send_tls(sink, second, 1)
+    assert first.resumed == 0 and second.resumed == 0
+    assert ResumableSSLContext().resumption_rate == 0.0
@@ -0,0 +1,87 @@
+"""
+Tests de SuppressionList: ajout, recherche (avec et sans Bloom), persistance, filtre.
+"""
+
+import pytest
+
+from src.models import Recipient
+from src.services import SuppressionList
+
+
+@pytest.fixture(params=[True, False], ids=["bloom", "sans-bloom"])
+def suppression(request, tmp_path):
+    return SuppressionList(str(tmp_path / "suppression.idx"), use_bloom=request.param)
+
+
+def test_add_and_contains_normalized(suppression):
+    assert "a@example.com" not in suppression
+    assert suppression.add(["A@Example.com", "b@example.com", "a@example.com"]) == 2
+    assert len(suppression) == 2
+    assert " a@EXAMPLE.com " in suppression
+    assert "c@example.com" not in suppression
+    # Adresses deja presentes non recomptees
+    assert suppression.add(["b@example.com", "c@example.com"]) == 1
+
+
+def test_many_addresses(suppression):
+    emails = [f"user{i}@example.com" for i in range(20000)]
+    suppression.add(emails[::2])
+    found = suppression.contains_hashes(SuppressionList.hash_emails(emails))
+    assert found.tolist() == [i % 2 == 0 for i in range(len(emails))]
+
+
+def test_save_and_load(suppression, tmp_path):
+    suppression.add(["a@example.com", "b@example.com"])
+    assert suppression.save() is None
+
+    loaded = SuppressionList(suppression.path)
+    assert loaded.load() is None
+    assert len(loaded) == 2
+    assert "b@example.com" in loaded
+    assert "c@example.com" not in loaded
+
+    # Ajout apres chargement (memory-map) puis nouvelle sauvegarde
+    loaded.add(["c@example.com"])
+    assert loaded.save() is None
+    reloaded = SuppressionList(suppression.path)
+    reloaded.load()
+    assert "c@example.com" in reloaded
+
+
+def test_missing_and_invalid_file(tmp_path):
+    missing = SuppressionList(str(tmp_path / "absent.idx"))
+    assert missing.load() is None
+    assert len(missing) == 0
+
+    invalid = tmp_path / "invalide.idx"
+    invalid.write_bytes(b"x" * 64)
+    assert SuppressionList(str(invalid)).load() == "Fichier de liste d'opposition invalide"
+
+
+def test_load_csv(suppression, tmp_path):
+    path = tmp_path / "opposition.csv"
+    path.write_text("nom,email\nA,a@example.com\nB,pas-une-adresse\nC,c@example.com\n", encoding="utf-8")
+    assert suppression.load_csv(str(path)) == (2, None)
+    assert "c@example.com" in suppression
+
+    # Sans colonne email: premiere colonne, premiere ligne comprise
+    path.write_text("d@example.com\ne@example.com\n", encoding="utf-8")
+    assert suppression.load_csv(str(path)) == (2, None)
+    assert "d@example.com" in suppression
+
+
+def test_filter(suppression):
+    recipients = [Recipient(f"user{i}@example.com", "", "", str(i)) for i in range(10)]
+    assert suppression.filter(recipients) == (recipients, [])
+
+    suppression.add(["USER3@example.com", "user7@example.com"])
+    kept, suppressed = suppression.filter(recipients)
+    assert [r.numero for r in suppressed] == ["3", "7"]
+    assert len(kept) == 8 and recipients[3] not in kept
+
+
+def test_clear(suppression):
+    suppression.add(["a@example.com"])
+    assert suppression.clear() is None
+    assert len(suppression) == 0
+    assert "a@example.com" not in suppression
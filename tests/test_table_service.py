@@ -0,0 +1,134 @@
+"""
+Tests de RecipientTable: mises a jour incrementales des index de tri et de recherche.
+"""
+
+from src.models import Recipient
+from src.services import RecipientTable
+
+
+def _recipient(i, nom=None):
+    return Recipient(f"user{i}@example.com", nom or f"nom{i:03d}", f"prenom{i}", str(i))
+
+
+def _table(count=20):
+    recipients = [_recipient(i) for i in range(count)]
+    return recipients, RecipientTable(recipients)
+
+
+def test_replaced_after_list_mutation():
+    # Le remplacement est fait dans la liste avant l'appel, positions pas encore construites
+    recipients, table = _table()
+    table.set_sort("nom")
+    table.view()
+    old, new = recipients[5], _recipient(5, "zzz")
+    recipients[5] = new
+    table.replaced(5, old, new)
+
+    rows, total = table.view()
+    assert total == 20
+    assert rows[-1] is new
+    assert old not in rows
+    assert table.position(new) == 5
+
+    table.set_filter("nom=zzz")
+    assert table.view()[0] == [new]
+    table.set_filter(old.nom)
+    assert table.view() == ([], 0)
+
+
+def _names(rows):
+    return [r.nom for r in rows]
+
+
+def test_sort_and_filters():
+    recipients = [
+        Recipient("a@gmail.com", "Dupont", "Jean", "1"),
+        Recipient("b@example.com", "Martin", "Élise", "2", images=[(b"x", "x.png")]),
+        Recipient("c@gmail.com", "dupond", "Paul", "3"),
+        Recipient("d@example.com", "Le Goff", "Anne", "4", images=[(b"x", "x.png")] * 2),
+    ]
+    table = RecipientTable(recipients)
+
+    table.set_sort("nom")
+    assert _names(table.view()[0]) == ["dupond", "Dupont", "Le Goff", "Martin"]
+    table.set_sort("nom", descending=True)
+    assert _names(table.view(offset=1, limit=2)[0]) == ["Le Goff", "Dupont"]
+    table.set_sort(None)
+
+    cases = {
+        "nom=dupont": ["Dupont"],
+        "nom=dup*": ["Dupont", "dupond"],
+        'nom="le goff"': ["Le Goff"],
+        "email:gmail": ["Dupont", "dupond"],
+        "nom!=dupont": ["Martin", "dupond", "Le Goff"],
+        "images>0": ["Martin", "Le Goff"],
+        "images>=2": ["Le Goff"],
+        "images=0 email:gmail nom<dupont": ["dupond"],
+        "elise": ["Martin"],
+    }
+    for text, expected in cases.items():
+        assert table.set_filter(text) is None
+        rows, total = table.view()
+        assert _names(rows) == expected, text
+        assert total == len(expected)
+    assert _names(table.matching()) == ["Martin"]
+
+    # Filtre invalide: precedent conserve
+    assert table.set_filter('nom="le') == "Guillemet non ferme"
+    assert table.set_filter("images>x").startswith("images>x: nombre attendu")
+    assert _names(table.view()[0]) == ["Martin"]
+
+    assert table.set_filter("") is None
+    assert not table.filtered
+    assert table.view() == (recipients, 4)
+
+
+def _check_against_fresh(table, recipients):
+    """Vues de la table incrementale identiques a celles d'une table reconstruite."""
+    fresh = RecipientTable(list(recipients))
+    for column in (None, "nom", "email", "images"):
+        for text in ("", "nom=nom00*", "images>0", "prenom!=prenom1 nom>nom005", "user1"):
+            for other in (table, fresh):
+                other.set_sort(column)
+                other.set_filter(text)
+            assert table.view() == fresh.view(), (column, text)
+
+
+def test_incremental_updates_match_rebuild():
+    recipients, table = _table(50)
+    # Index construits avant les modifications
+    _check_against_fresh(table, recipients)
+
+    new = [_recipient(i) for i in range(50, 55)]
+    recipients.extend(new)
+    table.added(new)
+    _check_against_fresh(table, recipients)
+
+    changed = [recipients[3], recipients[10], recipients[52]]
+    for recipient in changed:
+        recipient.nom = "nom000"
+        recipient.images = [(b"x", "x.png")]
+    table.updated(changed)
+    _check_against_fresh(table, recipients)
+
+    position = table.position(recipients[7])
+    old, new = recipients[7], _recipient(99, "nom0005")
+    recipients[position] = new
+    table.replaced(position, old, new)
+    _check_against_fresh(table, recipients)
+
+    removed = recipients[::4]
+    kept = [r for r in recipients if all(r is not other for other in removed)]
+    table.removed(kept, removed)
+    _check_against_fresh(table, kept)
+    assert table.position(kept[-1]) == len(kept) - 1
+
+
+def test_updated_beyond_reindex_limit():
+    recipients, table = _table(1200)
+    table.set_sort("nom")
+    table.view()
+    for recipient in recipients:
+        recipient.nom = "x" + recipient.nom
+    table.updated(recipients)
+    _check_against_fresh(table, recipients)